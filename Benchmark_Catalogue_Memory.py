@@ -0,0 +1,53 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+from Movie_Catalogue import MovieCatalogue
+from Synthetic_Catalogue import synthetic_movies
+
+
+def measure(build):
+    """Returns the memory in bytes held by the result of build() and the seconds it took."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size, elapsed
+
+
+def main():
+    """
+        Compares the memory needed by the dictionary of movie dictionaries with the columnar
+        MovieCatalogue for synthetic catalogues of the given sizes.
+
+        How to use it:
+            python3 Benchmark_Catalogue_Memory.py 10000 100000 1000000
+        """
+    parser = argparse.ArgumentParser(description='Catalogue memory benchmark')
+    parser.add_argument('sizes', nargs='*', type=int, default=[10000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'movies':>10} {'dict MB':>10} {'compact MB':>11} {'bytes/movie':>18} {'ratio':>6}")
+    for count in args.sizes:
+        dict_size, dict_time = measure(lambda: dict(synthetic_movies(count)))
+        compact_size, compact_time = measure(lambda: _load_compact(count))
+        print(f"{count:>10} {dict_size / 1e6:>10.1f} {compact_size / 1e6:>11.1f} "
+              f"{dict_size // count:>8} -> {compact_size // count:<7} {dict_size / compact_size:>6.1f}"
+              f"   (built in {dict_time:.2f}s / {compact_time:.2f}s)")
+
+
+def _load_compact(count):
+    """Fills a MovieCatalogue movie by movie, the way the storages load it."""
+    catalogue = MovieCatalogue()
+    for title, movie in synthetic_movies(count):
+        catalogue[title] = movie
+    return catalogue
+
+
+if __name__ == "__main__":
+    main()
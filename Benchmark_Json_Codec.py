@@ -0,0 +1,55 @@
+import argparse
+import os
+import tempfile
+import time
+
+from Json_Codec import available_codecs, compression, get_codec, read_json, write_json, zstandard
+from Synthetic_Catalogue import synthetic_movies
+
+
+def timed(function):
+    """Returns the result of function() and the seconds it took."""
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    """
+        Compares dump time, parse time and file size of the JSON codecs on a synthetic catalogue,
+        indented and compact, plain and compressed. Every row shows the indent the codec really
+        wrote: orjson indents by 2 where the others use 4, the default codec writes 4 with the json
+        module (see get_codec).
+
+        How to use it:
+            python3 Benchmark_Json_Codec.py
+            python3 Benchmark_Json_Codec.py --movies 100000 --codecs json orjson
+        """
+    parser = argparse.ArgumentParser(description='JSON codec benchmark')
+    parser.add_argument('--movies', type=int, default=1000000)
+    parser.add_argument('--codecs', nargs='*', default=available_codecs())
+    args = parser.parse_args()
+
+    movies = dict(synthetic_movies(args.movies))
+    extensions = ['.json', '.json.gz'] + (['.json.zst'] if zstandard is not None else [])
+    print(f"{args.movies} movies")
+    print(f"{'codec':>8} {'indent':>7} {'file':>10} {'dump s':>8} {'parse s':>8} {'MB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in args.codecs:
+            codec = get_codec(name)
+            for indent in (4, None):
+                for extension in extensions:
+                    path = os.path.join(directory, 'movies' + extension)
+                    kind = compression(path)
+                    _, dump_time = timed(lambda: write_json(path, movies, codec, indent, kind))
+                    loaded, parse_time = timed(lambda: read_json(path, codec, kind))
+                    assert len(loaded) == len(movies)
+                    del loaded
+                    written_indent = 2 if indent and name == 'orjson' else indent
+                    print(f"{name:>8} {str(written_indent):>7} {extension:>10} {dump_time:>8.2f} {parse_time:>8.2f} "
+                          f"{os.path.getsize(path) / 1e6:>8.1f}")
+                    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
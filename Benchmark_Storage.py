@@ -0,0 +1,250 @@
+import argparse
+import datetime
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from config import API_KEY
+from Movie_App import MovieApp
+from Omdb_Client import OmdbClient
+from Storage_Csv import StorageCsv
+from Storage_Journal import StorageJournal
+from Storage_Json import StorageJson
+from Storage_Snapshot import StorageSnapshot
+from Storage_Sqlite import StorageSqlite
+from Synthetic_Catalogue import synthetic_movies, write_catalogue
+from Website_Generator import WebsiteGenerator
+
+# file name and factory of every backend, configured like main.py opens them
+BACKENDS = {
+    'json': ('movies.json', lambda path: StorageJson(path, cached=True, aggregates=True, compact=True,
+                                                     notes_sidecar=True)),
+    'json-plain': ('movies.json', lambda path: StorageJson(path)),
+    'csv': ('movies.csv', lambda path: StorageCsv(path, cached=True, aggregates=True, compact=True,
+                                                  notes_sidecar=True)),
+    'csv-plain': ('movies.csv', lambda path: StorageCsv(path)),
+    'journal': ('movies.journal', lambda path: StorageJournal(path)),
+    'sqlite': ('movies.db', lambda path: StorageSqlite(path)),
+    'snap': ('movies.snap', lambda path: StorageSnapshot(path, cached=True, aggregates=True)),
+}
+OPERATIONS = ('load', 'stream', 'stats', 'sorted_top100', 'sorted_all', 'search', 'add_movie', 'update_movie',
+              'delete_movie', 'website')
+# the operations that need movies of their own, seeded by prepare where they must already be stored
+MOVIE_OPERATIONS = ('add_movie', 'update_movie', 'delete_movie')
+TEMPLATE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'index_template.html')
+
+
+def peak_rss_mb():
+    """Returns the peak resident memory of this process in MB, None where it can't be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (1e6 if sys.platform == 'darwin' else 1e3), 1)
+
+
+def catalogue_file(data_dir, count, extension):
+    """Returns the synthetic catalogue file of a size, generating it on first use."""
+    path = os.path.join(data_dir, f"movies-{count}{extension}")
+    if not os.path.exists(path):
+        temp_path = os.path.join(data_dir, f"movies-{count}.tmp{extension}")
+        write_catalogue(temp_path, count)
+        os.replace(temp_path, path)
+    return path
+
+
+def prepare(backend, count, data_dir, work_dir, seed_titles=()):
+    """
+    Creates the storage file of a backend with the synthetic catalogue and movies with the
+    seed_titles, returns its path.
+    """
+    file_name, factory = BACKENDS[backend]
+    path = os.path.join(work_dir, file_name)
+    seeds = [(title, 2000, 7.5, '', '') for title in seed_titles]
+    if backend.startswith(('json', 'csv')):
+        shutil.copyfile(catalogue_file(data_dir, count, os.path.splitext(file_name)[1]), path)
+        if not seeds:
+            return path
+        new_movies = seeds
+    else:
+        new_movies = itertools.chain(((title, movie['year'], movie['rating'], movie['poster_url'], movie['imdb_url'])
+                                      for title, movie in synthetic_movies(count)), seeds)
+    storage = factory(path)
+    storage.add_many(new_movies)
+    close = getattr(storage, 'close', None)
+    if close is not None:
+        close()
+    return path
+
+
+def run_case(backend, count, data_dir, operations, repeat, trace_memory):
+    """
+    Times the operations on one backend and catalogue size, in the process it is called in.
+    Returns one result dictionary per operation.
+    """
+    work_dir = tempfile.mkdtemp(prefix='movie-benchmark-')
+    # every operation changes its own movies, so any of them can run alone or in any order
+    titles = {operation: [f"Benchmark {operation} {number}" for number in range(repeat)]
+              for operation in MOVIE_OPERATIONS}
+    seed_titles = [title for operation in ('update_movie', 'delete_movie') if operation in operations
+                   for title in titles[operation]]
+    try:
+        path = prepare(backend, count, data_dir, work_dir, seed_titles)
+        factory = BACKENDS[backend][1]
+        storage = factory(path)
+        app = MovieApp(storage, OmdbClient(API_KEY))
+        website = WebsiteGenerator(TEMPLATE_FILE, os.path.join(work_dir, 'index.html'))
+
+        steps = {
+            'load': lambda _: len(factory(path).list_movies()),
+            'stream': lambda _: sum(1 for _ in factory(path).iter_movies()),
+            'stats': lambda _: app.get_stats(),
+            'sorted_top100': lambda _: list(app._ranked_movies(100)),
+            'sorted_all': lambda _: list(app._ranked_movies()),
+            'search': lambda _: list(app._search_movies('storm')),
+            'add_movie': lambda number: storage.add_movie(titles['add_movie'][number], 2000, 7.5, '', ''),
+            'update_movie': lambda number: storage.update_movie(titles['update_movie'][number], 'Benchmark note'),
+            'delete_movie': lambda number: storage.delete_movie(titles['delete_movie'][number]),
+            'website': lambda _: website.generate(storage.iter_movies),
+        }
+        # the other operations run on a storage that already loaded its catalogue, like the app's
+        storage.list_movies()
+        results = []
+        for operation in operations:
+            timings = []
+            python_peak = 0
+            for number in range(repeat):
+                if trace_memory:
+                    tracemalloc.start()
+                start = time.perf_counter()
+                steps[operation](number)
+                timings.append(time.perf_counter() - start)
+                if trace_memory:
+                    python_peak = max(python_peak, tracemalloc.get_traced_memory()[1])
+                    tracemalloc.stop()
+            result = {
+                'backend': backend,
+                'movies': count,
+                'operation': operation,
+                'seconds': statistics.median(timings),
+                'min_seconds': min(timings),
+                'peak_rss_mb': peak_rss_mb(),
+            }
+            if trace_memory:
+                result['python_peak_mb'] = round(python_peak / 1e6, 2)
+            results.append(result)
+        close = getattr(storage, 'close', None)
+        if close is not None:
+            close()
+        return results
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def run(args):
+    """Runs every backend and size in a fresh process and writes the results as JSON lines."""
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix='movie-catalogues-')
+    os.makedirs(data_dir, exist_ok=True)
+    info = {
+        'run': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+    }
+    output = open(args.output, 'a', encoding='utf-8') if args.output else sys.stdout
+    print(f"{'backend':>10} {'movies':>9} {'operation':>14} {'seconds':>10} {'peak MB':>8}", file=sys.stderr)
+    try:
+        for count in args.sizes:
+            for backend in args.backends:
+                # a process per case, so every peak memory starts from an empty catalogue
+                with multiprocessing.Pool(1) as pool:
+                    results = pool.apply(run_case, (backend, count, data_dir, args.operations, args.repeat,
+                                                    args.trace_memory))
+                for result in results:
+                    print(json.dumps({**info, **result}), file=output, flush=True)
+                    print(f"{backend:>10} {count:>9} {result['operation']:>14} {result['seconds']:>10.4f} "
+                          f"{result['peak_rss_mb'] or '':>8}", file=sys.stderr)
+    finally:
+        if args.output:
+            output.close()
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return 0
+
+
+def load_results(path):
+    """Reads a results file, keyed by (backend, movies, operation). Later runs override earlier ones."""
+    results = {}
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                result = json.loads(line)
+                results[result['backend'], result['movies'], result['operation']] = result
+    return results
+
+
+def compare(args):
+    """Prints the timings of two results files side by side, returns 1 if any got slower than the threshold."""
+    baseline, current = load_results(args.baseline), load_results(args.current)
+    regressions = 0
+    print(f"{'backend':>10} {'movies':>9} {'operation':>14} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for key in sorted(baseline.keys() & current.keys()):
+        before, after = baseline[key]['seconds'], current[key]['seconds']
+        ratio = after / before if before else float('inf')
+        slower = ratio > args.threshold and after - before > args.min_seconds
+        regressions += slower
+        print(f"{key[0]:>10} {key[1]:>9} {key[2]:>14} {before:>10.4f} {after:>10.4f} {ratio:>6.2f}x"
+              f"{'  slower' if slower else ''}")
+    print(f"{regressions} operations slower than {args.threshold}x the baseline.")
+    return 1 if regressions else 0
+
+
+def main():
+    """
+        Benchmarks the storages and the commands on synthetic catalogues.
+
+        Every backend and size runs in its own process and the timings of load, streaming,
+        stats, sorting, search, add, update, delete and website generation are written as JSON
+        lines, which compare reads back to spot regressions between runs.
+
+        How to use it:
+            python3 Benchmark_Storage.py run --sizes 1000 100000 --output results.jsonl
+            python3 Benchmark_Storage.py run --sizes 5000000 --backends sqlite snap --data-dir catalogues
+            python3 Benchmark_Storage.py compare baseline.jsonl results.jsonl
+        """
+    parser = argparse.ArgumentParser(description='Storage benchmark')
+    commands = parser.add_subparsers(dest='command', required=True)
+    command = commands.add_parser('run', help='run the benchmark')
+    command.add_argument('--sizes', nargs='*', type=int, default=[1000, 100000])
+    command.add_argument('--backends', nargs='*', choices=list(BACKENDS), default=['json', 'csv', 'journal',
+                                                                                   'sqlite', 'snap'])
+    command.add_argument('--operations', nargs='*', choices=OPERATIONS, default=list(OPERATIONS))
+    command.add_argument('--repeat', type=int, default=3, help='runs of each operation, the median is reported')
+    command.add_argument('--data-dir', help='keeps the generated catalogues here for the next runs')
+    command.add_argument('--output', help='appends the results to this file instead of printing them')
+    command.add_argument('--trace-memory', action='store_true',
+                         help='also record the peak Python memory of each operation (slower)')
+    command = commands.add_parser('compare', help='compare two results files')
+    command.add_argument('baseline')
+    command.add_argument('current')
+    command.add_argument('--threshold', type=float, default=1.2, help='ratio reported as slower')
+    command.add_argument('--min-seconds', type=float, default=0.001,
+                         help='differences smaller than this are never reported as slower')
+    args = parser.parse_args()
+    return run(args) if args.command == 'run' else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 
 
 class IStorage(ABC):
@@ -13,6 +14,13 @@ class IStorage(ABC):
         """
         pass
 
+    def iter_movies(self):
+        """
+        Yields the movies as (title, movie) tuples one at a time. Storages that can read
+        their movies lazily override this, the default goes through list_movies().
+        """
+        yield from self.list_movies().items()
+
     @abstractmethod
     def add_movie(self, title, year, rating, poster, imdb_url):
         """
@@ -33,3 +41,36 @@ class IStorage(ABC):
         Should update a movie with given title and notes.
         """
         pass
+
+    @contextmanager
+    def batch(self):
+        """
+        Groups the mutations made inside the with block so they are stored together, all or
+        nothing. The default applies every mutation right away; storages that can defer their
+        writes override this.
+        """
+        yield self
+
+    def add_many(self, new_movies):
+        """
+        Adds many movies given as (title, year, rating, poster, imdb_url) tuples in one batch.
+        """
+        with self.batch():
+            for movie in new_movies:
+                self.add_movie(*movie)
+
+    def delete_many(self, titles):
+        """
+        Deletes the movies with the given titles in one batch.
+        """
+        with self.batch():
+            for title in titles:
+                self.delete_movie(title)
+
+    def update_many(self, notes):
+        """
+        Updates the notes of many movies given as (title, notes) tuples in one batch.
+        """
+        with self.batch():
+            for title, new_note in notes:
+                self.update_movie(title, new_note)
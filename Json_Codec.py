@@ -0,0 +1,136 @@
+import gzip
+import io
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+class StdlibCodec:
+    """JSON through the json module of the standard library."""
+
+    name = 'json'
+
+    @staticmethod
+    def loads(data):
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj, indent=None):
+        # default=dict serializes a MovieCatalogue and its records one movie at a time
+        separators = None if indent else (',', ':')
+        return json.dumps(obj, indent=indent, separators=separators, default=dict).encode('utf-8')
+
+
+class OrjsonCodec:
+    """JSON through orjson. orjson only indents by 2, any indent selects that when it is named."""
+
+    name = 'orjson'
+
+    @staticmethod
+    def loads(data):
+        return orjson.loads(data)
+
+    @staticmethod
+    def dumps(obj, indent=None):
+        return orjson.dumps(obj, default=dict, option=orjson.OPT_INDENT_2 if indent else 0)
+
+
+class UjsonCodec:
+    """JSON through ujson."""
+
+    name = 'ujson'
+
+    @staticmethod
+    def loads(data):
+        return ujson.loads(data)
+
+    @staticmethod
+    def dumps(obj, indent=None):
+        return ujson.dumps(obj, indent=indent or 0, ensure_ascii=False, escape_forward_slashes=False,
+                           default=dict).encode('utf-8')
+
+
+CODECS = {'json': StdlibCodec, 'orjson': OrjsonCodec, 'ujson': UjsonCodec}
+
+
+def available_codecs():
+    """Returns the names of the codecs that can be used, fastest first."""
+    names = []
+    if orjson is not None:
+        names.append('orjson')
+    if ujson is not None:
+        names.append('ujson')
+    names.append('json')
+    return names
+
+
+def get_codec(name=None, indent=None):
+    """
+    Returns the codec with the given name, or if name is None the fastest available one that
+    writes indent like the json module does. Files indented by anything but 2 keep the json module.
+    """
+    if name is None:
+        if indent is None:
+            name = available_codecs()[0]
+        elif indent == 2 and orjson is not None:
+            name = 'orjson'
+        else:
+            name = 'json'
+    if name not in available_codecs():
+        raise RuntimeError(f"JSON codec '{name}' is not available.")
+    return CODECS[name]
+
+
+def compression(path):
+    """Returns the compression of a file by its extension: 'gzip', 'zstd' or None."""
+    if path.endswith('.gz'):
+        return 'gzip'
+    if path.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError("Reading and writing .zst files needs zstandard, install it with 'pip install zstandard'.")
+        return 'zstd'
+    return None
+
+
+def open_binary(path, mode='rb', kind=None):
+    """Opens a file for binary reading ('rb') or writing ('wb') with the given compression."""
+    if kind == 'gzip':
+        return gzip.open(path, mode, compresslevel=6)
+    if kind == 'zstd':
+        file = open(path, mode)
+        if mode == 'rb':
+            return zstandard.ZstdDecompressor().stream_reader(file, closefd=True)
+        return zstandard.ZstdCompressor().stream_writer(file, closefd=True)
+    return open(path, mode)
+
+
+def open_text(path, kind=None):
+    """Opens a file for reading text with the given compression."""
+    if kind is None:
+        return open(path, 'r', encoding='utf-8')
+    return io.TextIOWrapper(open_binary(path, 'rb', kind), encoding='utf-8')
+
+
+def read_json(path, codec, kind=None):
+    """Reads and decodes a JSON file with the given compression."""
+    with open_binary(path, 'rb', kind) as file:
+        return codec.loads(file.read())
+
+
+def write_json(path, obj, codec, indent=None, kind=None):
+    """Encodes and writes a JSON file with the given compression."""
+    with open_binary(path, 'wb', kind) as file:
+        file.write(codec.dumps(obj, indent))
@@ -0,0 +1,86 @@
+import argparse
+import http.client
+import json
+import random
+import threading
+import time
+from urllib.parse import quote, urlsplit
+
+READ_PATHS = ['/stats', '/sorted?limit=10', '/movies?limit=20', '/movies?min_rating=8&limit=20', '/search?q=the&limit=20']
+
+
+def percentile(latencies, fraction):
+    """Returns the latency below which the given fraction of the sorted latencies lie."""
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+
+def worker(host, port, paths, titles, write_ratio, deadline, seed, results):
+    """Sends requests over one keep-alive connection until the deadline, recording
+    (latency, status) of each."""
+    rng = random.Random(seed)
+    connection = http.client.HTTPConnection(host, port)
+    while time.perf_counter() < deadline:
+        if titles and rng.random() < write_ratio:
+            method, path = 'PATCH', '/movies/' + quote(rng.choice(titles), safe='')
+            body = json.dumps({'notes': f"note {rng.random()}"})
+        else:
+            method, path, body = 'GET', rng.choice(paths), None
+        start = time.perf_counter()
+        connection.request(method, path, body, {'Content-Type': 'application/json'} if body else {})
+        response = connection.getresponse()
+        response.read()
+        results.append((time.perf_counter() - start, response.status))
+    connection.close()
+
+
+def main():
+    """
+        Measures requests per second and latency percentiles of a running API server.
+
+        How to use it:
+            python3 main.py movies.json serve &
+            python3 Load_Test_Server.py --url http://127.0.0.1:8000 --clients 16 --seconds 10
+            python3 Load_Test_Server.py --write-ratio 0.05 --paths /stats "/sorted?limit=10"
+        """
+    parser = argparse.ArgumentParser(description='API server load test')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent connections')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--paths', nargs='*', default=READ_PATHS, help='GET requests to pick from')
+    parser.add_argument('--write-ratio', type=float, default=0.0,
+                        help='fraction of the requests updating the notes of a random movie')
+    args = parser.parse_args()
+
+    url = urlsplit(args.url)
+    titles = []
+    if args.write_ratio:
+        connection = http.client.HTTPConnection(url.hostname, url.port)
+        connection.request('GET', '/movies?limit=1000')
+        titles = [movie['title'] for movie in json.loads(connection.getresponse().read())]
+        connection.close()
+
+    results = []
+    deadline = time.perf_counter() + args.seconds
+    threads = [threading.Thread(target=worker, args=(url.hostname, url.port, args.paths, titles,
+                                                     args.write_ratio, deadline, seed, results))
+               for seed in range(args.clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    if not results:
+        print("No requests completed.")
+        return
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, status in results if status >= 400)
+    print(f"{len(results)} requests in {elapsed:.1f}s with {args.clients} clients, {errors} errors")
+    print(f"Requests per second: {len(results) / elapsed:.0f}")
+    print(f"Latency ms: p50 {percentile(latencies, 0.5) * 1000:.2f}  p90 {percentile(latencies, 0.9) * 1000:.2f}  "
+          f"p99 {percentile(latencies, 0.99) * 1000:.2f}  max {latencies[-1] * 1000:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import json
+import math
+import os
+from Movie_Stats import MovieStats, median_of_counts
+
+
+class MovieAggregates:
+    """
+    Running aggregates of a catalogue, updated on every add and delete.
+
+    Keeps the count, the sum and sum of squares of the ratings, the number of movies per
+    rating (rounded to `resolution` decimals like StatsAccumulator) for the median, the best
+    and worst movie, and the movies per year and per rating bucket. stats() answers without
+    looking at the catalogue. Of equally rated movies the first in the catalogue is the best
+    or worst one, as with max() and min() over the movies. Removing the best or worst movie
+    leaves it to be found again by update_extremes().
+    """
+
+    def __init__(self, movies=None, resolution=3):
+        self.resolution = resolution
+        self.count = 0
+        self.rating_sum = 0.0
+        self.rating_squares = 0.0
+        self.rating_counts = {}
+        self.year_counts = {}
+        self.histogram = {}
+        self.best = None
+        self.worst = None
+        self.extremes_stale = False
+        if movies:
+            for title, movie in movies.items():
+                self.add(title, movie)
+
+    def _count(self, movie, sign):
+        """Adds (sign 1) or removes (sign -1) a movie from the sums and counters."""
+        rating = movie['rating']
+        self.count += sign
+        self.rating_sum += sign * rating
+        self.rating_squares += sign * rating * rating
+        for counts, key in ((self.year_counts, movie['year']), (self.histogram, math.floor(rating)),
+                            (self.rating_counts, round(rating, self.resolution))):
+            counts[key] = counts.get(key, 0) + sign
+            if not counts[key]:
+                del counts[key]
+
+    def _compare(self, title, rating):
+        """Makes the movie the best or worst one if it is rated higher or lower than the current."""
+        if self.best is None or rating > self.best[1]:
+            self.best = (title, rating)
+        if self.worst is None or rating < self.worst[1]:
+            self.worst = (title, rating)
+
+    def add(self, title, movie):
+        """Adds a movie to the aggregates."""
+        self._count(movie, 1)
+        if not self.extremes_stale:
+            self._compare(title, movie['rating'])
+
+    def remove(self, title, movie):
+        """Removes a movie from the aggregates."""
+        self._count(movie, -1)
+        if (self.best and self.best[0] == title) or (self.worst and self.worst[0] == title):
+            self.extremes_stale = True
+
+    def update_extremes(self, movies):
+        """Finds the best and worst movie of the catalogue again if one of them was removed."""
+        if not self.extremes_stale:
+            return
+        self.best = self.worst = None
+        for title, movie in movies.items():
+            self._compare(title, movie['rating'])
+        self.extremes_stale = False
+
+    def median(self):
+        """Returns the median rating."""
+        return median_of_counts(self.rating_counts, self.count)
+
+    def stats(self):
+        """Returns the statistics of the catalogue as a MovieStats object."""
+        count = self.count
+        if not count:
+            return MovieStats(0, 0.0, 0.0, 0.0, None, None, {})
+        if self.extremes_stale:
+            raise RuntimeError("The best and worst movie need update_extremes() after a removal.")
+        average = self.rating_sum / count
+        return MovieStats(
+            count=count,
+            average=average,
+            median=self.median(),
+            std_dev=math.sqrt(max(0.0, self.rating_squares / count - average * average)),
+            best=self.best,
+            worst=self.worst,
+            histogram=dict(sorted(self.histogram.items())),
+        )
+
+    def save(self, aggregates_file, signature):
+        """Stores the aggregates together with the signature of the data file they describe. Only
+        the sums and counters are stored, their size doesn't grow with the catalogue."""
+        temp_file = aggregates_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            json.dump({
+                'signature': list(signature) if signature else None,
+                'resolution': self.resolution,
+                'count': self.count,
+                'rating_sum': self.rating_sum,
+                'rating_squares': self.rating_squares,
+                'ratings': list(self.rating_counts.items()),
+                'years': list(self.year_counts.items()),
+                'histogram': list(self.histogram.items()),
+                'best': self.best,
+                'worst': self.worst,
+            }, file)
+        os.replace(temp_file, aggregates_file)
+
+    @classmethod
+    def load(cls, aggregates_file, signature):
+        """Loads stored aggregates. Returns None if there are none, they don't match the signature
+        of the data file or they are inconsistent."""
+        try:
+            with open(aggregates_file, 'r', encoding='utf-8') as file:
+                stored = json.load(file)
+        except (FileNotFoundError, ValueError):
+            return None
+        if signature is None or stored.get('signature') != list(signature) or 'ratings' not in stored:
+            return None
+        aggregates = cls(resolution=stored['resolution'])
+        aggregates.count = stored['count']
+        aggregates.rating_sum = stored['rating_sum']
+        aggregates.rating_squares = stored['rating_squares']
+        aggregates.rating_counts = {rating: count for rating, count in stored['ratings']}
+        aggregates.year_counts = {year: count for year, count in stored['years']}
+        aggregates.histogram = {bucket: count for bucket, count in stored['histogram']}
+        aggregates.best = tuple(stored['best']) if stored['best'] else None
+        aggregates.worst = tuple(stored['worst']) if stored['worst'] else None
+        if not (sum(aggregates.year_counts.values()) == sum(aggregates.rating_counts.values()) == aggregates.count):
+            return None
+        return aggregates
@@ -0,0 +1,105 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _require_numpy():
+    """Raises a RuntimeError if NumPy is not installed."""
+    if np is None:
+        raise RuntimeError("The analytics need NumPy, install it with 'pip install numpy'.")
+
+
+class MovieAnalytics:
+    """
+    Vectorized queries over the year and rating columns of a catalogue.
+
+    The columns are copied once into NumPy arrays, after which filters, the average rating
+    per period and rating histograms are single array operations instead of loops over the
+    movies. Requires NumPy.
+    """
+
+    def __init__(self, titles, years, ratings):
+        _require_numpy()
+        self.titles = titles
+        self.years = np.array(years, dtype=np.int32)
+        self.ratings = np.array(ratings, dtype=np.float64)
+
+    @classmethod
+    def from_movies(cls, movies):
+        """Builds the columns from a dictionary of movies, without copying them row by row if it is
+        a MovieCatalogue."""
+        columns = getattr(movies, 'columns', None)
+        if columns is not None:
+            return cls(*columns())
+        _require_numpy()
+        titles = list(movies)
+        years = np.fromiter((movie['year'] for movie in movies.values()), dtype=np.int32, count=len(titles))
+        ratings = np.fromiter((movie['rating'] for movie in movies.values()), dtype=np.float64, count=len(titles))
+        return cls(titles, years, ratings)
+
+    @classmethod
+    def from_storage(cls, storage):
+        """Builds the columns from a storage, through its columns() query if it has one."""
+        columns = getattr(storage, 'columns', None)
+        if columns is not None:
+            return cls(*columns())
+        return cls.from_movies(storage.list_movies())
+
+    def __len__(self):
+        return len(self.titles)
+
+    def _mask(self, min_rating=None, max_rating=None, start_year=None, end_year=None):
+        """Returns the boolean mask of the movies within the given ranges (bounds are inclusive)."""
+        mask = np.ones(len(self.titles), dtype=bool)
+        if min_rating is not None:
+            mask &= self.ratings >= min_rating
+        if max_rating is not None:
+            mask &= self.ratings <= max_rating
+        if start_year is not None:
+            mask &= self.years >= start_year
+        if end_year is not None:
+            mask &= self.years <= end_year
+        return mask
+
+    def count(self, min_rating=None, max_rating=None, start_year=None, end_year=None):
+        """Returns the number of movies within the given rating and year ranges."""
+        return int(np.count_nonzero(self._mask(min_rating, max_rating, start_year, end_year)))
+
+    def filter(self, min_rating=None, max_rating=None, start_year=None, end_year=None, limit=None):
+        """Returns (title, year, rating) of the movies within the given rating and year ranges,
+        best rated first, only the first limit of them if given."""
+        positions = np.flatnonzero(self._mask(min_rating, max_rating, start_year, end_year))
+        positions = positions[np.argsort(-self.ratings[positions], kind='stable')][:limit]
+        return [(self.titles[position], int(self.years[position]), float(self.ratings[position]))
+                for position in positions]
+
+    def _selected(self, min_rating, max_rating, start_year, end_year):
+        """Returns the years and ratings of the movies within the given ranges."""
+        if all(value is None for value in (min_rating, max_rating, start_year, end_year)):
+            return self.years, self.ratings
+        mask = self._mask(min_rating, max_rating, start_year, end_year)
+        return self.years[mask], self.ratings[mask]
+
+    def average_by_period(self, period=10, min_rating=None, max_rating=None, start_year=None, end_year=None):
+        """Returns {first year of the period: (movie count, average rating)}, e.g. per decade,
+        optionally for the movies within the given ranges only."""
+        years, ratings = self._selected(min_rating, max_rating, start_year, end_year)
+        if not len(years):
+            return {}
+        periods = years // period
+        first = int(periods.min())
+        counts = np.bincount(periods - first)
+        sums = np.bincount(periods - first, weights=ratings)
+        return {
+            int(first + offset) * period: (int(counts[offset]), float(sums[offset] / counts[offset]))
+            for offset in np.flatnonzero(counts)
+        }
+
+    def histogram(self, bins=10, low=0.0, high=10.0, min_rating=None, max_rating=None,
+                  start_year=None, end_year=None):
+        """Returns (lower bound, upper bound, movie count) of the rating bins, optionally for
+        the movies within the given ranges only."""
+        _, ratings = self._selected(min_rating, max_rating, start_year, end_year)
+        counts, edges = np.histogram(ratings, bins=bins, range=(low, high))
+        return [(float(edges[number]), float(edges[number + 1]), int(count)) for number, count in enumerate(counts)]
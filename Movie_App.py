@@ -1,63 +1,87 @@
-import random
-import requests
-from config import API_KEY
+import heapq
+from contextlib import closing
+
+from config import (API_KEY, OMDB_CACHE_FILE, OMDB_CACHE_MAX_ENTRIES, OMDB_CACHE_NEGATIVE_TTL, OMDB_CACHE_TTL,
+                    OMDB_IMPORT_WORKERS, OMDB_MAX_RETRIES, OMDB_REQUESTS_PER_SECOND, OMDB_TIMEOUT,
+                    SORTED_PAGE_SIZE, WEBSITE_OUTPUT_DIR, WEBSITE_PAGE_SIZE, WEBSITE_PAGES_BY_RATING,
+                    WEBSITE_PAGES_BY_YEAR, WEBSITE_PROCESSES)
+from Movie_Analytics import MovieAnalytics
+from Movie_Sampling import random_movies
+from Movie_Stats import compute_stats
+from Omdb_Cache import OmdbCache
+from Omdb_Client import OmdbClient
+from Website_Generator import WebsiteGenerator
 
 
 class MovieApp:
-    def __init__(self, storage):
+    def __init__(self, storage, omdb_client=None):
         """Initializes a MovieApp object with the provided storage."""
         self.storage = storage
         self.OMDB_API_KEY = API_KEY
+        if omdb_client is None:
+            cache = OmdbCache(OMDB_CACHE_FILE, ttl=OMDB_CACHE_TTL, negative_ttl=OMDB_CACHE_NEGATIVE_TTL,
+                              max_entries=OMDB_CACHE_MAX_ENTRIES)
+            omdb_client = OmdbClient(API_KEY, requests_per_second=OMDB_REQUESTS_PER_SECOND,
+                                     max_retries=OMDB_MAX_RETRIES, timeout=OMDB_TIMEOUT, cache=cache)
+        self.omdb = omdb_client
 
     def search_movie_from_omdb(self, title):
         """Searches for a movie on OMDB API based on the title and returns the movie data if found.
         Uses the API_KEY from the config.py"""
-        response = requests.get(f"http://www.omdbapi.com/?apikey={self.OMDB_API_KEY}&t={title}")
-        if response.status_code == 200:
-            data = response.json()
-            if data['Response'] == 'True':
-                return data
-            else:
-                print("Movie not found.")
-        else:
-            print("Error while connecting to the OMDb API.")
+        try:
+            data = self.omdb.fetch(title=title)
+        except RuntimeError as e:
+            print(str(e))
+            return None
+        if data.get('Response') == 'True':
+            return data
+        print("Movie not found.")
         return None
 
+    @staticmethod
+    def _parse_omdb_movie(movie_data):
+        """
+        Converts OMDb movie data into a (title, year, rating, poster, imdb_url) tuple.
+        Raises ValueError if information is missing or not numeric.
+        """
+        year = movie_data.get("Year")
+        rating = movie_data.get("imdbRating")
+        poster = movie_data.get("Poster")
+        imdb_id = movie_data.get("imdbID")
+        if not year or not rating or not poster or not imdb_id:
+            raise ValueError("The movie data from the OMDb API is missing some necessary information.")
+        try:
+            year = int(year)
+            rating = float(rating)
+        except ValueError:
+            raise ValueError("Couldn't convert Year or imdbRating to numeric types.")
+        return movie_data['Title'], year, rating, poster, f"https://www.imdb.com/title/{imdb_id}/"
+
     def _command_list_movies(self):
         """
         Gets and Prints a list of the movies stored in the database.
         """
-        movies = self.storage.list_movies()
-        if not movies:
+        found = False
+        for movie, data in self.storage.iter_movies():
+            print(f"{movie} ({data['year']}) - Rating: {data['rating']}")
+            found = True
+        if not found:
             print("No movies found in the database.")
-        else:
-            for movie, data in movies.items():
-                print(f"{movie} ({data['year']}) - Rating: {data['rating']}")
 
     def _command_add_movie(self):
         """
         Adds a new movie to the database from OMDB.
         """
         title = input("Enter the new movie name: ")
-        movies = self.storage.list_movies()
-        if any(movie_title.lower() == title.lower() for movie_title in movies):
+        if self._find_title(title) is not None:
             print("The movie already exists in the database.")
             return
         movie_data = self.search_movie_from_omdb(title)
         if movie_data and title.lower() == movie_data['Title'].lower():
-            year = movie_data.get("Year")
-            rating = movie_data.get("imdbRating")
-            poster = movie_data.get("Poster")
-            imdb_id = movie_data.get("imdbID")
-            imdb_url = f"https://www.imdb.com/title/{imdb_id}/"
-            if not year or not rating or not poster or not imdb_id:
-                print("The movie data from the OMDb API is missing some necessary information.")
-                return
             try:
-                year = int(year)
-                rating = float(rating)
-            except ValueError:
-                print("Couldn't convert Year or imdbRating to numeric types.")
+                _, year, rating, poster, imdb_url = self._parse_omdb_movie(movie_data)
+            except ValueError as e:
+                print(str(e))
                 return
             print("\n************")
             print("Movie Found:")
@@ -77,14 +101,111 @@ class MovieApp:
             except RuntimeError as e:
                 print(str(e))
 
+    @staticmethod
+    def _read_import_queries(import_file):
+        """
+        Reads the titles or IMDb IDs to import, one per line. Blank lines and lines starting
+        with # are skipped, as are repeated entries.
+        """
+        with open(import_file, 'r', encoding='utf-8') as file:
+            return MovieApp._import_queries(file)
+
+    @staticmethod
+    def _import_queries(lines):
+        """Returns the titles or IMDb IDs in the given lines, skipped as by _read_import_queries."""
+        queries = (line.strip() for line in lines)
+        return list(dict.fromkeys(query for query in queries if query and not query.startswith('#')))
+
+    def import_movies_from_file(self, import_file, workers=OMDB_IMPORT_WORKERS):
+        """
+        Resolves the titles or IMDb IDs listed in import_file concurrently through OMDb and adds the
+        found movies to the storage in a single bulk write.
+        Returns a (added, skipped, failed) tuple of title lists, failed holding (query, reason) tuples.
+        """
+        return self.import_movies(self._read_import_queries(import_file), workers)
+
+    def import_movies(self, queries, workers=OMDB_IMPORT_WORKERS):
+        """
+        Resolves the given titles or IMDb IDs concurrently through OMDb and adds the found movies
+        to the storage in a single bulk write. Returns the same tuple as import_movies_from_file.
+        """
+        skipped = [query for query in queries if self._find_title(query) is not None]
+        already_stored = set(skipped)
+        to_fetch = [query for query in queries if query not in already_stored]
+        new_movies = {}
+        failed = []
+        for query, movie_data, error in self.omdb.fetch_many(to_fetch, workers):
+            if error:
+                failed.append((query, error))
+            elif movie_data.get('Response') != 'True':
+                failed.append((query, "Movie not found."))
+            else:
+                try:
+                    movie = self._parse_omdb_movie(movie_data)
+                except ValueError as e:
+                    failed.append((query, str(e)))
+                    continue
+                if self._find_title(movie[0]) is not None or movie[0].lower() in new_movies:
+                    skipped.append(movie[0])
+                else:
+                    new_movies[movie[0].lower()] = movie
+        add_many = getattr(self.storage, 'add_many', None)
+        if add_many is not None:
+            add_many(new_movies.values())
+        else:
+            for movie in new_movies.values():
+                self.storage.add_movie(*movie)
+        return [movie[0] for movie in new_movies.values()], skipped, failed
+
+    def _command_import_movies(self):
+        """
+        Imports the movies listed in a file (one title or IMDb ID per line) from OMDB.
+        """
+        import_file = input("Enter the path of the file with the titles or IMDb IDs to import: ")
+        try:
+            added, skipped, failed = self.import_movies_from_file(import_file)
+        except OSError as e:
+            print(f"Couldn't read the import file: {e}")
+            return
+        except RuntimeError as e:
+            print(str(e))
+            return
+        for query, reason in failed:
+            print(f"Couldn't import '{query}': {reason}")
+        print(f"Imported {len(added)} movies, skipped {len(skipped)} already in the database, "
+              f"{len(failed)} failed.")
+
+    def _find_title(self, title):
+        """
+        Returns the stored title matching the given title case-insensitively, or None.
+        Uses the storage lookup when the backend provides one.
+        """
+        find_title = getattr(self.storage, 'find_title', None)
+        if find_title is not None:
+            return find_title(title)
+        with closing(self.storage.iter_movies()) as movies:
+            return next((movie_title for movie_title, _ in movies if movie_title.lower() == title.lower()), None)
+
+    def _search_movies(self, query):
+        """
+        Returns the movies whose title contains the query case-insensitively as (title, properties)
+        tuples, best matches first. Uses the storage title index when the backend provides one,
+        otherwise the movies are streamed and matched in storage order.
+        """
+        search_movies = getattr(self.storage, 'search_movies', None)
+        if search_movies is not None:
+            return search_movies(query)
+        return ((movie, properties) for movie, properties in self.storage.iter_movies()
+                if query.lower() in movie.lower())
+
     def _command_delete_movie(self):
         """
         Deletes a movie from our database. The user is prompted for the name to delete and if he
         really wants to delete it.
         """
         title = input("Enter the movie name to delete: ").lower()
-        movies = self.storage.list_movies()
-        matches = [(movie, properties['year']) for movie, properties in movies.items() if title in movie.lower()]
+        movies = dict(self._search_movies(title))
+        matches = [(movie, properties['year']) for movie, properties in movies.items()]
         if not matches:
             print(f"No movies found with the name '{title}'.")
         else:
@@ -94,7 +215,10 @@ class MovieApp:
                 print("Multiple movies found with the given name:")
                 for i, match in enumerate(matches, start=1):
                     print(f"{i}. {match[0]} ({match[1]})")
-                choice = input("Enter the number of the movie to delete (0 to cancel): ")
+                choice = input("Enter the number of the movie to delete, 'a' for all of them (0 to cancel): ")
+                if choice.lower() == "a":
+                    self._delete_all_matches(matches)
+                    return
                 if choice.isdigit() and 0 < int(choice) <= len(matches):
                     selected_movie = matches[int(choice) - 1]
                 else:
@@ -109,13 +233,22 @@ class MovieApp:
             else:
                 print("Deletion cancelled.")
 
+    def _delete_all_matches(self, matches):
+        """Deletes all the (title, year) matches in one batch after asking for confirmation."""
+        confirm = input(f"Are you sure you want to delete all {len(matches)} movies? (y/n): ")
+        if confirm.lower() == "y":
+            self.storage.delete_many([movie for movie, _ in matches])
+            print(f"{len(matches)} movies deleted successfully.")
+        else:
+            print("Deletion cancelled.")
+
     def _command_update_movie(self):
         """
         Updates a movie note. The user is prompted for the name and new note.
         """
         title = input("Enter the movie name: ").lower()
-        movies = self.storage.list_movies()
-        matches = [(movie, properties['year']) for movie, properties in movies.items() if title in movie.lower()]
+        movies = dict(self._search_movies(title))
+        matches = [(movie, properties['year']) for movie, properties in movies.items()]
         if not matches:
             print(f"No movies found with the name '{title}'.")
             add_movie = input("Would you like to add this movie instead? (y/n): ")
@@ -146,141 +279,246 @@ class MovieApp:
             else:
                 print("Update cancelled.")
 
-    @staticmethod
-    def _calculate_median(ratings):
+    def _get_highest_rated_movie(self):
         """
-        Calculates the median rating of the movies.
+        Get´s the highest rated movie from the database as a (title, properties) tuple, the first
+        of the rating index of the storage if it has one. Returns None if there are no movies.
         """
-        if not ratings:
-            return 0.0
-        ratings = sorted(ratings)
-        length = len(ratings)
-        if length % 2 == 0:
-            median = (ratings[length // 2 - 1] + ratings[length // 2]) / 2
-        else:
-            median = ratings[length // 2]
-        return median
+        movies = self._ranked_movies(1)
+        return movies[0] if movies else None
 
-    @staticmethod
-    def _calculate_average(movies):
+    def _get_lowest_rated_movie(self):
         """
-        Calculates the average rating of the movies.
+        Get´s the lowest rated movie from the database as a (title, properties) tuple, the last
+        of the rating index of the storage if it has one. Returns None if there are no movies.
         """
-        ratings = [properties['rating'] for properties in movies.values()]
-        if not ratings:
-            return 0.0
-        return sum(ratings) / len(ratings)
+        movies = self._ranked_movies(1, ascending=True)
+        return movies[0] if movies else None
 
-    @staticmethod
-    def _get_highest_rated_movie(movies):
+    def get_stats(self):
         """
-        Get´s the highest rated movie from the database.
+        Returns the rating statistics of the movies as a MovieStats object, computed in a single pass.
+        Uses the storage statistics when the backend provides them.
         """
-        if movies:
-            return max(movies.items(), key=lambda movie: movie[1]['rating'])[0]
-        return None
-
-    @staticmethod
-    def _get_lowest_rated_movie(movies):
-        """
-        Get´s the lowest rated movie from the database.
-        """
-        if movies:
-            return min(movies.items(), key=lambda movie: movie[1]['rating'])[0]
-        return None
+        stats = getattr(self.storage, 'stats', None)
+        if stats is not None:
+            return stats()
+        return compute_stats(self.storage.list_movies().items())
 
     def _command_stats_of_movies(self):
         """Displays statistics of the movies including average, median, highest and lowest rated movies."""
-        json_movies = self.storage.list_movies()
-        csv_movies = self.storage.list_movies()
-        movies = {**json_movies, **csv_movies}
-        if not movies:
+        stats = self.get_stats()
+        if not stats.count:
             print("No movies found in the database.")
         else:
-            ratings = sorted([properties['rating'] for properties in movies.values()])
-            median_rating = MovieApp._calculate_median(ratings)
-            average_rating = MovieApp._calculate_average(movies)
-            rounded_average_rating = round(average_rating, 3)
-            print(f"\nAverage rating: {rounded_average_rating}")
-            print(f"Median rating: {median_rating}")
-            highest_rated = MovieApp._get_highest_rated_movie(movies)
-            if highest_rated:
-                print(f"Best movie: {highest_rated} with a rating of {movies[highest_rated]['rating']}")
-            else:
-                print("No movies found in the database.")
-            lowest_rated = MovieApp._get_lowest_rated_movie(movies)
-            if lowest_rated:
-                print(f"Worst movie: {lowest_rated} with a rating of {movies[lowest_rated]['rating']}")
-            else:
-                print("No movies found in the database.")
+            print(f"\nAverage rating: {round(stats.average, 3)}")
+            print(f"Median rating: {stats.median}")
+            print(f"Standard deviation: {round(stats.std_dev, 3)}")
+            best, worst = self._get_highest_rated_movie(), self._get_lowest_rated_movie()
+            print(f"Best movie: {best[0]} with a rating of {best[1]['rating']}")
+            print(f"Worst movie: {worst[0]} with a rating of {worst[1]['rating']}")
+            print("Rating histogram:")
+            widest = max(stats.histogram.values())
+            for bucket, count in stats.histogram.items():
+                bar = "#" * max(1, round(count * 40 / widest))
+                print(f"{bucket:>3}-{bucket + 1:<3} {bar} {count}")
 
     def _command_random_movie(self):
         """Selects a random movie from the database and displays it along with its rating."""
-        movies = self.storage.list_movies()
-        if not movies:
+        picked = random_movies(self.storage)
+        if not picked:
             print("No movies found in the database.")
         else:
-            randomized_movie = random.choice(list(movies.keys()))
-            rating = movies[randomized_movie]["rating"]
-            print(f"Your movie for tonight: {randomized_movie} (rated {rating})")
+            randomized_movie, properties = picked[0]
+            print(f"Your movie for tonight: {randomized_movie} (rated {properties['rating']})")
 
     def _command_search_movie(self):
         """Searches for a movie based on the user query and displays it along with its rating and year."""
         user_query = input("Enter part of the movie name to search it: ")
-        movies = self.storage.list_movies()
         found = False
-        for movie, properties in movies.items():
-            if user_query.lower() in movie.lower():
-                print(f"{movie}, Rating: {properties['rating']}, Year: {properties['year']}")
-                found = True
+        for movie, properties in self._search_movies(user_query):
+            print(f"{movie}, Rating: {properties['rating']}, Year: {properties['year']}")
+            found = True
         if not found:
             print("No movies found with your given search query.")
 
+    def _movies_sorted_by_rating(self):
+        """
+        Returns the movies as (title, properties) tuples in descending rating order.
+        Uses the storage rating order when the backend provides one.
+        """
+        top_n = getattr(self.storage, 'top_n', None)
+        if top_n is not None:
+            return top_n()
+        movies = self.storage.list_movies()
+        return sorted(movies.items(), key=lambda item: item[1]['rating'], reverse=True)
+
+    def _ranked_movies(self, limit=None, ascending=False):
+        """
+        Returns the limit best rated movies (worst rated if ascending, all if limit is None) as
+        (title, properties) tuples. Uses the storage rating order when the backend provides one,
+        otherwise the movies are streamed through a bounded heap.
+        """
+        ranked = getattr(self.storage, 'bottom_n' if ascending else 'top_n', None)
+        if ranked is not None:
+            return ranked(limit)
+        key = (lambda item: item[1]['rating'])
+        if limit is None:
+            return sorted(self.storage.iter_movies(), key=key, reverse=not ascending)
+        if ascending:
+            return heapq.nsmallest(limit, self.storage.iter_movies(), key=key)
+        return heapq.nlargest(limit, self.storage.iter_movies(), key=key)
+
+    def _iter_movies_by_rating(self, page_size):
+        """
+        Yields the movies in descending rating order as pages of (title, properties) tuples.
+        Uses the storage rating index when the backend provides one.
+        """
+        iter_by_rating = getattr(self.storage, 'iter_by_rating', None)
+        if iter_by_rating is not None:
+            yield from iter_by_rating(page_size)
+            return
+        sorted_movies = self._movies_sorted_by_rating()
+        for start in range(0, len(sorted_movies), page_size):
+            yield sorted_movies[start:start + page_size]
+
     def _command_movies_sorted_by_rating(self):
-        """Sorts the movies by their rating in descending order and displays the sorted list."""
-        json_movies = self.storage.list_movies()
-        csv_movies = self.storage.list_movies()
-        movies = {**json_movies, **csv_movies}
-        if not movies:
+        """Displays the movies in descending rating order, one page at a time."""
+        pages = self._iter_movies_by_rating(SORTED_PAGE_SIZE)
+        page = next(pages, None)
+        if not page:
             print("No movies found in the database.")
-        else:
-            sorted_movies = sorted(movies.items(), key=lambda item: item[1]['rating'], reverse=True)
-            print(f"\nMovies sorted by rating:")
-            for movie, properties in sorted_movies:
+            return
+        print(f"\nMovies sorted by rating:")
+        while page:
+            for movie, properties in page:
                 print(f"{movie}: {properties['rating']}")
+            page = next(pages, None)
+            if page and input("Press enter for more movies or 'q' to stop: ").lower() == "q":
+                break
+
+    def _filter_movies(self, min_rating=None, max_rating=None, start_year=None, end_year=None):
+        """
+        Returns the movies within the given rating and year ranges, best rated first.
+        Uses the storage query when the backend provides one, the vectorized analytics otherwise
+        if NumPy is installed.
+        """
+        filter_movies = getattr(self.storage, 'filter_movies', None)
+        if filter_movies is not None:
+            return filter_movies(min_rating, max_rating, start_year, end_year)
+        movies = self.storage.list_movies()
+        try:
+            analytics = MovieAnalytics.from_movies(movies)
+        except RuntimeError:
+            analytics = None
+        if analytics is not None:
+            return {title: movies[title] for title, _, _ in analytics.filter(min_rating, max_rating, start_year, end_year)}
+        matches = {
+            movie: properties for movie, properties in movies.items()
+            if (min_rating is None or properties['rating'] >= min_rating)
+            and (max_rating is None or properties['rating'] <= max_rating)
+            and (start_year is None or properties['year'] >= start_year)
+            and (end_year is None or properties['year'] <= end_year)
+        }
+        return dict(sorted(matches.items(), key=lambda item: item[1]['rating'], reverse=True))
+
+    @staticmethod
+    def _ask_optional_number(prompt, convert):
+        """
+        Asks for a number, returns None if the input is left blank. Raises ValueError on invalid input.
+        """
+        answer = input(prompt).strip()
+        if not answer:
+            return None
+        return convert(answer)
+
+    def _command_filter_movies(self):
+        """Displays the movies within a rating range and a year range given by the user."""
+        try:
+            min_rating = self._ask_optional_number("Enter the minimum rating (blank for none): ", float)
+            max_rating = self._ask_optional_number("Enter the maximum rating (blank for none): ", float)
+            start_year = self._ask_optional_number("Enter the start year (blank for none): ", int)
+            end_year = self._ask_optional_number("Enter the end year (blank for none): ", int)
+        except ValueError:
+            print("Invalid input. Please enter a number.")
+            return
+        movies = self._filter_movies(min_rating, max_rating, start_year, end_year)
+        if not movies:
+            print("No movies found with the given filters.")
+        else:
+            for movie, properties in movies.items():
+                print(f"{movie} ({properties['year']}) - Rating: {properties['rating']}")
+
+    def _command_analytics(self):
+        """
+        Displays the number of movies, the average rating per decade and a rating histogram
+        for a rating range and a year range given by the user.
+        """
+        try:
+            analytics = MovieAnalytics.from_storage(self.storage)
+        except RuntimeError as e:
+            print(str(e))
+            return
+        if not len(analytics):
+            print("No movies found in the database.")
+            return
+        try:
+            min_rating = self._ask_optional_number("Enter the minimum rating (blank for none): ", float)
+            max_rating = self._ask_optional_number("Enter the maximum rating (blank for none): ", float)
+            start_year = self._ask_optional_number("Enter the start year (blank for none): ", int)
+            end_year = self._ask_optional_number("Enter the end year (blank for none): ", int)
+        except ValueError:
+            print("Invalid input. Please enter a number.")
+            return
+        filters = (min_rating, max_rating, start_year, end_year)
+        count = analytics.count(*filters)
+        print(f"\n{count} movies match the filters.")
+        if not count:
+            return
+        print("Average rating per decade:")
+        for decade, (movies, average) in analytics.average_by_period(10, *filters).items():
+            print(f"{decade}s: {round(average, 2)} ({movies} movies)")
+        print("Rating histogram:")
+        histogram = analytics.histogram(10, 0.0, 10.0, *filters)
+        # the filters can leave no rating within 0 to 10
+        widest = max(count for _, _, count in histogram) or 1
+        for low, high, count in histogram:
+            bar = "#" * round(count * 40 / widest)
+            print(f"{low:>4.0f}-{high:<4.0f} {bar} {count}")
 
     def _command_generate_website(self):
         """
         Generate a movie list website based on the movies stored in the movies. files.
+        The website is only rendered again if the movies changed since the last time.
+        """
+        with closing(self.storage.iter_movies()) as movies:
+            empty = next(movies, None) is None
+        if empty:
+            print("No movies found in the database.")
+            return
+        if WebsiteGenerator().generate(self.storage.iter_movies, incremental=True):
+            print("Website generated!")
+        else:
+            print("Website is up to date.")
+
+    def _command_generate_paginated_website(self):
+        """
+        Generate a paginated movie website with pages per year and per rating into the output
+        directory from the config.py. Only the pages whose movies changed since the last time are
+        rendered again.
         """
         movies = self.storage.list_movies()
         if not movies:
             print("No movies found in the database.")
             return
-        movie_grid = ""
-        for movie, properties in movies.items():
-            note = properties.get("notes", "")
-            note_html = f"<div class='movie-note'>{note}</div>" if note else ""
-            poster_url = properties.get("poster_url", "https://via.placeholder.com/150")
-            imdb_url = properties.get("imdb_url", "#")
-            movie_rating = properties.get("rating", "N/A")
-            movie_year = properties.get("year", "N/A")
-            movie_grid += (
-                f'<li><div class="movie">'
-                f'<a href="{imdb_url}" target="_blank">'
-                f'<img src="{poster_url}" alt="{movie} Poster" class="movie-poster">'
-                f'</a><div class="movie-details">'
-                f'<div class="movie-title">{movie} ({movie_year})</div>'
-                f'<div class="movie-rating">Rating: {movie_rating}</div>{note_html}'
-                f'</div></div></li>'
-            )
-        with open("index_template.html", "r") as file:
-            template = file.read()
-        template = template.replace("__TEMPLATE_TITLE__", "My Favorite Movies")
-        template = template.replace("__TEMPLATE_MOVIE_GRID__", movie_grid)
-        with open("index.html", "w") as file:
-            file.write(template)
-        print("Website generated!")
+        page_count = WebsiteGenerator().generate_pages(
+            movies.items(), WEBSITE_OUTPUT_DIR, page_size=WEBSITE_PAGE_SIZE, by_year=WEBSITE_PAGES_BY_YEAR,
+            by_rating=WEBSITE_PAGES_BY_RATING, processes=WEBSITE_PROCESSES, incremental=True
+        )
+        if page_count:
+            print(f"{page_count} pages of the website generated in {WEBSITE_OUTPUT_DIR}!")
+        else:
+            print(f"Website in {WEBSITE_OUTPUT_DIR} is up to date.")
 
     def run(self):
         """
@@ -300,8 +538,12 @@ class MovieApp:
                 print("7. Search a movie")
                 print("8. Movies sorted by their rating")
                 print("9. Generate website")
+                print("10. Filter movies by rating and year")
+                print("11. Import movies from a file")
+                print("12. Generate paginated website")
+                print("13. Rating analytics")
                 try:
-                    choice_of_the_user = int(input("Enter a choice (0-9): "))
+                    choice_of_the_user = int(input("Enter a choice (0-13): "))
                 except ValueError:
                     print("Invalid input. Please enter a number.")
                     continue
@@ -330,8 +572,20 @@ class MovieApp:
                     except IOError:
                         print(
                             "An error occurred trying to generate the website. Make sure the template exists/readable.")
+                elif choice_of_the_user == 10:
+                    self._command_filter_movies()
+                elif choice_of_the_user == 11:
+                    self._command_import_movies()
+                elif choice_of_the_user == 12:
+                    try:
+                        self._command_generate_paginated_website()
+                    except IOError:
+                        print(
+                            "An error occurred trying to generate the website. Make sure the template exists/readable.")
+                elif choice_of_the_user == 13:
+                    self._command_analytics()
                 else:
-                    print("Invalid choice. Enter a number between 0 and 9.")
+                    print("Invalid choice. Enter a number between 0 and 13.")
                 input("\nPress enter to continue: ")
         except Exception as e:
             print("An unexpected error occurred:")
@@ -0,0 +1,304 @@
+import sys
+from array import array
+from collections.abc import Mapping, MutableMapping
+
+FIELDS = ('title', 'year', 'rating', 'poster_url', 'imdb_url', 'notes')
+STRING_FIELDS = ('poster_url', 'imdb_url', 'notes')
+
+
+class StringTable:
+    """
+    Strings stored back to back as UTF-8 in a single bytearray and addressed by row.
+
+    Everything up to the last '/' of a string is kept once in a table of prefixes, so URLs
+    that only differ in their last path segment cost little more than that segment.
+    Replacing a string with a longer one appends the new bytes. The bytes left unused are
+    counted and dropped by reclaim() once they make up half of the table (at least
+    RECLAIM_MIN_BYTES), which keeps the rows, or by compact().
+    """
+
+    RECLAIM_MIN_BYTES = 64 * 1024
+
+    def __init__(self):
+        self._data = bytearray()
+        self._unused = 0
+        self._starts = array('Q')
+        self._lengths = array('I')
+        self._prefix_ids = array('H')
+        self._prefixes = ['']
+        self._prefix_lookup = {'': 0}
+
+    def _split(self, text):
+        """Returns the prefix id and the encoded rest of a string."""
+        cut = text.rfind('/', 0, len(text) - 1) + 1
+        prefix_id = self._prefix_lookup.get(text[:cut])
+        if prefix_id is None:
+            if len(self._prefixes) > 0xFFFF:
+                return 0, text.encode('utf-8')
+            prefix_id = self._prefix_lookup[text[:cut]] = len(self._prefixes)
+            self._prefixes.append(text[:cut])
+        return prefix_id, text[cut:].encode('utf-8')
+
+    def append(self, text):
+        """Adds a string as a new row."""
+        prefix_id, encoded = self._split(text)
+        self._prefix_ids.append(prefix_id)
+        self._starts.append(len(self._data))
+        self._lengths.append(len(encoded))
+        self._data += encoded
+
+    def extend(self, other):
+        """Appends all the rows of another table, copying its bytes in one piece."""
+        prefix_ids = []
+        for prefix in other._prefixes:
+            prefix_id = self._prefix_lookup.get(prefix)
+            if prefix_id is None:
+                if len(self._prefixes) > 0xFFFF:
+                    # no room for more prefixes, the rows are added one by one with their full text
+                    for row in range(len(other._starts)):
+                        self.append(other[row])
+                    return
+                prefix_id = self._prefix_lookup[prefix] = len(self._prefixes)
+                self._prefixes.append(prefix)
+            prefix_ids.append(prefix_id)
+        base = len(self._data)
+        self._data += other._data
+        self._unused += other._unused
+        self._starts.extend(map(base.__add__, other._starts) if base else other._starts)
+        self._lengths.extend(other._lengths)
+        if prefix_ids == list(range(len(prefix_ids))):
+            self._prefix_ids.extend(other._prefix_ids)
+        else:
+            self._prefix_ids.extend(map(prefix_ids.__getitem__, other._prefix_ids))
+
+    def __getitem__(self, row):
+        start = self._starts[row]
+        rest = self._data[start:start + self._lengths[row]].decode('utf-8')
+        return self._prefixes[self._prefix_ids[row]] + rest
+
+    def __setitem__(self, row, text):
+        prefix_id, encoded = self._split(text)
+        if len(encoded) <= self._lengths[row]:
+            start = self._starts[row]
+            self._data[start:start + len(encoded)] = encoded
+            self._unused += self._lengths[row] - len(encoded)
+        else:
+            self._starts[row] = len(self._data)
+            self._data += encoded
+            self._unused += self._lengths[row]
+        self._lengths[row] = len(encoded)
+        self._prefix_ids[row] = prefix_id
+        if self._unused >= max(self.RECLAIM_MIN_BYTES, len(self._data) // 2):
+            self.reclaim()
+
+    def reclaim(self):
+        """Rewrites the bytes of all rows back to back, dropping the unused ones. Rows keep their
+        numbers."""
+        data = bytearray()
+        starts = array('Q')
+        for start, length in zip(self._starts, self._lengths):
+            starts.append(len(data))
+            data += self._data[start:start + length]
+        self._data, self._starts = data, starts
+        self._unused = 0
+
+    def compact(self, rows):
+        """Returns a new table holding only the given rows, in that order."""
+        table = StringTable()
+        table._prefixes = self._prefixes
+        table._prefix_lookup = self._prefix_lookup
+        for row in rows:
+            start = self._starts[row]
+            table._prefix_ids.append(self._prefix_ids[row])
+            table._starts.append(len(table._data))
+            table._lengths.append(self._lengths[row])
+            table._data += self._data[start:start + self._lengths[row]]
+        return table
+
+
+class MovieRecord(Mapping):
+    """
+    Read and write view of a single movie of a MovieCatalogue, usable like a movie dictionary.
+    """
+
+    __slots__ = ('_catalogue', '_row', '_title')
+
+    def __init__(self, catalogue, row, title):
+        self._catalogue = catalogue
+        self._row = row
+        self._title = title
+
+    def __getitem__(self, field):
+        if field == 'title':
+            return self._title
+        if field == 'year':
+            return self._catalogue._years[self._row]
+        if field == 'rating':
+            return self._catalogue._ratings[self._row]
+        if field in STRING_FIELDS:
+            return self._catalogue._strings[field][self._row]
+        raise KeyError(field)
+
+    def __setitem__(self, field, value):
+        if field == 'year':
+            self._catalogue._years[self._row] = value
+        elif field == 'rating':
+            self._catalogue._ratings[self._row] = value
+        elif field in STRING_FIELDS:
+            self._catalogue._strings[field][self._row] = value
+        else:
+            raise KeyError(field)
+
+    def __iter__(self):
+        return iter(FIELDS)
+
+    def __len__(self):
+        return len(FIELDS)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        # Pickled (e.g. for worker processes) as a plain dictionary, not with the whole catalogue
+        return dict, (dict(self),)
+
+
+class MovieCatalogue(MutableMapping):
+    """
+    Compact, columnar movie catalogue with the interface of a dictionary of movies.
+
+    Years and ratings are kept in typed arrays, URLs and notes in StringTables and every
+    title only once (interned) as the key of the row map. Indexing returns a MovieRecord
+    view of the row. Deleted rows are left behind until compact() rewrites the columns.
+    """
+
+    def __init__(self, movies=None):
+        self._rows = {}
+        self._titles = []
+        self._years = array('h')
+        self._ratings = array('d')
+        self._strings = {field: StringTable() for field in STRING_FIELDS}
+        if movies:
+            for title, movie in movies.items():
+                self[title] = movie
+
+    def __getitem__(self, title):
+        return MovieRecord(self, self._rows[title], title)
+
+    def __setitem__(self, title, movie):
+        row = self._rows.get(title)
+        if row is not None:
+            record = MovieRecord(self, row, title)
+            for field in FIELDS[1:]:
+                record[field] = movie.get(field, '') if field in STRING_FIELDS else movie[field]
+            return
+        title = sys.intern(title)
+        self._rows[title] = len(self._years)
+        self._titles.append(title)
+        self._years.append(int(movie['year']))
+        self._ratings.append(float(movie['rating']))
+        for field in STRING_FIELDS:
+            self._strings[field].append(movie.get(field) or '')
+
+    def __delitem__(self, title):
+        self._titles[self._rows.pop(title)] = None
+
+    def extend(self, other):
+        """
+        Adds the movies of another catalogue as if they were set one by one in its order, but
+        copies the columns in bulk. A movie already in this catalogue keeps its position and takes
+        the values of the other one, its copied row is left behind like a deleted movie's.
+        """
+        other.compact()
+        base = len(self._years)
+        self._years.extend(other._years)
+        self._ratings.extend(other._ratings)
+        for field, table in self._strings.items():
+            table.extend(other._strings[field])
+        titles = list(map(sys.intern, other._titles))
+        if not self._rows or self._rows.keys().isdisjoint(titles):
+            self._rows.update(zip(titles, range(base, base + len(titles))))
+            self._titles.extend(titles)
+            return
+        for row, title in enumerate(titles):
+            if title in self._rows:
+                self[title] = MovieRecord(other, row, title)
+                self._titles.append(None)
+            else:
+                self._rows[title] = base + row
+                self._titles.append(title)
+
+    def __getstate__(self):
+        # pickled without the row map, which is rebuilt from the titles, so every title is sent once
+        titles, years, ratings = self.columns()
+        if len(titles) == len(self._titles):
+            return titles, years, ratings, self._strings
+        rows = list(self._rows.values())
+        return titles, years, ratings, {field: table.compact(rows) for field, table in self._strings.items()}
+
+    def __setstate__(self, state):
+        self._titles, self._years, self._ratings, self._strings = state
+        self._rows = dict(zip(self._titles, range(len(self._titles))))
+
+    def pop(self, title, *default):
+        """Removes a movie and returns it as a dictionary, since its row may be reused later."""
+        if title not in self._rows and default:
+            return default[0]
+        movie = dict(self[title])
+        del self[title]
+        return movie
+
+    def __iter__(self):
+        return iter(self._rows)
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, title):
+        return title in self._rows
+
+    def items(self):
+        """Returns (title, MovieRecord) pairs in insertion order."""
+        return ((title, MovieRecord(self, row, title)) for title, row in self._rows.items())
+
+    def values(self):
+        """Returns the MovieRecord views in insertion order."""
+        return (MovieRecord(self, row, title) for title, row in self._rows.items())
+
+    def compact(self):
+        """Rewrites the columns without the rows of deleted movies. Existing MovieRecord views
+        become invalid. Without deleted movies only the unused bytes of the strings are dropped,
+        which keeps the views valid."""
+        if len(self._rows) == len(self._years):
+            for table in self._strings.values():
+                if table._unused:
+                    table.reclaim()
+            return
+        rows = list(self._rows.values())
+        self._years = array('h', (self._years[row] for row in rows))
+        self._ratings = array('d', (self._ratings[row] for row in rows))
+        self._strings = {field: table.compact(rows) for field, table in self._strings.items()}
+        self._rows = {title: row for row, title in enumerate(self._rows)}
+        self._titles = list(self._rows)
+
+    def random_access(self):
+        """Returns the number of rows and a function returning the (title, MovieRecord) of a row,
+        or None for the row of a deleted movie."""
+        def movie_at(row):
+            title = self._titles[row]
+            return None if title is None else (title, MovieRecord(self, row, title))
+        return len(self._titles), movie_at
+
+    def columns(self):
+        """Returns the titles, years and ratings of the movies as a list and two arrays, aligned
+        and in insertion order. If movies were deleted the arrays are copies without their rows,
+        the catalogue itself is left as it is so MovieRecord views held elsewhere stay valid."""
+        if len(self._rows) == len(self._years):
+            return list(self._rows), self._years, self._ratings
+        rows = list(self._rows.values())
+        return (list(self._rows), array('h', map(self._years.__getitem__, rows)),
+                array('d', map(self._ratings.__getitem__, rows)))
+
+    def to_dict(self):
+        """Returns the catalogue as a plain dictionary of movie dictionaries."""
+        return {title: dict(record) for title, record in self.items()}
@@ -0,0 +1,247 @@
+import csv
+import json
+import sys
+from contextlib import redirect_stdout
+
+from config import SERVER_HOST, SERVER_PORT
+from Movie_App import MovieApp
+
+FIELDS = ('title', 'year', 'rating', 'poster_url', 'imdb_url', 'notes')
+OUTPUT_FORMATS = ('json', 'jsonl', 'csv', 'text')
+INPUT_FORMATS = ('json', 'jsonl', 'csv')
+
+
+def movie_record(title, movie):
+    """Returns a movie as a flat dictionary with its title, in the order of FIELDS."""
+    record = {field: movie.get(field, '') for field in FIELDS}
+    record['title'] = title
+    return record
+
+
+def write_movies(movies, output_format, out):
+    """
+    Writes (title, movie) pairs to out as they come: a JSON array, JSON lines, CSV with a header
+    or the lines shown by the menu. Returns the number of movies written.
+    """
+    count = 0
+    if output_format == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(FIELDS)
+        for title, movie in movies:
+            writer.writerow(movie_record(title, movie).values())
+            count += 1
+    elif output_format == 'jsonl':
+        for title, movie in movies:
+            out.write(json.dumps(movie_record(title, movie), ensure_ascii=False) + '\n')
+            count += 1
+    elif output_format == 'json':
+        out.write('[')
+        for title, movie in movies:
+            out.write((',\n' if count else '\n') + json.dumps(movie_record(title, movie), ensure_ascii=False))
+            count += 1
+        out.write('\n]\n' if count else ']\n')
+    else:
+        for title, movie in movies:
+            out.write(f"{title} ({movie['year']}) - Rating: {movie['rating']}\n")
+            count += 1
+    return count
+
+
+def read_records(input_format, file):
+    """
+    Reads movie records (dictionaries with a title and some of the other FIELDS) from a file in
+    one of the INPUT_FORMATS. A JSON object is read like a JSON storage file, keyed by title.
+    """
+    if input_format == 'csv':
+        return list(csv.DictReader(file))
+    if input_format == 'jsonl':
+        return [json.loads(line) for line in file if line.strip()]
+    data = json.load(file)
+    if isinstance(data, dict):
+        return [{**movie, 'title': title} for title, movie in data.items()]
+    return data
+
+
+def add_subcommands(parser):
+    """Adds the headless subcommands to the argument parser of main.py."""
+    commands = parser.add_subparsers(dest='command', metavar='command',
+                                     help='run a single command instead of the menu')
+
+    def add_output_format(command):
+        command.add_argument('--format', choices=OUTPUT_FORMATS, default='json', help='output format')
+
+    def add_input(command):
+        command.add_argument('--stdin', action='store_true', help='read the input from stdin')
+        command.add_argument('--input-format', choices=INPUT_FORMATS, default='json',
+                             help='format of the input read from stdin')
+
+    command = commands.add_parser('list', help='list the movies, optionally filtered')
+    add_output_format(command)
+    command.add_argument('--min-rating', type=float)
+    command.add_argument('--max-rating', type=float)
+    command.add_argument('--start-year', type=int)
+    command.add_argument('--end-year', type=int)
+
+    command = commands.add_parser('add', help='add a movie, or many movies read from stdin')
+    command.add_argument('title', nargs='?')
+    command.add_argument('year', nargs='?', type=int)
+    command.add_argument('rating', nargs='?', type=float)
+    command.add_argument('--poster', default='')
+    command.add_argument('--imdb-url', default='')
+    add_input(command)
+
+    command = commands.add_parser('delete', help='delete movies by title, or the titles read from stdin')
+    command.add_argument('titles', nargs='*')
+    command.add_argument('--stdin', action='store_true', help='read one title per line from stdin')
+
+    command = commands.add_parser('update', help='update the notes of a movie, or of the movies read from stdin')
+    command.add_argument('title', nargs='?')
+    command.add_argument('notes', nargs='?')
+    add_input(command)
+
+    command = commands.add_parser('stats', help='rating statistics')
+    command.add_argument('--format', choices=('json', 'text'), default='json', help='output format')
+
+    command = commands.add_parser('search', help='movies whose title contains the query')
+    command.add_argument('query')
+    command.add_argument('--limit', type=int)
+    add_output_format(command)
+
+    command = commands.add_parser('sorted', help='movies sorted by rating, best first')
+    command.add_argument('--limit', type=int)
+    command.add_argument('--ascending', action='store_true', help='worst first')
+    add_output_format(command)
+
+    command = commands.add_parser('generate', help='generate the website')
+    command.add_argument('--paginated', action='store_true', help='generate the paginated website')
+
+    command = commands.add_parser('import', help='import the titles or IMDb IDs in a file from OMDb')
+    command.add_argument('file', help="file with one title or IMDb ID per line, '-' for stdin")
+
+    command = commands.add_parser('serve', help='serve the movies as a JSON API until interrupted')
+    command.add_argument('--host', default=SERVER_HOST)
+    command.add_argument('--port', type=int, default=SERVER_PORT)
+    command.add_argument('--verbose', action='store_true', help='log every request')
+    return commands
+
+
+class MovieCli(MovieApp):
+    """
+    Runs single commands of the movie app without prompting, for scripts and pipelines.
+    Movies are written to stdout, errors to stderr, and each command only does the storage
+    reads and writes it needs.
+    """
+
+    def __init__(self, storage, omdb_client=None, stdin=None, stdout=None, stderr=None):
+        super().__init__(storage, omdb_client)
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+        self.stderr = stderr or sys.stderr
+
+    def execute(self, args):
+        """Runs the command parsed by add_subcommands, returns the exit status."""
+        try:
+            return getattr(self, '_cli_' + args.command)(args) or 0
+        except (RuntimeError, ValueError, KeyError, OSError) as e:
+            print(f"Error: {e}", file=self.stderr)
+            return 1
+
+    def _resolve_titles(self, titles):
+        """Returns the stored titles matching the given titles case-insensitively.
+        Raises RuntimeError naming the titles that aren't stored."""
+        found = {title: self._find_title(title) for title in titles}
+        missing = [title for title, stored in found.items() if stored is None]
+        if missing:
+            raise RuntimeError(f"No movie with title {', '.join(repr(title) for title in missing)} found.")
+        return found
+
+    def _cli_list(self, args):
+        filters = (args.min_rating, args.max_rating, args.start_year, args.end_year)
+        if any(value is not None for value in filters):
+            movies = self._filter_movies(*filters).items()
+        else:
+            movies = self.storage.iter_movies()
+        write_movies(movies, args.format, self.stdout)
+
+    def _cli_add(self, args):
+        if args.stdin:
+            records = read_records(args.input_format, self.stdin)
+            seen = set()
+            for record in records:
+                if record['title'].lower() in seen or self._find_title(record['title']) is not None:
+                    raise RuntimeError(f"Movie with title '{record['title']}' already exists.")
+                seen.add(record['title'].lower())
+            self.storage.add_many([(record['title'], int(record['year']), float(record['rating']),
+                                    record.get('poster_url', ''), record.get('imdb_url', ''))
+                                   for record in records])
+            print(f"Added {len(records)} movies.", file=self.stderr)
+            return
+        if args.title is None or args.year is None or args.rating is None:
+            raise ValueError("add needs a title, a year and a rating, or --stdin.")
+        if self._find_title(args.title) is not None:
+            raise RuntimeError(f"Movie with title '{args.title}' already exists.")
+        self.storage.add_movie(args.title, args.year, args.rating, args.poster, args.imdb_url)
+
+    def _cli_delete(self, args):
+        titles = [line.strip() for line in self.stdin if line.strip()] if args.stdin else args.titles
+        if not titles:
+            raise ValueError("delete needs at least one title, or --stdin.")
+        self.storage.delete_many(list(dict.fromkeys(self._resolve_titles(titles).values())))
+
+    def _cli_update(self, args):
+        if args.stdin:
+            notes = [(record['title'], record.get('notes', '')) for record in read_records(args.input_format, self.stdin)]
+        elif args.title is None or args.notes is None:
+            raise ValueError("update needs a title and the notes, or --stdin.")
+        else:
+            notes = [(args.title, args.notes)]
+        stored = self._resolve_titles([title for title, _ in notes])
+        self.storage.update_many([(stored[title], new_notes) for title, new_notes in notes])
+
+    def _cli_stats(self, args):
+        stats = self.get_stats()
+        if args.format == 'json':
+            json.dump(stats.to_dict(), self.stdout, ensure_ascii=False)
+            self.stdout.write('\n')
+            return
+        if not stats.count:
+            print("No movies found in the database.", file=self.stdout)
+            return
+        print(f"Average rating: {round(stats.average, 3)}", file=self.stdout)
+        print(f"Median rating: {stats.median}", file=self.stdout)
+        print(f"Standard deviation: {round(stats.std_dev, 3)}", file=self.stdout)
+        print(f"Best movie: {stats.best[0]} with a rating of {stats.best[1]}", file=self.stdout)
+        print(f"Worst movie: {stats.worst[0]} with a rating of {stats.worst[1]}", file=self.stdout)
+
+    def _cli_search(self, args):
+        movies = self._search_movies(args.query)
+        if args.limit is not None:
+            movies = (movie for _, movie in zip(range(args.limit), movies))
+        write_movies(movies, args.format, self.stdout)
+
+    def _cli_sorted(self, args):
+        write_movies(self._ranked_movies(args.limit, args.ascending), args.format, self.stdout)
+
+    def _cli_generate(self, args):
+        # the menu commands report to stdout, which is kept for machine-readable output
+        with redirect_stdout(self.stderr):
+            if args.paginated:
+                self._command_generate_paginated_website()
+            else:
+                self._command_generate_website()
+
+    def _cli_import(self, args):
+        if args.file == '-':
+            added, skipped, failed = self.import_movies(self._import_queries(self.stdin))
+        else:
+            added, skipped, failed = self.import_movies_from_file(args.file)
+        for query, reason in failed:
+            print(f"Couldn't import '{query}': {reason}", file=self.stderr)
+        json.dump({'added': added, 'skipped': skipped, 'failed': [query for query, _ in failed]},
+                  self.stdout, ensure_ascii=False)
+        self.stdout.write('\n')
+        return 1 if failed else 0
+
+    def _cli_serve(self, args):
+        from Movie_Server import serve
+        serve(self.storage, args.host, args.port, args.verbose)
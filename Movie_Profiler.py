@@ -0,0 +1,251 @@
+import builtins
+import cProfile
+import inspect
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+
+# the profiler is switched on by --profile or by setting MOVIE_PROFILE=1, the other variables
+# are the defaults of the matching command-line options
+PROFILE_ENV = 'MOVIE_PROFILE'
+PROFILE_OUTPUT_ENV = 'MOVIE_PROFILE_OUTPUT'
+PROFILE_COMMAND_ENV = 'MOVIE_PROFILE_COMMAND'
+PROFILE_MODE_ENV = 'MOVIE_PROFILE_MODE'
+CAPTURE_MODES = ('cprofile', 'tracemalloc')
+
+COMMAND_PREFIXES = ('_command_', '_cli_')
+STORAGE_METHODS = ('list_movies', 'iter_movies', 'add_movie', 'delete_movie', 'update_movie', 'add_many',
+                   'delete_many', 'update_many', 'find_title', 'search_movies', 'filter_movies', 'top_n',
+                   'bottom_n', 'iter_by_rating', 'stats', 'columns', 'random_access', '_read_movies',
+                   '_write_movies')
+OMDB_METHODS = ('fetch', '_request')
+IO_FILE = '/proc/self/io'
+
+
+def io_counters():
+    """Returns the bytes read and written by this process so far, (None, None) where the system
+    doesn't count them."""
+    try:
+        with open(IO_FILE, 'rb') as file:
+            counters = dict(line.split(b': ') for line in file.read().splitlines())
+        return int(counters[b'rchar']), int(counters[b'wchar'])
+    except (OSError, KeyError, ValueError):
+        return None, None
+
+
+def _difference(before, after):
+    return None if before is None or after is None else after - before
+
+
+class Profiler:
+    """
+    Records the wall time, the bytes read and written and the number of calls of the methods it
+    wraps, and sums them up per method.
+
+    Bytes are the ones the whole process read and wrote during a call (files, sockets and pipes,
+    from /proc/self/io on Linux, not counted elsewhere), so they include nested calls and calls
+    running at the same time in other threads. Calls returning a generator are timed while the
+    generator produces items. Every call can also be written as a JSON line to output.
+
+    Once an app is instrumented, the time spent waiting in input() is left out of the calls that
+    prompt and recorded as prompt.input instead, so interactive commands show their own work.
+
+    The command named capture_command runs under cProfile or tracemalloc (capture_mode), with
+    the result written next to output or to the working directory.
+    """
+
+    def __init__(self, output=None, capture_command=None, capture_mode='cprofile', stream=None):
+        self.output = output
+        self.capture_command = capture_command
+        self.capture_mode = capture_mode
+        self.stream = stream or sys.stderr
+        self.totals = {}
+        self._lock = threading.Lock()
+        self._prompts = threading.local()
+        self._input = None
+        self._output_file = open(output, 'a', encoding='utf-8') if output else None
+
+    def record(self, name, seconds, bytes_read=None, bytes_written=None):
+        """Adds a call of name that took seconds and read and wrote the given bytes."""
+        with self._lock:
+            total = self.totals.get(name)
+            if total is None:
+                total = self.totals[name] = {'calls': 0, 'seconds': 0.0, 'max_seconds': 0.0,
+                                             'bytes_read': None, 'bytes_written': None}
+            total['calls'] += 1
+            total['seconds'] += seconds
+            total['max_seconds'] = max(total['max_seconds'], seconds)
+            if bytes_read is not None:
+                total['bytes_read'] = (total['bytes_read'] or 0) + bytes_read
+                total['bytes_written'] = (total['bytes_written'] or 0) + bytes_written
+            if self._output_file is not None:
+                self._output_file.write(json.dumps({
+                    'time': time.time(), 'name': name, 'seconds': seconds,
+                    'bytes_read': bytes_read, 'bytes_written': bytes_written,
+                    'thread': threading.current_thread().name,
+                }) + '\n')
+
+    def wrap(self, name, function):
+        """Returns function recording its calls under name."""
+        def timed(*args, **kwargs):
+            if self._captures(name):
+                return self._capture(name, function, args, kwargs)
+            read, written = io_counters()
+            waited = self._waited()
+            start = time.perf_counter()
+            try:
+                result = function(*args, **kwargs)
+            except BaseException:
+                self._finish(name, time.perf_counter() - start - (self._waited() - waited), read, written)
+                raise
+            seconds = time.perf_counter() - start - (self._waited() - waited)
+            if inspect.isgenerator(result):
+                return self._timed_generator(name, result, seconds, read, written)
+            self._finish(name, seconds, read, written)
+            return result
+        timed.__wrapped__ = function
+        return timed
+
+    def _finish(self, name, seconds, read, written):
+        """Records a call that started when the process had read and written the given bytes."""
+        after_read, after_written = io_counters()
+        self.record(name, seconds, _difference(read, after_read), _difference(written, after_written))
+
+    def _timed_generator(self, name, generator, seconds, read, written):
+        """Yields the items of generator, recording the time spent producing them as one call."""
+        try:
+            while True:
+                waited = self._waited()
+                start = time.perf_counter()
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+                finally:
+                    seconds += time.perf_counter() - start - (self._waited() - waited)
+                yield item
+        finally:
+            generator.close()
+            self._finish(name, seconds, read, written)
+
+    def _waited(self):
+        """Returns the seconds this thread has spent waiting in input() so far."""
+        return getattr(self._prompts, 'seconds', 0.0)
+
+    def _timed_input(self, *args):
+        """input() recording the time waiting for the answer apart from the calls that prompt."""
+        start = time.perf_counter()
+        try:
+            return self._input(*args)
+        finally:
+            seconds = time.perf_counter() - start
+            self._prompts.seconds = self._waited() + seconds
+            self.record('prompt.input', seconds)
+
+    def instrument(self, obj, prefix, names):
+        """Replaces the given methods of obj, where it has them, by recording ones named prefix.method."""
+        for name in names:
+            method = getattr(obj, name, None)
+            if callable(method):
+                setattr(obj, name, self.wrap(f"{prefix}.{name}", method))
+
+    def instrument_app(self, app):
+        """Instruments the commands of a MovieApp, its storage and its OMDb client."""
+        commands = [name for name in dir(type(app)) if name.startswith(COMMAND_PREFIXES)]
+        self.instrument(app, 'command', commands)
+        self.instrument(app.storage, 'storage', STORAGE_METHODS)
+        if getattr(app, 'omdb', None) is not None:
+            self.instrument(app.omdb, 'omdb', OMDB_METHODS)
+        if self._input is None:
+            self._input = builtins.input
+            builtins.input = self._timed_input
+
+    def _captures(self, name):
+        """Returns True if name is the command to capture, given with or without its prefix."""
+        if not self.capture_command or not name.startswith('command.'):
+            return False
+        method = name[len('command.'):]
+        return self.capture_command in (method, *(method[len(prefix):] for prefix in COMMAND_PREFIXES
+                                                  if method.startswith(prefix)))
+
+    def _capture_file(self, name, extension):
+        directory = os.path.dirname(self.output) if self.output else ''
+        return os.path.join(directory, name.replace('command.', '').strip('_') + extension)
+
+    def _capture(self, name, function, args, kwargs):
+        """
+        Runs a command under cProfile or tracemalloc and reports where its time or memory went.
+        The profile shows the time waiting in input() under _timed_input.
+        """
+        read, written = io_counters()
+        waited = self._waited()
+        start = time.perf_counter()
+        if self.capture_mode == 'tracemalloc':
+            tracemalloc.start(10)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start - (self._waited() - waited)
+                snapshot = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self._finish(name, seconds, read, written)
+                snapshot.dump(self._capture_file(name, '.tracemalloc'))
+                print(f"\n{name}: peak Python memory {peak / 1e6:.1f} MB, largest allocations still held:",
+                      file=self.stream)
+                for statistic in snapshot.statistics('lineno')[:10]:
+                    print(f"  {statistic}", file=self.stream)
+        profile = cProfile.Profile()
+        try:
+            return profile.runcall(function, *args, **kwargs)
+        finally:
+            self._finish(name, time.perf_counter() - start - (self._waited() - waited), read, written)
+            profile_file = self._capture_file(name, '.prof')
+            profile.dump_stats(profile_file)
+            print(f"\n{name}: profile written to {profile_file}, slowest calls:", file=self.stream)
+            pstats.Stats(profile, stream=self.stream).sort_stats('cumulative').print_stats(20)
+
+    def summary(self):
+        """Returns the totals per method as a table, the slowest first."""
+        lines = [f"{'name':<32} {'calls':>7} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'MB read':>9} {'MB written':>10}"]
+        with self._lock:
+            totals = sorted(self.totals.items(), key=lambda item: item[1]['seconds'], reverse=True)
+        for name, total in totals:
+            read, written = total['bytes_read'], total['bytes_written']
+            lines.append(f"{name:<32} {total['calls']:>7} {total['seconds']:>9.3f} "
+                         f"{total['seconds'] * 1000 / total['calls']:>9.2f} {total['max_seconds'] * 1000:>9.2f} "
+                         f"{'-' if read is None else f'{read / 1e6:.2f}':>9} "
+                         f"{'-' if written is None else f'{written / 1e6:.2f}':>10}")
+        return '\n'.join(lines)
+
+    def close(self):
+        """Puts input() back and closes the JSON lines output."""
+        if self._input is not None:
+            builtins.input = self._input
+            self._input = None
+        if self._output_file is not None:
+            self._output_file.close()
+            self._output_file = None
+
+
+def add_profile_arguments(parser):
+    """Adds the profiling options to the argument parser of main.py, defaulting to the environment."""
+    parser.add_argument('--profile', action='store_true', default=os.environ.get(PROFILE_ENV, '') not in ('', '0'),
+                        help=f'print the time, bytes and calls of every command, storage call and OMDb request '
+                             f'(or set {PROFILE_ENV}=1)')
+    parser.add_argument('--profile-output', default=os.environ.get(PROFILE_OUTPUT_ENV),
+                        help='also append every call to this file as JSON lines')
+    parser.add_argument('--profile-command', default=os.environ.get(PROFILE_COMMAND_ENV),
+                        help='run this command, e.g. list or stats_of_movies, under cProfile or tracemalloc')
+    parser.add_argument('--profile-mode', choices=CAPTURE_MODES, default=os.environ.get(PROFILE_MODE_ENV, 'cprofile'))
+
+
+def profiler_from_args(args):
+    """Returns the Profiler asked for by the options, or None if profiling is off."""
+    if not (args.profile or args.profile_output or args.profile_command):
+        return None
+    return Profiler(args.profile_output, args.profile_command, args.profile_mode)
@@ -0,0 +1,116 @@
+import heapq
+import random
+
+# Upper bound of the ratings, used to accept rating-weighted picks by rejection
+MAX_RATING = 10.0
+
+
+def movie_filter(min_rating=None, max_rating=None, start_year=None, end_year=None):
+    """Returns a predicate for movies within the given rating and year ranges, or None if there
+    are no bounds."""
+    if all(value is None for value in (min_rating, max_rating, start_year, end_year)):
+        return None
+
+    def matches(movie):
+        return ((min_rating is None or movie['rating'] >= min_rating)
+                and (max_rating is None or movie['rating'] <= max_rating)
+                and (start_year is None or movie['year'] >= start_year)
+                and (end_year is None or movie['year'] <= end_year))
+    return matches
+
+
+def sample_stream(movies, k=1, weight=None, predicate=None, rng=random):
+    """
+    Picks k distinct movies from (title, movie) pairs in a single pass, holding only k of them.
+
+    Uniform picks use reservoir sampling (algorithm R). Weighted picks give every movie the key
+    u ** (1 / weight) and keep the k largest (Efraimidis-Spirakis), so a movie is picked with
+    probability proportional to its weight. Movies with a weight of 0 are never picked.
+    """
+    if k <= 0:
+        return []
+    if weight is None:
+        reservoir = []
+        seen = 0
+        for title, movie in movies:
+            if predicate is not None and not predicate(movie):
+                continue
+            seen += 1
+            if len(reservoir) < k:
+                reservoir.append((title, movie))
+            else:
+                position = rng.randrange(seen)
+                if position < k:
+                    reservoir[position] = (title, movie)
+        rng.shuffle(reservoir)
+        return reservoir
+    heap = []
+    for number, (title, movie) in enumerate(movies):
+        if predicate is not None and not predicate(movie):
+            continue
+        movie_weight = weight(movie)
+        if movie_weight <= 0:
+            continue
+        key = rng.random() ** (1 / movie_weight)
+        if len(heap) < k:
+            heapq.heappush(heap, (key, number, title, movie))
+        elif key > heap[0][0]:
+            heapq.heapreplace(heap, (key, number, title, movie))
+    return [(title, movie) for _, _, title, movie in sorted(heap, reverse=True)]
+
+
+def sample_indexed(size, movie_at, k=1, weight=None, max_weight=MAX_RATING, predicate=None, rng=random,
+                   max_attempts=None):
+    """
+    Picks k distinct movies by random position from a storage with random access.
+
+    movie_at(position) returns the (title, movie) at a position in range(size) or None for an
+    empty slot. Empty slots, movies rejected by the predicate and, for weighted picks, movies
+    failing the weight / max_weight acceptance test are drawn again. Returns None if k movies
+    weren't found within max_attempts draws (e.g. a very selective filter), in which case the
+    caller should fall back to sample_stream().
+    """
+    if k <= 0:
+        return []
+    if size <= 0:
+        return None
+    if max_attempts is None:
+        max_attempts = 50 * k + 100
+    picked = []
+    positions = set()
+    for _ in range(max_attempts):
+        position = rng.randrange(size)
+        if position in positions:
+            continue
+        entry = movie_at(position)
+        if entry is None or (predicate is not None and not predicate(entry[1])):
+            continue
+        if weight is not None and rng.random() * max_weight >= weight(entry[1]):
+            continue
+        positions.add(position)
+        picked.append(entry)
+        if len(picked) == k:
+            return picked
+    return None
+
+
+def random_movies(storage, k=1, by_rating=False, min_rating=None, max_rating=None, start_year=None,
+                  end_year=None, rng=random):
+    """
+    Returns up to k distinct random movies of a storage as (title, movie) tuples, optionally
+    weighted by rating and limited to rating and year ranges.
+
+    Storages with random access (random_access() returning the size and a movie_at function)
+    are sampled by position without reading the catalogue, all the others in a single pass
+    over iter_movies().
+    """
+    predicate = movie_filter(min_rating, max_rating, start_year, end_year)
+    weight = (lambda movie: movie['rating']) if by_rating else None
+    random_access = getattr(storage, 'random_access', None)
+    access = random_access() if random_access is not None else None
+    if access is not None:
+        size, movie_at = access
+        picked = sample_indexed(size, movie_at, k, weight=weight, predicate=predicate, rng=rng)
+        if picked is not None:
+            return picked
+    return sample_stream(storage.iter_movies(), k, weight=weight, predicate=predicate, rng=rng)
@@ -0,0 +1,309 @@
+import itertools
+import sys
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from Json_Codec import get_codec
+from Movie_Analytics import MovieAnalytics
+from Movie_App import MovieApp
+from Movie_Cli import movie_record
+
+
+class ApiError(Exception):
+    """An error answered with the given HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class ReadWriteLock:
+    """
+    Lets any number of readers in at the same time, or a single writer. Writers waiting for
+    the lock keep new readers out so a steady stream of reads can't starve them.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def reading(self):
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def writing(self):
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+class MovieApi(MovieApp):
+    """
+    The movie app as JSON endpoints over a storage that stays open, so a cached catalogue and
+    its indexes are loaded once and shared by every request. Reads run concurrently, writes one
+    at a time with no reads in between.
+
+        GET    /movies?min_rating=&max_rating=&start_year=&end_year=&offset=&limit=
+        GET    /movies/<title>
+        GET    /search?q=&limit=
+        GET    /sorted?limit=&ascending=1
+        GET    /stats
+        POST   /movies              a movie or a list of movies, added all or nothing
+        PATCH  /movies/<title>      {"notes": "..."}
+        DELETE /movies/<title>
+    """
+
+    def __init__(self, storage, omdb_client=None, codec=None):
+        super().__init__(storage, omdb_client)
+        self.codec = get_codec(codec)
+        self.lock = ReadWriteLock()
+        self._writes = 0
+        self._analytics_key = None
+        self._analytics_movies = None
+        self._analytics = None
+
+    def warm(self):
+        """Loads the catalogue, the title index and the filter columns, returns the number of movies."""
+        with self.lock.reading():
+            self._find_title('')
+            self._current_analytics()
+            return sum(1 for _ in self.storage.iter_movies())
+
+    @contextmanager
+    def _writing(self):
+        """Holds the write lock and marks the filter columns as stale."""
+        with self.lock.writing():
+            self._writes += 1
+            yield
+
+    def _current_analytics(self):
+        """
+        Returns the filter columns of the catalogue, kept between requests and built again after a
+        write or when the storage loaded a new catalogue. None without NumPy or if the storage
+        filters by itself.
+        """
+        if getattr(self.storage, 'filter_movies', None) is not None:
+            return None
+        movies = self.storage.list_movies()
+        if self._writes != self._analytics_key or movies is not self._analytics_movies:
+            try:
+                self._analytics = MovieAnalytics.from_storage(self.storage)
+            except RuntimeError:
+                self._analytics = None
+            self._analytics_key = self._writes
+            self._analytics_movies = movies
+        return self._analytics
+
+    def handle(self, method, path, query, body):
+        """
+        Answers a request, query being parsed by parse_qs and body the raw request body.
+        Returns the HTTP status and the JSON serializable payload, None for no content.
+        """
+        try:
+            if path == '/movies' or path == '/movies/':
+                if method == 'GET':
+                    with self.lock.reading():
+                        return 200, self._list(query)
+                if method == 'POST':
+                    movies = self._body(body)
+                    with self._writing():
+                        return 201, self._add(movies)
+            elif path.startswith('/movies/'):
+                title = unquote(path[len('/movies/'):])
+                if method == 'GET':
+                    with self.lock.reading():
+                        return 200, self._movie(self._stored_title(title))
+                if method == 'PATCH':
+                    notes = self._body(body)
+                    notes = notes.get('notes') if isinstance(notes, dict) else None
+                    if not isinstance(notes, str):
+                        raise ApiError(400, "The body needs the new notes as a string.")
+                    with self._writing():
+                        stored = self._stored_title(title)
+                        self.storage.update_movie(stored, notes)
+                        return 200, self._movie(stored)
+                if method == 'DELETE':
+                    with self._writing():
+                        self.storage.delete_movie(self._stored_title(title))
+                        return 204, None
+            elif path == '/search' and method == 'GET':
+                text = query.get('q', [''])[0]
+                if not text:
+                    raise ApiError(400, "Missing search query q.")
+                with self.lock.reading():
+                    movies = itertools.islice(self._search_movies(text), self._number(query, 'limit', int))
+                    return 200, [movie_record(title, movie) for title, movie in movies]
+            elif path == '/sorted' and method == 'GET':
+                ascending = query.get('ascending', ['0'])[0] not in ('0', 'false', '')
+                with self.lock.reading():
+                    movies = self._ranked_movies(self._number(query, 'limit', int), ascending)
+                    return 200, [movie_record(title, movie) for title, movie in movies]
+            elif path == '/stats' and method == 'GET':
+                with self.lock.reading():
+                    return 200, self.get_stats().to_dict()
+            else:
+                raise ApiError(404, f"No endpoint {path}.")
+            raise ApiError(405, f"{method} is not supported on {path}.")
+        except ApiError as e:
+            return e.status, {'error': str(e)}
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except RuntimeError as e:
+            return 500, {'error': str(e)}
+
+    def _body(self, body):
+        try:
+            return self.codec.loads(body)
+        except ValueError:
+            raise ApiError(400, "The body isn't valid JSON.")
+
+    @staticmethod
+    def _number(query, name, convert):
+        """Returns a number from the query string, None if it isn't given."""
+        value = query.get(name, [''])[0]
+        if not value:
+            return None
+        try:
+            return convert(value)
+        except ValueError:
+            raise ApiError(400, f"{name} must be a number.")
+
+    def _stored_title(self, title):
+        stored = self._find_title(title)
+        if stored is None:
+            raise ApiError(404, f"No movie with title '{title}' found.")
+        return stored
+
+    def _movie(self, title):
+        """Returns the record of a stored title, read by the storage lookup when the backend
+        provides one, otherwise from the catalogue."""
+        get_movie = getattr(self.storage, 'get_movie', None)
+        movie = get_movie(title) if get_movie is not None else self.storage.list_movies().get(title)
+        if movie is None:
+            raise ApiError(404, f"No movie with title '{title}' found.")
+        return movie_record(title, movie)
+
+    def _list(self, query):
+        filters = [self._number(query, name, convert) for name, convert in
+                   (('min_rating', float), ('max_rating', float), ('start_year', int), ('end_year', int))]
+        offset = self._number(query, 'offset', int) or 0
+        limit = self._number(query, 'limit', int)
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ApiError(400, "offset and limit can't be negative.")
+        analytics = self._current_analytics() if any(value is not None for value in filters) else None
+        if analytics is not None:
+            # only the requested page of the filtered movies is read from the catalogue
+            catalogue = self.storage.list_movies()
+            matches = analytics.filter(*filters, limit=None if limit is None else offset + limit)[offset:]
+            return [movie_record(title, catalogue[title]) for title, _, _ in matches]
+        if any(value is not None for value in filters):
+            movies = self._filter_movies(*filters).items()
+        else:
+            movies = self.storage.iter_movies()
+        movies = itertools.islice(movies, offset, None if limit is None else offset + limit)
+        return [movie_record(title, movie) for title, movie in movies]
+
+    def _add(self, movies):
+        """Adds a movie or a list of movies given as records, returns the added records."""
+        records = movies if isinstance(movies, list) else [movies]
+        new_movies = []
+        for record in records:
+            try:
+                movie = (record['title'], int(record['year']), float(record['rating']),
+                         record.get('poster_url', ''), record.get('imdb_url', ''))
+            except (KeyError, TypeError, ValueError):
+                raise ApiError(400, "A movie needs a title, a year and a rating.")
+            if not isinstance(movie[0], str) or not movie[0]:
+                raise ApiError(400, "The title of a movie must be a non-empty string.")
+            if self._find_title(movie[0]) is not None or movie[0].lower() in \
+                    (title.lower() for title, *_ in new_movies):
+                raise ApiError(409, f"Movie with title '{movie[0]}' already exists.")
+            new_movies.append(movie)
+        self.storage.add_many(new_movies)
+        added = [movie_record(title, {'year': year, 'rating': rating, 'poster_url': poster,
+                                      'imdb_url': imdb_url, 'notes': ''})
+                 for title, year, rating, poster, imdb_url in new_movies]
+        return added if isinstance(movies, list) else added[0]
+
+
+class MovieRequestHandler(BaseHTTPRequestHandler):
+    """Passes the requests to the MovieApi of the server and writes its JSON answers."""
+
+    protocol_version = 'HTTP/1.1'
+    # headers and body are written separately, with Nagle's algorithm a kept-alive connection
+    # would wait for the delayed ACK of the headers before sending the body
+    disable_nagle_algorithm = True
+
+    def _answer(self, method):
+        url = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        status, payload = self.server.api.handle(method, url.path, parse_qs(url.query), body)
+        data = b'' if payload is None else self.server.api.codec.dumps(payload)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._answer('GET')
+
+    def do_POST(self):
+        self._answer('POST')
+
+    def do_PATCH(self):
+        self._answer('PATCH')
+
+    def do_DELETE(self):
+        self._answer('DELETE')
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class MovieServer(ThreadingHTTPServer):
+    """HTTP server answering every request in its own thread through a shared MovieApi."""
+
+    def __init__(self, address, api, verbose=False):
+        super().__init__(address, MovieRequestHandler)
+        self.api = api
+        self.verbose = verbose
+
+
+def serve(storage, host, port, verbose=False):
+    """Serves the storage until interrupted."""
+    api = MovieApi(storage)
+    count = api.warm()
+    with MovieServer((host, port), api, verbose) as server:
+        print(f"Serving {count} movies on http://{host}:{server.server_address[1]}/ (Ctrl+C to stop)",
+              file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Server stopped.", file=sys.stderr)
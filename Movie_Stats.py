@@ -0,0 +1,102 @@
+import math
+
+
+def median_of_counts(rating_counts, count):
+    """Returns the median of count ratings given as {rating: number of movies}, walking the sorted
+    ratings to the middle position(s)."""
+    if not count:
+        return 0.0
+    lower_position = (count - 1) // 2
+    upper_position = count // 2
+    lower = upper = None
+    seen = 0
+    for rating in sorted(rating_counts):
+        seen += rating_counts[rating]
+        if lower is None and seen > lower_position:
+            lower = rating
+        if seen > upper_position:
+            upper = rating
+            break
+    return lower if lower == upper else (lower + upper) / 2
+
+
+class MovieStats:
+    """
+    Statistics of the movie ratings as computed by StatsAccumulator.
+    """
+
+    def __init__(self, count, average, median, std_dev, best, worst, histogram):
+        self.count = count
+        self.average = average
+        self.median = median
+        self.std_dev = std_dev
+        self.best = best
+        self.worst = worst
+        self.histogram = histogram
+
+    def to_dict(self):
+        """Returns the statistics as a JSON serializable dictionary."""
+        return {
+            'count': self.count,
+            'average': self.average,
+            'median': self.median,
+            'std_dev': self.std_dev,
+            'best': {'title': self.best[0], 'rating': self.best[1]} if self.best else None,
+            'worst': {'title': self.worst[0], 'rating': self.worst[1]} if self.worst else None,
+            'histogram': {str(bucket): count for bucket, count in self.histogram.items()},
+        }
+
+
+class StatsAccumulator:
+    """
+    Computes the rating statistics in a single pass over the movies.
+
+    Mean and standard deviation are updated with Welford's method. The median is read from
+    a count of the ratings per value rounded to `resolution` decimals, which is exact for
+    IMDb ratings and never holds more entries than the rating range has steps.
+    """
+
+    def __init__(self, resolution=3):
+        self.resolution = resolution
+        self.count = 0
+        self._mean = 0.0
+        self._squares = 0.0
+        self.best = None
+        self.worst = None
+        self._rating_counts = {}
+        self._histogram = {}
+
+    def add(self, title, rating):
+        """Adds the rating of a movie."""
+        self.count += 1
+        delta = rating - self._mean
+        self._mean += delta / self.count
+        self._squares += delta * (rating - self._mean)
+        if self.best is None or rating > self.best[1]:
+            self.best = (title, rating)
+        if self.worst is None or rating < self.worst[1]:
+            self.worst = (title, rating)
+        key = round(rating, self.resolution)
+        self._rating_counts[key] = self._rating_counts.get(key, 0) + 1
+        bucket = math.floor(rating)
+        self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+
+    def result(self):
+        """Returns the statistics of the movies added so far."""
+        return MovieStats(
+            count=self.count,
+            average=self._mean if self.count else 0.0,
+            median=median_of_counts(self._rating_counts, self.count),
+            std_dev=math.sqrt(self._squares / self.count) if self.count else 0.0,
+            best=self.best,
+            worst=self.worst,
+            histogram=dict(sorted(self._histogram.items())),
+        )
+
+
+def compute_stats(movies):
+    """Computes the statistics of the movies given as (title, properties) pairs in a single pass."""
+    accumulator = StatsAccumulator()
+    for title, properties in movies:
+        accumulator.add(title, properties['rating'])
+    return accumulator.result()
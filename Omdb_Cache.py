@@ -0,0 +1,100 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class OmdbCache:
+    """
+    Disk-backed cache of OMDb responses in a SQLite file, keyed by normalized title and IMDb ID.
+
+    Found movies are kept for ttl seconds, "Movie not found" answers for negative_ttl seconds.
+    Once more than max_entries responses are stored the least recently used ones are evicted.
+    """
+
+    def __init__(self, cache_file, ttl=30 * 24 * 3600, negative_ttl=24 * 3600, max_entries=10000):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = None
+
+    @staticmethod
+    def title_key(title):
+        """Returns the cache key of a title, ignoring case and repeated whitespace."""
+        return 't:' + ' '.join(title.casefold().split())
+
+    @staticmethod
+    def imdb_key(imdb_id):
+        """Returns the cache key of an IMDb ID."""
+        return 'i:' + imdb_id.strip().lower()
+
+    def _connect(self):
+        """Opens the cache database on first use. Must be called with the lock held."""
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.cache_file, check_same_thread=False)
+            with self._connection:
+                self._connection.execute(
+                    "CREATE TABLE IF NOT EXISTS responses ("
+                    "key TEXT PRIMARY KEY, data TEXT NOT NULL, found INTEGER NOT NULL, "
+                    "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+                )
+                self._connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_responses_accessed_at ON responses (accessed_at)"
+                )
+        return self._connection
+
+    def get(self, key):
+        """Returns the cached response for the key, or None if there is none or it expired."""
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT data, found, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            data, found, stored_at = row
+            now = time.time()
+            if now - stored_at > (self.ttl if found else self.negative_ttl):
+                with connection:
+                    connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            with connection:
+                connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(data)
+
+    def put(self, keys, data):
+        """Stores a response under all the given keys and evicts the least recently used responses."""
+        now = time.time()
+        found = data.get('Response') == 'True'
+        serialized = json.dumps(data)
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO responses (key, data, found, stored_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(key, serialized, int(found), now, now) for key in keys]
+                )
+                count = connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if count > self.max_entries:
+                    connection.execute(
+                        "DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+
+    def clear(self):
+        """Removes all cached responses."""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("DELETE FROM responses")
+
+    def close(self):
+        """Closes the cache database."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
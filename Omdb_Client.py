@@ -0,0 +1,130 @@
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from Omdb_Cache import OmdbCache
+
+OMDB_URL = "http://www.omdbapi.com/"
+IMDB_ID_PATTERN = re.compile(r"^tt\d+$")
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """
+    Spaces out calls so that at most requests_per_second pass, shared between threads.
+    """
+
+    def __init__(self, requests_per_second):
+        self.interval = 1 / requests_per_second if requests_per_second else 0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Blocks until the caller may make its next request."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class OmdbClient:
+    """
+    Client for the OMDb API with a pooled session, timeouts, rate limiting and retries
+    with exponential backoff on connection errors and 429/5xx responses. With an OmdbCache
+    answers, including "Movie not found", are served from disk until they expire.
+    """
+
+    def __init__(self, api_key, base_url=OMDB_URL, requests_per_second=None, max_retries=3,
+                 backoff=0.5, timeout=10, pool_size=10, cache=None):
+        self.api_key = api_key
+        self.cache = cache
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def fetch(self, title=None, imdb_id=None):
+        """
+        Looks up a movie by title or IMDb ID and returns the OMDb response data, which has
+        'Response' set to 'False' if the movie wasn't found. Raises RuntimeError if the API
+        can't be reached or keeps failing after the retries.
+        """
+        if imdb_id is not None:
+            key = OmdbCache.imdb_key(imdb_id)
+        else:
+            key = OmdbCache.title_key(title)
+        if self.cache is not None:
+            data = self.cache.get(key)
+            if data is not None:
+                return data
+        data = self._request(title, imdb_id)
+        if self.cache is not None:
+            keys = [key]
+            if data.get('Response') == 'True':
+                keys.append(OmdbCache.title_key(data.get('Title', '')))
+                keys.append(OmdbCache.imdb_key(data.get('imdbID', '')))
+            self.cache.put(set(keys), data)
+        return data
+
+    def _request(self, title, imdb_id):
+        """Requests a movie from the API, retrying failed requests."""
+        params = {'apikey': self.api_key}
+        if imdb_id is not None:
+            params['i'] = imdb_id
+        else:
+            params['t'] = title
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.backoff * 2 ** (attempt - 1))
+            self.rate_limiter.wait()
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                continue
+            if response.status_code == 200:
+                try:
+                    return response.json()
+                except ValueError:
+                    raise RuntimeError("The OMDb API answered with invalid data.")
+            if response.status_code not in RETRY_STATUS_CODES:
+                break
+        raise RuntimeError("Error while connecting to the OMDb API.")
+
+    def fetch_query(self, query):
+        """Looks up a query that is either an IMDb ID (tt1234567) or a title."""
+        if IMDB_ID_PATTERN.match(query):
+            return self.fetch(imdb_id=query)
+        return self.fetch(title=query)
+
+    def fetch_many(self, queries, workers=None):
+        """
+        Looks up many titles or IMDb IDs concurrently. Returns a list of (query, data, error)
+        tuples in the order of the queries, with data None and the error message set on failure.
+        """
+        def fetch_one(query):
+            try:
+                return query, self.fetch_query(query), None
+            except RuntimeError as e:
+                return query, None, str(e)
+
+        with ThreadPoolExecutor(max_workers=workers or self.pool_size) as executor:
+            return list(executor.map(fetch_one, queries))
+
+    def close(self):
+        """Closes the pooled connections and the cache."""
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,69 @@
+import bisect
+
+
+class RatingIndex:
+    """
+    Movie titles ordered by rating, best first and titles in alphabetical order on equal ratings.
+
+    The (-rating, title) entries are kept in a sorted list that is updated with bisect on
+    add and remove, so the best and worst movies, the median and any page of the ranking
+    are read by position.
+    """
+
+    def __init__(self, movies=None):
+        self._entries = []
+        if movies:
+            self._entries = sorted((-movie['rating'], title) for title, movie in movies.items())
+
+    @classmethod
+    def from_sorted(cls, ranking):
+        """Creates the index from (title, rating) pairs that are already in ranking order."""
+        index = cls()
+        index._entries = [(-rating, title) for title, rating in ranking]
+        return index
+
+    def add(self, title, movie):
+        """Adds a movie to the index."""
+        bisect.insort(self._entries, (-movie['rating'], title))
+
+    def remove(self, title, movie):
+        """Removes a movie from the index."""
+        entry = (-movie['rating'], title)
+        position = bisect.bisect_left(self._entries, entry)
+        if position < len(self._entries) and self._entries[position] == entry:
+            del self._entries[position]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def entry(self, position):
+        """Returns the (title, rating) at the position of the ranking, 0 being the best movie."""
+        rating, title = self._entries[position]
+        return title, -rating
+
+    def ranking(self):
+        """Returns all (title, rating) pairs in ranking order."""
+        return [(title, -rating) for rating, title in self._entries]
+
+    def top_n(self, k=None):
+        """Returns the titles of the k best rated movies (all if k is None), best first."""
+        entries = self._entries if k is None else self._entries[:k]
+        return [title for _, title in entries]
+
+    def bottom_n(self, k=None):
+        """Returns the titles of the k worst rated movies (all if k is None), worst first."""
+        if k is None:
+            entries = self._entries
+        else:
+            entries = self._entries[max(0, len(self._entries) - k):] if k > 0 else []
+        return [title for _, title in reversed(entries)]
+
+    def page(self, number, page_size):
+        """Returns the titles on a page of the ranking, counting pages from 0."""
+        start = number * page_size
+        return [title for _, title in self._entries[start:start + page_size]]
+
+    def iter_pages(self, page_size):
+        """Yields the titles of the ranking page by page."""
+        for start in range(0, len(self._entries), page_size):
+            yield [title for _, title in self._entries[start:start + page_size]]
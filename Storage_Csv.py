@@ -1,10 +1,102 @@
 import csv
-from IStorage import IStorage
+import io
+import mmap
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from Movie_Catalogue import MovieCatalogue
+from Storage_File import StorageFile, exclusive
 
+# files smaller than this are read by a single process, starting the pool would cost more
+PARALLEL_MIN_BYTES = 32 * 1024 * 1024
+# chunks per process, so a process that finishes early picks up another one
+CHUNKS_PER_PROCESS = 4
+QUOTE_COUNT_BLOCK = 16 * 1024 * 1024
+# the file may be loaded from a thread of the API server while others hold locks, which a forked
+# worker would inherit as they are, so the workers start from a clean process
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
 
-class StorageCsv(IStorage):
-    def __init__(self, storage_file):
-        self.storage_file = storage_file
+
+def _csv_movies(reader, header):
+    """Yields the rows of a csv.reader as (title, movie) tuples, the columns named by header."""
+    columns = {name: position for position, name in enumerate(header)}
+    title, year, rating = columns['title'], columns['year'], columns['rating']
+    optional = [(field, columns.get(field)) for field in ('poster_url', 'imdb_url', 'notes')]
+    for row in reader:
+        if not row:
+            continue
+        movie = {'title': row[title], 'year': int(row[year]), 'rating': float(row[rating])}
+        for field, position in optional:
+            movie[field] = row[position] if position is not None and position < len(row) else ''
+        yield row[title], movie
+
+
+def _count_quotes(data, start, end):
+    """Counts the double quotes in data[start:end], a block at a time."""
+    return sum(data[block:min(block + QUOTE_COUNT_BLOCK, end)].count(b'"')
+               for block in range(start, end, QUOTE_COUNT_BLOCK))
+
+
+def row_boundaries(storage_file, chunk_count):
+    """
+    Returns the byte offsets splitting a CSV file into about chunk_count chunks of whole rows:
+    the end of the header row, the starts of the following chunks and the size of the file.
+
+    A newline only ends a row if an even number of double quotes came before it, as quotes
+    within quoted fields are doubled, so rows with newlines in their quoted notes stay whole.
+    """
+    with open(storage_file, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if not size:
+            return [0]
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            boundaries = []
+            position = 0
+            quotes = 0
+            for chunk in range(chunk_count):
+                target = max(position, size * chunk // chunk_count)
+                quotes += _count_quotes(data, position, target)
+                position = target
+                while True:
+                    newline = data.find(b'\n', position)
+                    if newline == -1:
+                        return boundaries + [size]
+                    quotes += _count_quotes(data, position, newline)
+                    position = newline + 1
+                    if quotes % 2 == 0:
+                        break
+                if position == size:
+                    break
+                boundaries.append(position)
+    return boundaries + [size]
+
+
+def _parse_chunk(storage_file, start, end, header):
+    """Parses the rows between two boundaries into a MovieCatalogue, which is compact to send
+    back from a worker process."""
+    with open(storage_file, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8')
+    movies = MovieCatalogue()
+    for title, movie in _csv_movies(csv.reader(io.StringIO(text, newline='')), header):
+        movies[title] = movie
+    return movies
+
+
+class StorageCsv(StorageFile):
+    """
+    Storage in a CSV file. In compact mode with load_processes other than 1 (None for one per
+    CPU), files of at least parallel_min_bytes are split at row boundaries and parsed in a
+    process pool. A plain catalogue is always read by one process, building its dictionaries
+    from the parsed chunks would cost as much as parsing them.
+    """
+
+    def __init__(self, storage_file, cached=False, aggregates=False, compact=False, notes_sidecar=False,
+                 fsync=True, load_processes=1, parallel_min_bytes=PARALLEL_MIN_BYTES):
+        super().__init__(storage_file, cached, aggregates, compact, notes_sidecar, fsync=fsync)
+        self.load_processes = load_processes
+        self.parallel_min_bytes = parallel_min_bytes
         self.fieldnames = self._get_fieldnames()
 
     def _get_fieldnames(self):
@@ -16,25 +108,53 @@ class StorageCsv(IStorage):
             except StopIteration:
                 return None
 
-    def list_movies(self):
-        """Lists all the movies from the CSV file as a dictionary."""
+    def _read_movies(self):
+        """Reads all the movies from the CSV file as a dictionary."""
+        processes = self.load_processes or os.cpu_count() or 1
         try:
-            with open(self.storage_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-                movies = {}
-                for row in reader:
-                    movies[row['title']] = {
-                        'title': row['title'],
-                        'year': int(row['year']),
-                        'rating': float(row['rating']),
-                        'poster_url': row.get('poster_url', ''),
-                        'imdb_url': row.get('imdb_url', ''),
-                        'notes': row.get('notes', '')
-                    }
-                return movies
+            size = os.path.getsize(self.storage_file)
         except FileNotFoundError:
-            return {}
+            size = 0
+        if self.compact and processes > 1 and size >= self.parallel_min_bytes:
+            return self._read_movies_parallel(processes)
+        movies = self._new_catalogue()
+        for title, movie in self._stream_movies():
+            movies[title] = movie
+        return movies
+
+    def _read_movies_parallel(self, processes):
+        """
+        Reads the movies with chunks of the file parsed by a pool of processes. The chunks come
+        back as compact catalogues and are merged in file order, so a title repeated in the file
+        ends up where it first appeared with the values of its last row, as when reading row by row.
+        """
+        boundaries = row_boundaries(self.storage_file, processes * CHUNKS_PER_PROCESS)
+        with open(self.storage_file, 'r', newline='', encoding='utf-8') as file:
+            header = next(csv.reader(file), None)
+        starts, ends = boundaries[:-1], boundaries[1:]
+        if header is None or not starts:
+            return MovieCatalogue()
+        movies = MovieCatalogue()
+        with ProcessPoolExecutor(max_workers=min(processes, len(starts)),
+                                 mp_context=multiprocessing.get_context(START_METHOD)) as executor:
+            for chunk in executor.map(_parse_chunk, repeat(self.storage_file), starts, ends, repeat(header)):
+                movies.extend(chunk)
+        return movies
 
+    def _stream_movies(self):
+        """Yields the movies from the CSV file as (title, movie) tuples, row by row."""
+        try:
+            file = open(self.storage_file, 'r', newline='', encoding='utf-8')
+        except FileNotFoundError:
+            return
+        with file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if header is None:
+                return
+            yield from _csv_movies(reader, header)
+
+    @exclusive
     def add_movie(self, title, year, rating, poster, imdb_url):
         """Adds a new movie to the CSV file with the provided details."""
         movies = self.list_movies()
@@ -49,35 +169,37 @@ class StorageCsv(IStorage):
             'notes': ''
         }
         movies[title] = movie
-        self._save_movies(movies)
+        self._commit(movies, added=[(title, movie)])
 
+    @exclusive
     def delete_movie(self, title):
         """Deletes the movie with the given title from the CSV file."""
         movies = self.list_movies()
         if title in movies:
-            del movies[title]
-            self._save_movies(movies)
+            movie = movies.pop(title)
+            self._commit(movies, removed=[(title, movie)])
         else:
             raise RuntimeError(f"Movie with title '{title}' does not exist.")
 
     def update_movie(self, title, new_note=None):
-        """Updates the notes of the movie with the given title in the CSV file."""
+        """Updates the notes of the movie with the given title in the CSV file, asking for them if
+        they aren't given."""
+        if new_note is None:
+            new_note = self._ask_for_note(title)
+            if new_note is None:
+                return
+        self._update_notes(title, new_note)
+
+    @exclusive
+    def _update_notes(self, title, new_note):
         movies = self.list_movies()
         if title not in movies:
             raise RuntimeError(f"No movie with title '{title}' found.")
+        self._set_notes(movies, title, new_note)
 
-        if new_note is None:
-            update_decision = input("Do you want to update the note? (y/n): ")
-            if update_decision.lower() != "y":
-                print("Update cancelled.")
-                return
-            new_note = input("Enter the new note: ")
-        movies[title]['notes'] = new_note
-        self._save_movies(movies)
-
-    def _save_movies(self, movies):
-        """Saves the movies dictionary to the CSV file."""
-        with open(self.storage_file, 'w', newline='', encoding='utf-8') as file:
+    def _write_movies(self, movies, path):
+        """Writes the movies dictionary as CSV to the file at path."""
+        with open(path, 'w', newline='', encoding='utf-8') as file:
             fieldnames = ['title', 'year', 'rating', 'poster_url', 'imdb_url', 'notes']
             writer = csv.DictWriter(file, fieldnames=fieldnames)
             writer.writeheader()
@@ -90,8 +212,3 @@ class StorageCsv(IStorage):
                     'imdb_url': movie['imdb_url'],
                     'notes': movie.get('notes', '')
                 })
-
-    def __contains__(self, title):
-        """Checks if the movie with the given title exists in the CSV file."""
-        movies = self.list_movies()
-        return title in movies
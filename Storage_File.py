@@ -0,0 +1,449 @@
+import json
+import os
+import threading
+from abc import abstractmethod
+from contextlib import contextmanager
+from functools import wraps
+from IStorage import IStorage
+from Movie_Aggregates import MovieAggregates
+from Movie_Catalogue import MovieCatalogue
+from Movie_Stats import compute_stats
+from Rating_Index import RatingIndex
+from Title_Index import TitleIndex
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def exclusive(method):
+    """Runs a read-modify-write method of a StorageFile under its exclusive lock."""
+    @wraps(method)
+    def locked_method(self, *args, **kwargs):
+        with self.locked(exclusive=True):
+            return method(self, *args, **kwargs)
+    return locked_method
+
+
+class StorageFile(IStorage):
+    """
+    Base class for storages that keep the whole catalogue in a single file.
+
+    In cached mode the parsed catalogue is kept in memory and only re-read when the
+    file's mtime or size changes on disk. Writes go through the cache to the file.
+    Secondary indexes (titles, ranking by rating) are built from the cached catalogue on
+    first use and kept up to date on add and delete until the catalogue is reloaded.
+
+    With aggregates enabled the rating statistics are maintained on every add and delete
+    and stored next to the file together with its signature. They are rebuilt from the
+    catalogue whenever the file changed behind their back.
+
+    In compact mode the catalogue is loaded into a columnar MovieCatalogue instead of a
+    dictionary of dictionaries, which behaves like one but needs far less memory.
+
+    With the notes sidecar enabled, note updates are appended as JSON lines to a notes file
+    next to the storage file instead of rewriting it, and applied on top of it when it is read.
+    The sidecar is folded into the storage file by the next full write, at the latest once it
+    grows past notes_compact_threshold bytes, after which the file is complete on its own again.
+    Storages without the sidecar enabled still read and fold one another process left.
+
+    Writes go to a temporary file that replaces the storage file once complete (and synced to
+    disk if fsync is enabled), so readers never see a half-written file. Processes sharing a
+    file coordinate through fcntl locks on a lock file next to it: shared while loading,
+    exclusive around every read-modify-write cycle. Together with the signature check of the
+    cache, every change starts from the latest state on disk.
+
+    Inside batch() all mutations are applied to one in-memory catalogue and written with a
+    single save when the block ends, or dropped if it raises.
+    """
+
+    def __init__(self, storage_file, cached=False, aggregates=False, compact=False, notes_sidecar=False,
+                 notes_compact_threshold=1024 * 1024, fsync=True):
+        self.storage_file = storage_file
+        self.lock_file = storage_file + '.lock'
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._lock_depth = 0
+        self._lock_handle = None
+        self.cached = cached
+        self.compact = compact
+        self._cache = None
+        self._cache_signature = None
+        self.notes_file = storage_file + '.notes.jsonl'
+        self.notes_sidecar = notes_sidecar
+        self.notes_compact_threshold = notes_compact_threshold
+        self._indexes = {}
+        self._indexed_movies = None
+        self._indexed_signature = None
+        self.aggregates_file = storage_file + '.aggregates.json' if aggregates else None
+        self._aggregates = None
+        self._aggregates_signature = None
+        self._batch = None
+        self._batch_movies = None
+        self._batch_dirty = False
+
+    @abstractmethod
+    def _read_movies(self):
+        """
+        Should parse the storage file and return the movies as a dictionary.
+        """
+        pass
+
+    @abstractmethod
+    def _write_movies(self, movies, path):
+        """
+        Should write the movies dictionary to the file at path.
+        """
+        pass
+
+    @contextmanager
+    def locked(self, exclusive=False):
+        """
+        Holds the lock of the storage file, shared or exclusive, across processes (fcntl, where
+        available) and threads. Nested use inside a held lock keeps the outer lock.
+        """
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                self._lock_handle = open(self.lock_file, 'a')
+                fcntl.flock(self._lock_handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_handle is not None:
+                    fcntl.flock(self._lock_handle, fcntl.LOCK_UN)
+                    self._lock_handle.close()
+                    self._lock_handle = None
+
+    def _sync(self, path):
+        """Forces a file or directory to disk."""
+        descriptor = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(descriptor)
+        finally:
+            os.close(descriptor)
+
+    def _replace_file(self, movies):
+        """Writes the movies to a temporary file and atomically moves it over the storage file."""
+        temp_file = f"{self.storage_file}.{os.getpid()}.tmp"
+        try:
+            self._write_movies(movies, temp_file)
+            if self.fsync:
+                self._sync(temp_file)
+            os.replace(temp_file, self.storage_file)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+        if self.fsync:
+            self._sync(os.path.dirname(os.path.abspath(self.storage_file)))
+
+    def _new_catalogue(self):
+        """Returns an empty catalogue for _read_movies to fill, compact if enabled."""
+        return MovieCatalogue() if self.compact else {}
+
+    def _load_movies(self):
+        """Reads the movies, converted to a MovieCatalogue in compact mode, with the notes from
+        the sidecar applied."""
+        movies = self._read_movies()
+        if self.compact and not isinstance(movies, MovieCatalogue):
+            movies = MovieCatalogue(movies)
+        for title, notes in self._read_notes().items():
+            if title in movies:
+                # set as a whole, a catalogue may decode its movies into new dictionaries on access
+                movies[title] = dict(movies[title], notes=notes)
+        return movies
+
+    def _read_notes(self):
+        """Returns the latest notes per title from the notes sidecar. Lines torn by a crash while
+        appending are skipped. A sidecar left by a process that has it enabled is read even if
+        this one doesn't append to it."""
+        notes = {}
+        try:
+            with open(self.notes_file, 'r', encoding='utf-8') as file:
+                for line in file:
+                    if not line.endswith('\n'):
+                        break
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    notes[record['title']] = record['notes']
+        except FileNotFoundError:
+            pass
+        return notes
+
+    def _set_notes(self, movies, title, notes):
+        """Stores the new notes of a movie of the catalogue: appended to the notes sidecar if
+        enabled, otherwise by saving the whole catalogue."""
+        if not self.notes_sidecar or self._batch is not None:
+            movies[title] = dict(movies[title], notes=notes)
+            self._commit(movies)
+            return
+        cache_is_current = self.cached and movies is self._cache and self._cache_signature == self._signature()
+        with open(self.notes_file, 'ab+') as file:
+            record = json.dumps({'title': title, 'notes': notes}).encode('utf-8') + b'\n'
+            if file.tell():
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b'\n':
+                    # starts a new line after a record torn by a crash
+                    record = b'\n' + record
+            file.write(record)
+            if self.fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        movies[title] = dict(movies[title], notes=notes)
+        if cache_is_current:
+            self._cache_signature = self._signature()
+        if os.path.getsize(self.notes_file) >= self.notes_compact_threshold:
+            self.compact_notes()
+
+    def _ask_for_note(self, title):
+        """Asks the user for the new notes of a movie, before update_movie takes the lock so other
+        processes don't wait for the answer. Returns None if the update is cancelled."""
+        if title not in self.list_movies():
+            raise RuntimeError(f"No movie with title '{title}' found.")
+        update_decision = input("Do you want to update the note? (y/n): ")
+        if update_decision.lower() != "y":
+            print("Update cancelled.")
+            return None
+        return input("Enter the new note: ")
+
+    @exclusive
+    def compact_notes(self):
+        """Writes the notes from the sidecar into the storage file and removes the sidecar."""
+        if os.path.exists(self.notes_file):
+            self._flush(self.list_movies(), [])
+
+    def _stream_movies(self):
+        """Yields the (title, movie) tuples of the storage file. Storages that can parse their file
+        incrementally override this, the default reads it as a whole."""
+        yield from self._read_movies().items()
+
+    def iter_movies(self):
+        """Yields the movies as (title, movie) tuples, from the cache if it is up to date and
+        streamed from the file otherwise, without filling the cache."""
+        if self._batch_movies is not None:
+            yield from self._batch_movies.items()
+            return
+        if self.cached and self._cache is not None and self._cache_signature == self._signature():
+            yield from self._cache.items()
+            return
+        notes = self._read_notes()
+        for title, movie in self._stream_movies():
+            if title in notes:
+                movie = dict(movie, notes=notes[title])
+            yield title, movie
+
+    @staticmethod
+    def _stat_signature(path):
+        """Returns the (mtime, size, inode) of a file or None if it doesn't exist."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def _file_signature(self):
+        """Returns the (mtime, size, inode) of the storage file or None if it doesn't exist."""
+        return self._stat_signature(self.storage_file)
+
+    def _signature(self):
+        """Returns the signature the cache is validated against: the storage file's and the notes
+        sidecar's."""
+        return self._file_signature(), self._stat_signature(self.notes_file)
+
+    def list_movies(self):
+        """Lists all the movies as a dictionary.
+        In cached mode the returned dictionary is shared with the cache and must not be modified."""
+        if self._batch_movies is not None:
+            return self._batch_movies
+        if not self.cached:
+            with self.locked():
+                return self._load_movies()
+        signature = self._signature()
+        if self._cache is None or signature != self._cache_signature:
+            with self.locked():
+                signature = self._signature()
+                self._cache = self._load_movies()
+            self._cache_signature = signature
+        return self._cache
+
+    def invalidate_cache(self):
+        """Drops the cached catalogue, the next read parses the file again."""
+        self._cache = None
+        self._cache_signature = None
+
+    def _save_movies(self, movies):
+        """Saves the movies dictionary to the file and keeps the cache in sync. The notes sidecar
+        is folded into the file by this and removed."""
+        try:
+            self._replace_file(movies)
+            if os.path.exists(self.notes_file):
+                os.remove(self.notes_file)
+        except Exception:
+            self.invalidate_cache()
+            raise
+        if self.cached:
+            self._cache = movies
+            self._cache_signature = self._signature()
+
+    @contextmanager
+    def batch(self):
+        """
+        Applies the mutations made inside the with block to the catalogue in memory and saves
+        it once at the end, under the exclusive lock. If the block raises nothing is saved and
+        the catalogue is reloaded from the file. Nested batches join the outer one, other threads
+        wait for the lock until the batch is done.
+        """
+        with self.locked(exclusive=True):
+            if self._batch is not None:
+                yield self
+                return
+            movies = self.list_movies()
+            self._batch_movies = movies
+            self._batch = []
+            try:
+                yield self
+            except BaseException:
+                self.invalidate_cache()
+                raise
+            else:
+                changes, dirty = self._batch, self._batch_dirty
+            finally:
+                self._batch = None
+                self._batch_movies = None
+                self._batch_dirty = False
+            if dirty:
+                self._flush(movies, changes)
+
+    def _commit(self, movies, added=(), removed=()):
+        """Saves the movies and applies the added and removed (title, movie) pairs to the
+        indexes and aggregates, or records them until the end of the batch."""
+        changes = [(title, movie, False) for title, movie in removed] + [(title, movie, True) for title, movie in added]
+        if self._batch is not None:
+            self._batch.extend(changes)
+            self._batch_dirty = True
+            return
+        self._flush(movies, changes)
+
+    def _flush(self, movies, changes):
+        """Saves the movies and applies the (title, movie, added) changes in order to the indexes
+        and aggregates."""
+        previous_signature = self._file_signature()
+        self._save_movies(movies)
+        if movies is self._indexed_movies:
+            for index in self._indexes.values():
+                for title, movie, added in changes:
+                    if added:
+                        index.add(title, movie)
+                    else:
+                        index.remove(title, movie)
+        if self.aggregates_file is not None:
+            if self._aggregates is None or self._aggregates_signature != previous_signature:
+                self._aggregates = MovieAggregates.load(self.aggregates_file, previous_signature)
+                if self._aggregates is None:
+                    return
+            for title, movie, added in changes:
+                if added:
+                    self._aggregates.add(title, movie)
+                else:
+                    self._aggregates.remove(title, movie)
+            self._aggregates.update_extremes(movies)
+            self._aggregates_signature = self._file_signature()
+            # saved even without changed ratings, the signature of the rewritten file is new
+            self._aggregates.save(self.aggregates_file, self._aggregates_signature)
+
+    def aggregates(self):
+        """Returns the running aggregates of the catalogue. They are loaded from the aggregates
+        file if it matches the storage file, otherwise rebuilt from the catalogue and stored."""
+        if self.aggregates_file is None:
+            raise RuntimeError("Aggregates are not enabled for this storage.")
+        signature = self._file_signature()
+        if self._aggregates is None or self._aggregates_signature != signature:
+            aggregates = MovieAggregates.load(self.aggregates_file, signature)
+            if aggregates is None:
+                aggregates = MovieAggregates(self.list_movies())
+                aggregates.save(self.aggregates_file, signature)
+            self._aggregates = aggregates
+            self._aggregates_signature = signature
+        return self._aggregates
+
+    def stats(self):
+        """Returns the rating statistics as a MovieStats object, from the aggregates if enabled."""
+        if self.aggregates_file is not None:
+            return self.aggregates().stats()
+        return compute_stats(self.list_movies().items())
+
+    def __contains__(self, title):
+        """Checks if the movie with the given title exists in the storage."""
+        return title in self.list_movies()
+
+    def columns(self):
+        """Returns the titles, years and ratings of the movies as three aligned sequences."""
+        movies = self.list_movies()
+        columns = getattr(movies, 'columns', None)
+        if columns is not None:
+            return columns()
+        return (list(movies), [movie['year'] for movie in movies.values()],
+                [movie['rating'] for movie in movies.values()])
+
+    def random_access(self):
+        """Returns (size, movie_at) for random picks by position if the cached catalogue supports
+        it, None otherwise."""
+        if not self.cached:
+            return None
+        random_access = getattr(self.list_movies(), 'random_access', None)
+        return random_access() if random_access is not None else None
+
+    def _index(self, name, factory):
+        """
+        Returns the named index of the current catalogue and the catalogue, building the index
+        with factory(movies) if it doesn't exist yet or the catalogue changed since. Without the
+        cache, the indexes and the catalogue they were built from are kept until the signature
+        of the file changes, instead of being rebuilt from a new read on every call.
+        """
+        if self.cached or self._batch_movies is not None:
+            signature = None
+            movies = self.list_movies()
+            current = movies is self._indexed_movies
+        else:
+            signature = self._signature()
+            current = self._indexed_movies is not None and signature == self._indexed_signature
+            movies = self._indexed_movies if current else self.list_movies()
+        if not current:
+            self._indexes = {}
+            self._indexed_movies = movies
+            self._indexed_signature = signature
+        index = self._indexes.get(name)
+        if index is None:
+            index = self._indexes[name] = factory(movies)
+        return index, movies
+
+    def find_title(self, title):
+        """Returns the stored title that matches the given one case-insensitively, or None."""
+        return self._index('title', TitleIndex)[0].find(title)
+
+    def search_movies(self, query, ranked=True):
+        """Returns the movies whose title contains the query case-insensitively as (title, movie)
+        tuples, ordered by the position of the match if ranked."""
+        index, movies = self._index('title', TitleIndex)
+        return [(title, movies[title]) for title in index.search(query, ranked)]
+
+    def top_n(self, k=None):
+        """Returns the k highest rated movies (all if k is None) as (title, movie) tuples."""
+        index, movies = self._index('rating', RatingIndex)
+        return [(title, movies[title]) for title in index.top_n(k)]
+
+    def bottom_n(self, k=None):
+        """Returns the k lowest rated movies (all if k is None) as (title, movie) tuples."""
+        index, movies = self._index('rating', RatingIndex)
+        return [(title, movies[title]) for title in index.bottom_n(k)]
+
+    def iter_by_rating(self, page_size):
+        """Yields the movies in descending rating order as pages of (title, movie) tuples."""
+        index, movies = self._index('rating', RatingIndex)
+        for titles in index.iter_pages(page_size):
+            yield [(title, movies[title]) for title in titles]
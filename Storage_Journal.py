@@ -0,0 +1,319 @@
+import json
+import os
+import threading
+from contextlib import contextmanager
+from IStorage import IStorage
+from Title_Index import TitleIndex
+
+
+class StorageJournal(IStorage):
+    """
+    Storage that appends every mutation as a JSON line to a journal file.
+
+    The catalogue is rebuilt on open by loading the last snapshot and replaying the journal.
+    Once the journal grows past compact_threshold bytes it is rotated and a new snapshot is
+    written in a background thread. Every log line and snapshot carry a generation number,
+    so a crash at any point during compaction still replays to the same state.
+    """
+
+    def __init__(self, storage_file, compact_threshold=4 * 1024 * 1024, fsync=True):
+        self.storage_file = storage_file
+        self.snapshot_file = storage_file + '.snapshot'
+        self.rotated_file = storage_file + '.old'
+        self.compact_threshold = compact_threshold
+        self.fsync = fsync
+        self._lock = threading.RLock()
+        self._compaction = None
+        self._movies = {}
+        self._title_index = None
+        self._generation = 0
+        self._pending = None
+        self._undo = None
+        self._load()
+        self._log = open(self.storage_file, 'ab')
+        if self._log.tell() == 0:
+            self._write_header(self._log, self._generation)
+
+    def _load(self):
+        """Loads the snapshot and replays the rotated and the current journal on top of it."""
+        snapshot_generation = 0
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as file:
+                snapshot = json.load(file)
+            snapshot_generation = snapshot['generation']
+            self._movies = snapshot['movies']
+        except FileNotFoundError:
+            pass
+        self._generation = snapshot_generation
+        for journal_file in (self.rotated_file, self.storage_file):
+            generation = self._replay(journal_file, snapshot_generation)
+            if generation is not None:
+                self._generation = max(self._generation, generation)
+        if generation is not None and generation < snapshot_generation:
+            # left by a crash right after a recovery snapshot, which already contains it
+            os.remove(self.storage_file)
+        if os.path.exists(self.rotated_file):
+            if self._generation > snapshot_generation:
+                # a compaction was interrupted: the snapshot takes in both journals, so it gets the
+                # next generation and the current journal is started again, or it would be replayed twice
+                self._generation += 1
+                self._write_snapshot(self._generation, self._copy_movies())
+                os.remove(self.storage_file)
+            else:
+                os.remove(self.rotated_file)
+
+    def _replay(self, journal_file, snapshot_generation):
+        """Applies the records of one journal file and returns its generation.
+        A torn record at the end of the file (crash while appending) is cut off."""
+        try:
+            file = open(journal_file, 'r+b')
+        except FileNotFoundError:
+            return None
+        with file:
+            data = file.read()
+            generation = None
+            offset = 0
+            while offset < len(data):
+                end = data.find(b'\n', offset)
+                if end == -1:
+                    file.truncate(offset)
+                    break
+                line = data[offset:end]
+                offset = end + 1
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    raise RuntimeError(f"Journal '{journal_file}' is corrupted at byte {offset - len(line) - 1}.")
+                if record['op'] == 'header':
+                    generation = record['generation']
+                elif generation is not None and generation >= snapshot_generation:
+                    self._apply(record)
+            return generation
+
+    def _apply(self, record):
+        """Applies a single journal record to the in-memory catalogue."""
+        op = record['op']
+        if op == 'add':
+            movie = record['movie']
+            self._movies[movie['title']] = movie
+            if self._title_index is not None:
+                self._title_index.add(movie['title'])
+        elif op == 'delete':
+            self._movies.pop(record['title'], None)
+            if self._title_index is not None:
+                self._title_index.remove(record['title'])
+        elif op == 'update':
+            movie = self._movies.get(record['title'])
+            if movie is not None:
+                movie['notes'] = record['notes']
+        elif op == 'batch':
+            for batch_record in record['records']:
+                self._apply(batch_record)
+
+    def _write_header(self, log, generation):
+        """Starts a journal file with its generation header."""
+        log.write(json.dumps({'op': 'header', 'generation': generation}).encode('utf-8') + b'\n')
+        self._sync(log)
+
+    def _sync(self, file):
+        """Flushes the file and, if enabled, forces it to disk."""
+        file.flush()
+        if self.fsync:
+            os.fsync(file.fileno())
+
+    def _append(self, record, applied=False):
+        """Appends a record to the journal and applies it unless it already was, or only applies it
+        and keeps it for the end of the batch. Must be called with the lock held."""
+        if self._pending is not None:
+            for title in self._titles(record):
+                movie = self._movies.get(title)
+                self._undo.append((title, dict(movie) if movie is not None else None))
+            self._apply(record)
+            self._pending.append(record)
+            return
+        self._log.write(json.dumps(record).encode('utf-8') + b'\n')
+        self._sync(self._log)
+        if not applied:
+            self._apply(record)
+        if self._log.tell() >= self.compact_threshold:
+            self._rotate()
+
+    @staticmethod
+    def _titles(record):
+        """Returns the titles a record changes."""
+        if record['op'] == 'add':
+            return [record['movie']['title']]
+        if record['op'] == 'batch':
+            return [title for batch_record in record['records'] for title in StorageJournal._titles(batch_record)]
+        return [record['title']]
+
+    @contextmanager
+    def batch(self):
+        """
+        Applies the mutations made inside the with block right away in memory and appends them
+        as a single batch record at the end, so they are replayed all or not at all. If the
+        block raises the changes are undone and nothing is written. The lock is held for the
+        whole block, so mutations of other threads wait instead of joining the batch.
+        """
+        with self._lock:
+            if self._pending is not None:
+                yield self
+                return
+            self._pending = []
+            self._undo = []
+            try:
+                yield self
+            except BaseException:
+                for title, movie in reversed(self._undo):
+                    if movie is None:
+                        self._movies.pop(title, None)
+                    else:
+                        self._movies[title] = movie
+                self._title_index = None
+                raise
+            finally:
+                records, self._pending, self._undo = self._pending, None, None
+            if records:
+                self._append({'op': 'batch', 'records': records}, applied=True)
+
+    def _copy_movies(self):
+        """Returns a copy of the catalogue that later updates won't touch."""
+        return {title: dict(movie) for title, movie in self._movies.items()}
+
+    def _rotate(self):
+        """Moves the current journal aside and starts writing its snapshot in the background.
+        Must be called with the lock held."""
+        if self._compaction is not None and self._compaction.is_alive():
+            return
+        self._log.close()
+        os.replace(self.storage_file, self.rotated_file)
+        self._generation += 1
+        self._log = open(self.storage_file, 'ab')
+        self._write_header(self._log, self._generation)
+        self._start_snapshot(self._generation, self._copy_movies())
+
+    def _start_snapshot(self, generation, movies):
+        """Writes the snapshot in a background thread."""
+        self._compaction = threading.Thread(target=self._write_snapshot, args=(generation, movies))
+        self._compaction.start()
+
+    def _write_snapshot(self, generation, movies):
+        """Atomically replaces the snapshot and removes the journal it supersedes."""
+        temp_file = self.snapshot_file + '.tmp'
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            json.dump({'generation': generation, 'movies': movies}, file)
+            self._sync(file)
+        os.replace(temp_file, self.snapshot_file)
+        try:
+            os.remove(self.rotated_file)
+        except FileNotFoundError:
+            pass
+
+    def compact(self):
+        """Rotates the journal into a new snapshot and waits for it to be written."""
+        self.wait_for_compaction()
+        with self._lock:
+            self._rotate()
+        self.wait_for_compaction()
+
+    def wait_for_compaction(self):
+        """Blocks until a running background compaction has finished."""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+
+    def close(self):
+        """Waits for the background compaction and closes the journal. A journal that grew past
+        the threshold while the compaction was running is compacted first."""
+        self.wait_for_compaction()
+        with self._lock:
+            if self._log.tell() >= self.compact_threshold:
+                self._rotate()
+        self.wait_for_compaction()
+        with self._lock:
+            self._log.close()
+
+    def list_movies(self):
+        """Lists all the movies as a dictionary. The dictionary is the live catalogue and must not be modified."""
+        return self._movies
+
+    def add_movie(self, title, year, rating, poster, imdb_url):
+        """Appends a new movie with the provided details to the journal."""
+        with self._lock:
+            if title in self._movies:
+                raise RuntimeError(f"Movie with title '{title}' already exists.")
+            movie = {
+                'title': title,
+                'year': year,
+                'rating': rating,
+                'poster_url': poster,
+                'imdb_url': imdb_url,
+                'notes': ''
+            }
+            self._append({'op': 'add', 'movie': movie})
+
+    def add_many(self, new_movies):
+        """Appends many movies given as (title, year, rating, poster, imdb_url) tuples as one record,
+        so they are replayed all or not at all. Nothing is added if one of the titles already exists."""
+        with self._lock:
+            records = []
+            titles = set()
+            for title, year, rating, poster, imdb_url in new_movies:
+                if title in self._movies or title in titles:
+                    raise RuntimeError(f"Movie with title '{title}' already exists.")
+                titles.add(title)
+                records.append({'op': 'add', 'movie': {
+                    'title': title,
+                    'year': year,
+                    'rating': rating,
+                    'poster_url': poster,
+                    'imdb_url': imdb_url,
+                    'notes': ''
+                }})
+            if records:
+                self._append({'op': 'batch', 'records': records})
+
+    def delete_movie(self, title):
+        """Appends the deletion of the movie with the given title to the journal."""
+        with self._lock:
+            if title not in self._movies:
+                raise RuntimeError(f"No movie with title '{title}' found.")
+            self._append({'op': 'delete', 'title': title})
+
+    def update_movie(self, title, new_note=None):
+        """Appends the new notes of the movie with the given title to the journal."""
+        if title not in self._movies:
+            raise RuntimeError(f"No movie with title '{title}' found.")
+        if new_note is None:
+            update_decision = input("Do you want to update the note? (y/n): ")
+            if update_decision.lower() != "y":
+                print("Update cancelled.")
+                return
+            new_note = input("Enter the new note: ")
+        with self._lock:
+            if title not in self._movies:
+                raise RuntimeError(f"No movie with title '{title}' found.")
+            self._append({'op': 'update', 'title': title, 'notes': new_note})
+
+    def __contains__(self, title):
+        """Checks if the movie with the given title exists in the journal."""
+        return title in self._movies
+
+    def _get_title_index(self):
+        """Returns the title index, building it on first use."""
+        with self._lock:
+            if self._title_index is None:
+                self._title_index = TitleIndex(self._movies)
+            return self._title_index
+
+    def find_title(self, title):
+        """Returns the stored title that matches the given one case-insensitively, or None."""
+        return self._get_title_index().find(title)
+
+    def search_movies(self, query, ranked=True):
+        """Returns the movies whose title contains the query case-insensitively as (title, movie)
+        tuples, ordered by the position of the match if ranked."""
+        titles = self._get_title_index().search(query, ranked)
+        return [(title, self._movies[title]) for title in titles]
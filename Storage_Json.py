@@ -1,20 +1,98 @@
 import json
-from IStorage import IStorage
+from Json_Codec import compression, get_codec, open_text, read_json, write_json
+from Storage_File import StorageFile, exclusive
 
+CHUNK_SIZE = 64 * 1024
 
-class StorageJson(IStorage):
-    def __init__(self, storage_file):
-        self.storage_file = storage_file
 
-    def list_movies(self):
-        """Lists all the movies from the JSON file as a dictionary."""
+class StorageJson(StorageFile):
+    """
+    Storage in a JSON file. The file is read and written with the fastest available codec that
+    keeps its indentation (see get_codec) unless one is named, indented by indent or compact if
+    indent is None, and compressed with gzip or zstd if its name ends in .gz or .zst.
+    """
+
+    def __init__(self, storage_file, cached=False, aggregates=False, compact=False, notes_sidecar=False,
+                 fsync=True, codec=None, indent=4):
+        super().__init__(storage_file, cached, aggregates, compact, notes_sidecar, fsync=fsync)
+        self.codec = get_codec(codec, indent)
+        self.indent = indent
+        self.compression = compression(storage_file)
+
+    def _read_movies(self):
+        """Reads all the movies from the JSON file as a dictionary."""
         try:
-            with open(self.storage_file, 'r') as file:
-                movies = json.load(file)
-                return movies
+            return read_json(self.storage_file, self.codec, self.compression)
         except FileNotFoundError:
             return {}
 
+    def _stream_movies(self):
+        """
+        Yields the movies from the JSON file as (title, movie) tuples while reading it in chunks.
+        Each "title": {...} member of the top-level object is decoded with raw_decode as soon as
+        it is complete, so only one movie and one chunk are held in memory at a time.
+        """
+        try:
+            file = open_text(self.storage_file, self.compression)
+        except FileNotFoundError:
+            return
+        decoder = json.JSONDecoder()
+        with file:
+            buffer = ''
+            position = 0
+            eof = False
+
+            def skip(characters):
+                """Skips whitespace and the given characters, reading more of the file if needed."""
+                nonlocal buffer, position, eof
+                while True:
+                    while position < len(buffer) and (buffer[position].isspace() or buffer[position] in characters):
+                        position += 1
+                    if position < len(buffer) or eof:
+                        return
+                    buffer, position = file.read(CHUNK_SIZE), 0
+                    eof = not buffer
+
+            def decode():
+                """Decodes the next JSON value, reading more of the file until it is complete."""
+                nonlocal buffer, position, eof
+                while True:
+                    try:
+                        value, end = decoder.raw_decode(buffer, position)
+                    except json.JSONDecodeError:
+                        if eof:
+                            raise
+                        chunk = file.read(CHUNK_SIZE)
+                        eof = not chunk
+                        buffer, position = buffer[position:] + chunk, 0
+                        continue
+                    if end == len(buffer) and not eof:
+                        # a number could continue in the next chunk
+                        chunk = file.read(CHUNK_SIZE)
+                        if chunk:
+                            buffer, position = buffer[position:] + chunk, 0
+                            continue
+                        eof = True
+                    position = end
+                    return value
+
+            skip('')
+            if eof:
+                return
+            if buffer[position] != '{':
+                raise ValueError(f"'{self.storage_file}' doesn't contain a JSON object of movies.")
+            position += 1
+            while True:
+                skip(',')
+                if eof:
+                    raise ValueError(f"'{self.storage_file}' ends in the middle of the movies.")
+                if buffer[position] == '}':
+                    return
+                title = decode()
+                skip(':')
+                yield title, decode()
+
+    @exclusive
     def add_movie(self, title, year, rating, poster, imdb_url):
         """Adds a new movie to the JSON file with the provided details."""
         movies = self.list_movies()
@@ -29,36 +107,33 @@ class StorageJson(IStorage):
             'notes': ''
         }
         movies[title] = movie
-        self._save_movies(movies)
+        self._commit(movies, added=[(title, movie)])
 
+    @exclusive
     def delete_movie(self, title):
         """Deletes the movie with the given title from the JSON file."""
         movies = self.list_movies()
         if title not in movies:
             raise RuntimeError(f"No movie with title '{title}' found.")
-        del movies[title]
-        self._save_movies(movies)
+        movie = movies.pop(title)
+        self._commit(movies, removed=[(title, movie)])
 
     def update_movie(self, title, new_note=None):
-        """Updates the notes of the movie with the given title in the JSON file."""
-        movies = self.list_movies()
-        if title not in movies:
-            raise RuntimeError(f"No movie with title '{title}' found.")
+        """Updates the notes of the movie with the given title in the JSON file, asking for them if
+        they aren't given."""
         if new_note is None:
-            update_decision = input("Do you want to update the note? (y/n): ")
-            if update_decision.lower() != "y":
-                print("Update cancelled.")
+            new_note = self._ask_for_note(title)
+            if new_note is None:
                 return
-            new_note = input("Enter the new note: ")
-        movies[title]['notes'] = new_note
-        self._save_movies(movies)
+        self._update_notes(title, new_note)
 
-    def _save_movies(self, movies):
-        """Saves the movies dictionary to the JSON file."""
-        with open(self.storage_file, 'w') as file:
-            json.dump(movies, file, indent=4)
-
-    def __contains__(self, title):
-        """Checks if the movie with the given title exists in the JSON file."""
+    @exclusive
+    def _update_notes(self, title, new_note):
         movies = self.list_movies()
-        return title in movies
+        if title not in movies:
+            raise RuntimeError(f"No movie with title '{title}' found.")
+        self._set_notes(movies, title, new_note)
+
+    def _write_movies(self, movies, path):
+        """Writes the movies dictionary as JSON to the file at path, compressed like the storage file."""
+        write_json(path, movies, self.codec, self.indent, self.compression)
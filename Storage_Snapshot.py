@@ -0,0 +1,332 @@
+import mmap
+import os
+import struct
+import sys
+from collections.abc import MutableMapping
+from Storage_File import StorageFile, exclusive
+
+MAGIC = b'MOVSNAP1'
+# magic, movie count, offsets of the record section, the title index and the string heap
+HEADER = struct.Struct('<8s4Q')
+# rating, year, then heap offset and length of title, poster_url, imdb_url and notes
+RECORD = struct.Struct('<dh4Q4I')
+# record number, the title index is a sorted array of these
+INDEX_ENTRY = struct.Struct('<I')
+STRING_FIELDS = ('title', 'poster_url', 'imdb_url', 'notes')
+
+
+def write_snapshot_file(file, movies):
+    """
+    Writes the movies as a binary snapshot to an open file: a header, one fixed-width record
+    per movie, the record numbers sorted by title and a heap with all the strings as UTF-8.
+    """
+    records = bytearray()
+    heap = bytearray()
+    titles = []
+    for title, movie in movies.items():
+        offsets = []
+        lengths = []
+        for field in STRING_FIELDS:
+            encoded = (title if field == 'title' else movie.get(field) or '').encode('utf-8')
+            offsets.append(len(heap))
+            lengths.append(len(encoded))
+            heap += encoded
+        records += RECORD.pack(float(movie['rating']), int(movie['year']), *offsets, *lengths)
+        titles.append(title)
+    index = b''.join(INDEX_ENTRY.pack(number) for number in sorted(range(len(titles)), key=titles.__getitem__))
+    records_offset = HEADER.size
+    index_offset = records_offset + len(records)
+    heap_offset = index_offset + len(index)
+    file.write(HEADER.pack(MAGIC, len(titles), records_offset, index_offset, heap_offset))
+    file.write(records)
+    file.write(index)
+    file.write(heap)
+
+
+def write_snapshot(snapshot_file, movies):
+    """Writes the movies to a snapshot file next to the target and moves it into place once complete."""
+    temp_file = snapshot_file + '.tmp'
+    with open(temp_file, 'wb') as file:
+        write_snapshot_file(file, movies)
+    os.replace(temp_file, snapshot_file)
+
+
+class MappedCatalogue(MutableMapping):
+    """
+    Dictionary of movies backed by a memory-mapped snapshot.
+
+    Opening only reads the header, movies are decoded from the mapping when they are
+    accessed and titles are looked up by binary search over the title index. The pages of
+    the file are shared by every process that maps it. Changes are kept in memory on top
+    of the mapping until the catalogue is written to a new snapshot.
+    """
+
+    def __init__(self, snapshot_file=None):
+        self._map = None
+        self._count = 0
+        self._changed = {}
+        self._deleted = set()
+        self._length = 0
+        if snapshot_file is not None:
+            self.remap(snapshot_file)
+
+    def remap(self, snapshot_file):
+        """Maps a snapshot of this catalogue, e.g. the one it was just written to, and drops the
+        changes kept on top of the previous mapping."""
+        new_map = None
+        with open(snapshot_file, 'rb') as file:
+            if os.fstat(file.fileno()).st_size:
+                new_map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        count = offsets = 0
+        if new_map is not None:
+            magic, count, *offsets = HEADER.unpack_from(new_map)
+            if magic != MAGIC:
+                new_map.close()
+                raise RuntimeError(f"'{snapshot_file}' is not a movie snapshot.")
+            self._records_offset, self._index_offset, self._heap_offset = offsets
+        self._map = new_map
+        self._count = count
+        self._changed = {}
+        self._deleted = set()
+        self._length = count
+
+    def _record(self, number):
+        """Unpacks the fixed-width record of a movie."""
+        return RECORD.unpack_from(self._map, self._records_offset + number * RECORD.size)
+
+    def _string(self, offset, length):
+        """Decodes a string from the heap."""
+        start = self._heap_offset + offset
+        return self._map[start:start + length].decode('utf-8')
+
+    def _title(self, number):
+        """Decodes the title of a movie."""
+        record = self._record(number)
+        return self._string(record[2], record[6])
+
+    def _decode(self, number):
+        """Decodes a movie into a dictionary."""
+        rating, year, *offsets_and_lengths = self._record(number)
+        movie = {field: self._string(offset, length)
+                 for field, offset, length in zip(STRING_FIELDS, offsets_and_lengths[:4], offsets_and_lengths[4:])}
+        movie['year'] = year
+        movie['rating'] = rating
+        return movie
+
+    def _index_entry(self, position):
+        """Returns the record number at a position of the title index."""
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + position * INDEX_ENTRY.size)[0]
+
+    def _find(self, title):
+        """Returns the record number of a title in the snapshot, or None."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            number = self._index_entry(middle)
+            found = self._title(number)
+            if found == title:
+                return number
+            if found < title:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def _in_snapshot(self, title):
+        return self._count and title not in self._deleted and self._find(title) is not None
+
+    def __getitem__(self, title):
+        movie = self._changed.get(title)
+        if movie is not None:
+            return movie
+        number = None if title in self._deleted or not self._count else self._find(title)
+        if number is None:
+            raise KeyError(title)
+        return self._decode(number)
+
+    def __setitem__(self, title, movie):
+        if title not in self:
+            self._length += 1
+        self._changed[title] = movie
+
+    def __delitem__(self, title):
+        if title not in self:
+            raise KeyError(title)
+        self._changed.pop(title, None)
+        if self._count and self._find(title) is not None:
+            self._deleted.add(title)
+        self._length -= 1
+
+    def __contains__(self, title):
+        return title in self._changed or bool(self._in_snapshot(title))
+
+    def __len__(self):
+        return self._length
+
+    def _snapshot_titles(self):
+        """Yields (record number, title) of the movies in the snapshot in file order."""
+        for number in range(self._count):
+            yield number, self._title(number)
+
+    def __iter__(self):
+        for _, title in self._snapshot_titles():
+            if title not in self._deleted:
+                yield title
+        for title in list(self._changed):
+            if title in self._deleted or not self._count or self._find(title) is None:
+                yield title
+
+    def items(self):
+        """Returns (title, movie) pairs, decoding every movie once."""
+        for number, title in self._snapshot_titles():
+            if title in self._deleted:
+                continue
+            movie = self._changed.get(title)
+            yield title, movie if movie is not None else self._decode(number)
+        for title, movie in list(self._changed.items()):
+            if title in self._deleted or not self._count or self._find(title) is None:
+                yield title, movie
+
+    def values(self):
+        return (movie for _, movie in self.items())
+
+    def random_access(self):
+        """Returns the number of positions and a function returning the (title, movie) at a
+        position: the records of the snapshot first, then the movies added since. Positions of
+        deleted movies return None."""
+        added = [title for title in self._changed
+                 if title in self._deleted or not self._count or self._find(title) is None]
+
+        def movie_at(position):
+            if position >= self._count:
+                title = added[position - self._count]
+                return title, self._changed[title]
+            title = self._title(position)
+            if title in self._deleted:
+                return None
+            movie = self._changed.get(title)
+            return title, movie if movie is not None else self._decode(position)
+        return self._count + len(added), movie_at
+
+    def columns(self):
+        """Returns the titles, years and ratings of the movies as three aligned lists, read
+        straight from the record section if nothing changed since the snapshot was mapped."""
+        if self._changed or self._deleted:
+            movies = list(self.items())
+            return ([title for title, _ in movies], [movie['year'] for _, movie in movies],
+                    [movie['rating'] for _, movie in movies])
+        if not self._count:
+            return [], [], []
+        records = list(RECORD.iter_unpack(
+            memoryview(self._map)[self._records_offset:self._records_offset + self._count * RECORD.size]))
+        return ([self._string(record[2], record[6]) for record in records],
+                [record[1] for record in records], [record[0] for record in records])
+
+
+class StorageSnapshot(StorageFile):
+    """
+    Storage in a memory-mapped binary snapshot that loads in constant time.
+    Every change writes a new snapshot; the catalogue keeps reading from the mapping of the
+    previous one plus the changes until it is loaded again.
+    """
+
+    def __init__(self, storage_file, cached=False, aggregates=False, fsync=True):
+        super().__init__(storage_file, cached, aggregates, fsync=fsync)
+
+    def _read_movies(self):
+        """Maps the snapshot file."""
+        try:
+            return MappedCatalogue(self.storage_file)
+        except FileNotFoundError:
+            return MappedCatalogue()
+
+    def _write_movies(self, movies, path):
+        """Writes the movies as a snapshot to the file at path."""
+        with open(path, 'wb') as file:
+            write_snapshot_file(file, movies)
+
+    def _save_movies(self, movies):
+        """Saves the movies and, in cached mode, maps the new snapshot under the cached catalogue,
+        so the changes kept in memory don't grow for as long as the storage is open."""
+        super()._save_movies(movies)
+        if self.cached and isinstance(movies, MappedCatalogue):
+            movies.remap(self.storage_file)
+            self._cache_signature = self._signature()
+
+    def random_access(self):
+        """Returns random access into the mapped snapshot, which is cheap to open."""
+        return self.list_movies().random_access()
+
+    @exclusive
+    def add_movie(self, title, year, rating, poster, imdb_url):
+        """Adds a new movie to the snapshot with the provided details."""
+        movies = self.list_movies()
+        if title in movies:
+            raise RuntimeError(f"Movie with title '{title}' already exists.")
+        movie = {
+            'title': title,
+            'year': year,
+            'rating': rating,
+            'poster_url': poster,
+            'imdb_url': imdb_url,
+            'notes': ''
+        }
+        movies[title] = movie
+        self._commit(movies, added=[(title, movie)])
+
+    @exclusive
+    def delete_movie(self, title):
+        """Deletes the movie with the given title from the snapshot."""
+        movies = self.list_movies()
+        if title not in movies:
+            raise RuntimeError(f"No movie with title '{title}' found.")
+        movie = movies.pop(title)
+        self._commit(movies, removed=[(title, movie)])
+
+    def update_movie(self, title, new_note=None):
+        """Updates the notes of the movie with the given title in the snapshot, asking for them if
+        they aren't given."""
+        if new_note is None:
+            new_note = self._ask_for_note(title)
+            if new_note is None:
+                return
+        self._update_notes(title, new_note)
+
+    @exclusive
+    def _update_notes(self, title, new_note):
+        movies = self.list_movies()
+        if title not in movies:
+            raise RuntimeError(f"No movie with title '{title}' found.")
+        movie = dict(movies[title])
+        movie['notes'] = new_note
+        movies[title] = movie
+        self._commit(movies)
+
+
+def main():
+    """
+        Converts a JSON or CSV movie file into a snapshot.
+
+        How to use it:
+            python3 Storage_Snapshot.py Movies.json movies.snap
+        """
+    if len(sys.argv) != 3:
+        print("Usage: python3 Storage_Snapshot.py <movies.json|movies.csv> <movies.snap>")
+        return
+    source_file, snapshot_file = sys.argv[1:]
+    if source_file.endswith('.csv'):
+        from Storage_Csv import StorageCsv
+        source = StorageCsv(source_file)
+    elif source_file.endswith(('.json', '.json.gz', '.json.zst')):
+        from Storage_Json import StorageJson
+        source = StorageJson(source_file)
+    else:
+        print('Invalid file extension. Please use a .json, .json.gz, .json.zst or .csv file.')
+        return
+    movies = source.list_movies()
+    write_snapshot(snapshot_file, movies)
+    print(f"Wrote {len(movies)} movies to {snapshot_file}.")
+
+
+if __name__ == "__main__":
+    main()
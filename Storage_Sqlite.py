@@ -0,0 +1,318 @@
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+from IStorage import IStorage
+
+
+class StorageSqlite(IStorage):
+    """
+    Storage backed by a SQLite database with the title as primary key and indexes on
+    year, rating and the case-insensitive title. Besides the IStorage methods it offers
+    queries that MovieApp uses instead of scanning list_movies() in Python.
+
+    Titles are also stored casefolded by Python, as SQLite only folds ASCII letters, and
+    substring searches go through a trigram full-text index of them where SQLite has FTS5.
+    """
+
+    COLUMNS = ('title', 'year', 'rating', 'poster_url', 'imdb_url', 'notes')
+    SELECT = f"SELECT {', '.join(COLUMNS)} FROM movies"
+
+    def __init__(self, storage_file, check_same_thread=True):
+        self.storage_file = storage_file
+        # check_same_thread=False lets other threads use the connection, e.g. the API server
+        self.connection = sqlite3.connect(storage_file, check_same_thread=check_same_thread)
+        self.connection.row_factory = sqlite3.Row
+        # transactions of the shared connection are taken one thread at a time
+        self._lock = threading.RLock()
+        self._in_batch = False
+        self._full_text = False
+        self._create_schema()
+
+    def _create_schema(self):
+        """Creates the movies table and its indexes if they don't exist yet, adding the casefolded
+        titles and their full-text index to a database created without them."""
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS movies ("
+                "title TEXT PRIMARY KEY, year INTEGER NOT NULL, rating REAL NOT NULL, "
+                "poster_url TEXT NOT NULL DEFAULT '', imdb_url TEXT NOT NULL DEFAULT '', "
+                "notes TEXT NOT NULL DEFAULT '', title_folded TEXT NOT NULL DEFAULT '')"
+            )
+            columns = [row['name'] for row in self.connection.execute("PRAGMA table_info(movies)")]
+            if 'title_folded' not in columns:
+                self.connection.execute("ALTER TABLE movies ADD COLUMN title_folded TEXT NOT NULL DEFAULT ''")
+                self.connection.executemany(
+                    "UPDATE movies SET title_folded = ? WHERE rowid = ?",
+                    [(row['title'].casefold(), row['rowid'])
+                     for row in self.connection.execute("SELECT rowid, title FROM movies").fetchall()]
+                )
+            self.connection.execute("DROP INDEX IF EXISTS idx_movies_title_nocase")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_movies_year ON movies (year)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_movies_rating ON movies (rating)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS idx_movies_title_folded ON movies (title_folded)")
+        self._full_text = self._create_full_text_index()
+
+    def _create_full_text_index(self):
+        """Creates the trigram index of the casefolded titles, kept up to date by triggers.
+        Returns False if SQLite is built without FTS5 or its trigram tokenizer."""
+        exists = self.connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'movie_titles'").fetchone() is not None
+        try:
+            with self.connection:
+                self.connection.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS movie_titles USING fts5("
+                    "title_folded, content='movies', content_rowid='rowid', tokenize='trigram')"
+                )
+                self.connection.execute(
+                    "CREATE TRIGGER IF NOT EXISTS movie_titles_insert AFTER INSERT ON movies BEGIN "
+                    "INSERT INTO movie_titles (rowid, title_folded) VALUES (new.rowid, new.title_folded); END"
+                )
+                self.connection.execute(
+                    "CREATE TRIGGER IF NOT EXISTS movie_titles_delete AFTER DELETE ON movies BEGIN "
+                    "INSERT INTO movie_titles (movie_titles, rowid, title_folded) "
+                    "VALUES ('delete', old.rowid, old.title_folded); END"
+                )
+                self.connection.execute(
+                    "CREATE TRIGGER IF NOT EXISTS movie_titles_update AFTER UPDATE OF title_folded ON movies BEGIN "
+                    "INSERT INTO movie_titles (movie_titles, rowid, title_folded) "
+                    "VALUES ('delete', old.rowid, old.title_folded); "
+                    "INSERT INTO movie_titles (rowid, title_folded) VALUES (new.rowid, new.title_folded); END"
+                )
+                if not exists:
+                    self.connection.execute("INSERT INTO movie_titles (movie_titles) VALUES ('rebuild')")
+        except sqlite3.OperationalError:
+            return False
+        return True
+
+    @contextmanager
+    def _transaction(self):
+        """Runs the block in its own transaction, or in the one of the current batch."""
+        with self._lock:
+            if self._in_batch:
+                yield
+            else:
+                with self.connection:
+                    yield
+
+    @contextmanager
+    def batch(self):
+        """Runs the mutations made inside the with block in one transaction, committed at the end
+        or rolled back if the block raises. Other threads wait with their mutations until the
+        batch is done."""
+        with self._lock:
+            if self._in_batch:
+                yield self
+                return
+            self._in_batch = True
+            try:
+                with self.connection:
+                    yield self
+            finally:
+                self._in_batch = False
+
+    def _query(self, sql, parameters=()):
+        """Runs a query and returns the rows as a dictionary of movies keyed by title."""
+        rows = self.connection.execute(sql, parameters)
+        return {row['title']: dict(row) for row in rows}
+
+    def list_movies(self):
+        """Lists all the movies from the database as a dictionary."""
+        return self._query(self.SELECT)
+
+    def iter_movies(self):
+        """Yields the movies from the database as (title, movie) tuples, row by row."""
+        for row in self.connection.execute(self.SELECT):
+            yield row['title'], dict(row)
+
+    def add_movie(self, title, year, rating, poster, imdb_url):
+        """Adds a new movie to the database with the provided details."""
+        try:
+            with self._transaction():
+                self.connection.execute(
+                    "INSERT INTO movies (title, year, rating, poster_url, imdb_url, notes, title_folded) "
+                    "VALUES (?, ?, ?, ?, ?, '', ?)",
+                    (title, year, rating, poster, imdb_url, title.casefold())
+                )
+        except sqlite3.IntegrityError:
+            raise RuntimeError(f"Movie with title '{title}' already exists.")
+
+    def add_many(self, new_movies):
+        """Adds many movies given as (title, year, rating, poster, imdb_url) tuples in one transaction.
+        Nothing is added if one of the titles already exists."""
+        try:
+            with self._transaction():
+                self.connection.executemany(
+                    "INSERT INTO movies (title, year, rating, poster_url, imdb_url, notes, title_folded) "
+                    "VALUES (?, ?, ?, ?, ?, '', ?)",
+                    ((title, year, rating, poster, imdb_url, title.casefold())
+                     for title, year, rating, poster, imdb_url in new_movies)
+                )
+        except sqlite3.IntegrityError:
+            raise RuntimeError("At least one of the movies already exists.")
+
+    def delete_movie(self, title):
+        """Deletes the movie with the given title from the database."""
+        with self._transaction():
+            cursor = self.connection.execute("DELETE FROM movies WHERE title = ?", (title,))
+            if cursor.rowcount == 0:
+                raise RuntimeError(f"No movie with title '{title}' found.")
+
+    def update_movie(self, title, new_note=None):
+        """Updates the notes of the movie with the given title in the database."""
+        if title not in self:
+            raise RuntimeError(f"No movie with title '{title}' found.")
+        if new_note is None:
+            update_decision = input("Do you want to update the note? (y/n): ")
+            if update_decision.lower() != "y":
+                print("Update cancelled.")
+                return
+            new_note = input("Enter the new note: ")
+        with self._transaction():
+            self.connection.execute("UPDATE movies SET notes = ? WHERE title = ?", (new_note, title))
+
+    def __contains__(self, title):
+        """Checks if the movie with the given title exists in the database."""
+        row = self.connection.execute("SELECT 1 FROM movies WHERE title = ?", (title,)).fetchone()
+        return row is not None
+
+    def get_movie(self, title):
+        """Returns the movie with the given title as a dictionary, or None."""
+        row = self.connection.execute(self.SELECT + " WHERE title = ?", (title,)).fetchone()
+        return dict(row) if row else None
+
+    def find_title(self, title):
+        """Returns the stored title that matches the given one case-insensitively, or None."""
+        row = self.connection.execute(
+            "SELECT title FROM movies WHERE title_folded = ? ORDER BY rowid LIMIT 1", (title.casefold(),)
+        ).fetchone()
+        return row['title'] if row else None
+
+    def search_movies(self, query, ranked=True):
+        """Returns the movies whose title contains the query case-insensitively as (title, movie)
+        tuples, ordered by the position of the match if ranked. Queries of three or more
+        characters are looked up in the trigram index, shorter ones scan the titles."""
+        query = query.casefold()
+        order = "position, length(title), title" if ranked else "rowid"
+        columns = ', '.join(f"movies.{column}" for column in self.COLUMNS)
+        if self._full_text and len(query) >= 3:
+            rows = self.connection.execute(
+                f"SELECT {columns}, instr(movies.title_folded, ?) AS position FROM movie_titles "
+                f"JOIN movies ON movies.rowid = movie_titles.rowid WHERE movie_titles MATCH ? "
+                f"ORDER BY {order.replace('rowid', 'movies.rowid')}",
+                (query, '"' + query.replace('"', '""') + '"')
+            )
+        else:
+            rows = self.connection.execute(
+                f"SELECT {columns}, instr(title_folded, ?) AS position FROM movies "
+                f"WHERE position > 0 ORDER BY {order}",
+                (query,)
+            )
+        return [(row['title'], {column: row[column] for column in self.COLUMNS}) for row in rows]
+
+    def filter_movies(self, min_rating=None, max_rating=None, start_year=None, end_year=None):
+        """Returns the movies within the given rating and year ranges (bounds are inclusive)."""
+        conditions = []
+        parameters = []
+        for column, operator, value in (('rating', '>=', min_rating), ('rating', '<=', max_rating),
+                                        ('year', '>=', start_year), ('year', '<=', end_year)):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                parameters.append(value)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self._query(f"{self.SELECT}{where} ORDER BY rating DESC, title", parameters)
+
+    def random_access(self):
+        """Returns the rowid range and a function returning the (title, movie) with a rowid,
+        or None for the rowid of a deleted movie."""
+        max_rowid = self.connection.execute("SELECT MAX(rowid) FROM movies").fetchone()[0]
+        if max_rowid is None:
+            return None
+
+        def movie_at(position):
+            row = self.connection.execute(f"{self.SELECT} WHERE rowid = ?", (position + 1,)).fetchone()
+            return None if row is None else (row['title'], dict(row))
+        return max_rowid, movie_at
+
+    def columns(self):
+        """Returns the titles, years and ratings of the movies as three aligned lists."""
+        rows = self.connection.execute("SELECT title, year, rating FROM movies").fetchall()
+        return [row[0] for row in rows], [row[1] for row in rows], [row[2] for row in rows]
+
+    def top_n(self, k=None):
+        """Returns the k highest rated movies (all if k is None) as (title, movie) tuples."""
+        return self._ordered_by_rating("DESC", k)
+
+    def bottom_n(self, k=None):
+        """Returns the k lowest rated movies (all if k is None) as (title, movie) tuples."""
+        return self._ordered_by_rating("ASC", k)
+
+    def iter_by_rating(self, page_size):
+        """Yields the movies in descending rating order as pages of (title, movie) tuples."""
+        cursor = self.connection.execute(f"{self.SELECT} ORDER BY rating DESC, title")
+        while True:
+            rows = cursor.fetchmany(page_size)
+            if not rows:
+                return
+            yield [(row['title'], dict(row)) for row in rows]
+
+    def _ordered_by_rating(self, direction, k):
+        """Reads the movies in rating order through the rating index."""
+        rows = self.connection.execute(
+            f"{self.SELECT} ORDER BY rating {direction}, title LIMIT ?", (-1 if k is None else k,)
+        )
+        return [(row['title'], dict(row)) for row in rows]
+
+    def import_movies(self, source_storage):
+        """Copies all movies of another storage into the database in one transaction.
+        Returns the number of imported movies."""
+        movies = source_storage.list_movies()
+        rows = [
+            (title, movie['year'], movie['rating'], movie.get('poster_url', ''),
+             movie.get('imdb_url', ''), movie.get('notes', ''), title.casefold())
+            for title, movie in movies.items()
+        ]
+        with self._transaction():
+            self.connection.executemany(
+                "INSERT INTO movies (title, year, rating, poster_url, imdb_url, notes, title_folded) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT (title) DO UPDATE SET year = excluded.year, "
+                "rating = excluded.rating, poster_url = excluded.poster_url, imdb_url = excluded.imdb_url, "
+                "notes = excluded.notes",
+                rows
+            )
+        return len(rows)
+
+    def close(self):
+        """Closes the database connection."""
+        self.connection.close()
+
+
+def main():
+    """
+    One-shot importer from a JSON or CSV storage into a SQLite database.
+
+    How to use it:
+        python3 Storage_Sqlite.py Movies.json movies.db
+    """
+    from Storage_Csv import StorageCsv
+    from Storage_Json import StorageJson
+
+    if len(sys.argv) != 3:
+        print("Usage: python3 Storage_Sqlite.py <movies.json|movies.csv> <movies.db>")
+        return
+    source_file, target_file = sys.argv[1], sys.argv[2]
+    if source_file.endswith('.json'):
+        source = StorageJson(source_file)
+    elif source_file.endswith('.csv'):
+        source = StorageCsv(source_file)
+    else:
+        print('Invalid file extension. Please use a .json or .csv file.')
+        return
+    target = StorageSqlite(target_file)
+    count = target.import_movies(source)
+    target.close()
+    print(f"Imported {count} movies into {target_file}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import csv
+import json
+import random
+import sys
+
+WORDS = ("Dark", "Night", "Return", "Lost", "City", "Dream", "Last", "Star", "King", "Shadow",
+         "River", "Silent", "Empire", "Winter", "Ghost", "Golden", "Storm", "Secret", "Blue", "Fire")
+
+
+def synthetic_movies(count, seed=0):
+    """Yields count made-up (title, movie) pairs shaped like the stored movies, the same for a seed."""
+    generator = random.Random(seed)
+    for number in range(count):
+        words = generator.sample(WORDS, generator.randint(1, 3))
+        title = f"{' '.join(words)} {number}"
+        imdb_id = f"tt{number:07d}"
+        yield title, {
+            'title': title,
+            'year': generator.randint(1920, 2024),
+            'rating': round(generator.uniform(1.0, 10.0), 1),
+            'poster_url': f"https://m.media-amazon.com/images/M/{imdb_id}._V1_SX300.jpg",
+            'imdb_url': f"https://www.imdb.com/title/{imdb_id}/",
+            'notes': '',
+        }
+
+
+FIELDS = ('title', 'year', 'rating', 'poster_url', 'imdb_url', 'notes')
+
+
+def write_catalogue(path, count, seed=0):
+    """
+    Writes a synthetic catalogue of count movies as a JSON or CSV movie file, chosen by the
+    extension of path. The movies are written as they are generated, so any size fits in memory.
+    """
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        if path.endswith('.csv'):
+            writer = csv.writer(file)
+            writer.writerow(FIELDS)
+            for _, movie in synthetic_movies(count, seed):
+                writer.writerow([movie[field] for field in FIELDS])
+            return
+        file.write('{')
+        for number, (title, movie) in enumerate(synthetic_movies(count, seed)):
+            file.write(('\n' if not number else ',\n') + json.dumps(title) + ': ' + json.dumps(movie))
+        file.write('\n}\n')
+
+
+def main():
+    """
+        Writes a synthetic movie file.
+
+        How to use it:
+            python3 Synthetic_Catalogue.py 1000000 movies.json
+            python3 Synthetic_Catalogue.py 1000000 movies.csv
+        """
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python3 Synthetic_Catalogue.py <count> <movies.json|movies.csv> [seed]")
+        return
+    count, path = int(sys.argv[1]), sys.argv[2]
+    write_catalogue(path, count, int(sys.argv[3]) if len(sys.argv) == 4 else 0)
+    print(f"Wrote {count} movies to {path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+class TitleIndex:
+    """
+    Case-insensitive index over movie titles for exact and substring lookups.
+
+    Exact lookups go through a map of casefolded titles. Substring lookups intersect the
+    postings of the query's trigrams, so only titles sharing all of them are compared.
+    The index is updated incrementally with add() and remove().
+    """
+
+    def __init__(self, movies=()):
+        self._folded = {}
+        self._order = {}
+        self._exact = {}
+        self._trigrams = {}
+        self._short_titles = set()
+        self._counter = 0
+        for title in movies:
+            self.add(title)
+
+    @staticmethod
+    def _trigrams_of(text):
+        """Returns the set of three character substrings of the text."""
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+    def add(self, title, movie=None):
+        """Adds a title to the index."""
+        if title in self._folded:
+            return
+        folded = title.casefold()
+        self._folded[title] = folded
+        self._order[title] = self._counter
+        self._counter += 1
+        self._exact.setdefault(folded, []).append(title)
+        if len(folded) < 3:
+            self._short_titles.add(title)
+        for trigram in self._trigrams_of(folded):
+            self._trigrams.setdefault(trigram, set()).add(title)
+
+    def remove(self, title, movie=None):
+        """Removes a title from the index."""
+        folded = self._folded.pop(title, None)
+        if folded is None:
+            return
+        del self._order[title]
+        titles = self._exact[folded]
+        titles.remove(title)
+        if not titles:
+            del self._exact[folded]
+        self._short_titles.discard(title)
+        for trigram in self._trigrams_of(folded):
+            postings = self._trigrams[trigram]
+            postings.discard(title)
+            if not postings:
+                del self._trigrams[trigram]
+
+    def find(self, title):
+        """Returns the indexed title matching the given title case-insensitively, or None."""
+        titles = self._exact.get(title.casefold())
+        return titles[0] if titles else None
+
+    def _candidates(self, query):
+        """Returns the titles that may contain the casefolded query."""
+        if len(query) >= 3:
+            postings = sorted((self._trigrams.get(trigram, set()) for trigram in self._trigrams_of(query)), key=len)
+            return set.intersection(*postings) if postings[0] else set()
+        candidates = set(self._short_titles)
+        for trigram, postings in self._trigrams.items():
+            if query in trigram:
+                candidates.update(postings)
+        return candidates
+
+    def search(self, query, ranked=True):
+        """
+        Returns the titles containing the query case-insensitively. Ranked results are ordered by
+        the position of the match, then by title length, otherwise they keep the insertion order.
+        """
+        query = query.casefold()
+        if not query:
+            return sorted(self._folded, key=self._order.get)
+        matches = [(self._folded[title].find(query), title) for title in self._candidates(query)]
+        matches = [(position, title) for position, title in matches if position >= 0]
+        if ranked:
+            matches.sort(key=lambda match: (match[0], len(match[1]), match[1]))
+            return [title for _, title in matches]
+        return sorted((title for _, title in matches), key=self._order.get)
+
+    def __len__(self):
+        return len(self._folded)
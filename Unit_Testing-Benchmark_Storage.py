@@ -0,0 +1,36 @@
+import json
+import argparse
+from Benchmark_Storage import BACKENDS, OPERATIONS, compare, run_case
+
+
+def test_run_case_times_every_operation(tmp_path):
+    for backend in BACKENDS:
+        results = run_case(backend, 30, str(tmp_path), OPERATIONS, 2, trace_memory=backend == 'json')
+        assert [result['operation'] for result in results] == list(OPERATIONS)
+        assert all(result['backend'] == backend and result['seconds'] >= 0 for result in results)
+    assert 'python_peak_mb' in run_case('json', 30, str(tmp_path), ['load'], 1, trace_memory=True)[0]
+
+
+def test_movie_operations_run_alone_and_in_any_order(tmp_path):
+    for backend in ('json', 'sqlite'):
+        for operations in (['update_movie'], ['delete_movie', 'update_movie', 'add_movie']):
+            results = run_case(backend, 30, str(tmp_path), operations, 2, trace_memory=False)
+            assert [result['operation'] for result in results] == operations
+
+
+def write_results(path, seconds):
+    with open(path, 'w') as file:
+        for operation, value in seconds.items():
+            file.write(json.dumps({'backend': 'json', 'movies': 1000, 'operation': operation, 'seconds': value}) + '\n')
+
+
+def test_compare_reports_slower_operations(tmp_path, capsys):
+    baseline, current = str(tmp_path / 'baseline.jsonl'), str(tmp_path / 'current.jsonl')
+    write_results(baseline, {'load': 0.1, 'stats': 0.01, 'search': 0.0001})
+    write_results(current, {'load': 0.1, 'stats': 0.05, 'search': 0.0005})
+    args = argparse.Namespace(baseline=baseline, current=current, threshold=1.2, min_seconds=0.001)
+    assert compare(args) == 1
+    output = capsys.readouterr().out
+    assert "1 operations slower" in output
+    write_results(current, {'load': 0.11, 'stats': 0.01})
+    assert compare(args) == 0
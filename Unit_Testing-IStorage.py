@@ -0,0 +1,77 @@
+import threading
+import pytest
+from Storage_Csv import StorageCsv
+from Storage_Journal import StorageJournal
+from Storage_Json import StorageJson
+from Storage_Snapshot import StorageSnapshot
+from Storage_Sqlite import StorageSqlite
+from Synthetic_Catalogue import synthetic_movies
+
+
+@pytest.fixture(params=['json', 'json-cached', 'csv', 'csv-compact', 'journal', 'sqlite', 'snapshot'])
+def storage(request, tmp_path):
+    if request.param == 'json':
+        return StorageJson(str(tmp_path / 'movies.json'))
+    if request.param == 'json-cached':
+        return StorageJson(str(tmp_path / 'movies.json'), cached=True, aggregates=True, fsync=False)
+    if request.param.startswith('csv'):
+        storage_file = tmp_path / 'movies.csv'
+        storage_file.write_text("title,year,rating,poster_url,imdb_url,notes\n")
+        if request.param == 'csv-compact':
+            return StorageCsv(str(storage_file), compact=True, notes_sidecar=True, fsync=False)
+        return StorageCsv(str(storage_file))
+    if request.param == 'journal':
+        return StorageJournal(str(tmp_path / 'movies.journal'), fsync=False)
+    if request.param == 'sqlite':
+        return StorageSqlite(str(tmp_path / 'movies.db'), check_same_thread=False)
+    return StorageSnapshot(str(tmp_path / 'movies.snap'))
+
+
+def test_iter_movies_matches_list_movies(storage):
+    assert list(storage.iter_movies()) == []
+    for title, movie in synthetic_movies(20):
+        storage.add_movie(title, movie['year'], movie['rating'], movie['poster_url'], movie['imdb_url'])
+    storage.update_movie(next(iter(storage.list_movies())), "Notes with \"quotes\", commas and {braces}")
+    assert sorted(storage.iter_movies()) == sorted(
+        (title, dict(movie)) for title, movie in storage.list_movies().items())
+
+
+def test_batch_applies_all_mutations(storage):
+    storage.add_many([(f"Movie {i}", 2000 + i, 5.0 + i / 10, "poster_url", "imdb_url") for i in range(10)])
+    with storage.batch():
+        storage.delete_many(["Movie 0", "Movie 1"])
+        storage.update_many([("Movie 2", "Note"), ("Movie 3", "Other note")])
+        storage.add_movie("Movie 0", 1999, 9.0, "poster_url", "imdb_url")
+    movies = storage.list_movies()
+    assert sorted(movies) == sorted(["Movie 0"] + [f"Movie {i}" for i in range(2, 10)])
+    assert movies["Movie 2"]["notes"] == "Note"
+    assert movies["Movie 0"]["year"] == 1999
+
+
+def test_failed_batch_changes_nothing(storage):
+    storage.add_many([(f"Movie {i}", 2000 + i, 5.0, "poster_url", "imdb_url") for i in range(3)])
+    with pytest.raises(RuntimeError):
+        storage.delete_many(["Movie 0", "Missing Movie"])
+    with pytest.raises(RuntimeError):
+        with storage.batch():
+            storage.update_movie("Movie 1", "Lost note")
+            storage.add_movie("New Movie", 2000, 5.0, "poster_url", "imdb_url")
+            storage.add_movie("Movie 2", 2000, 5.0, "poster_url", "imdb_url")
+    movies = storage.list_movies()
+    assert sorted(movies) == ["Movie 0", "Movie 1", "Movie 2"]
+    assert movies["Movie 1"]["notes"] == ""
+
+
+def test_failed_batch_keeps_other_threads_mutations(storage):
+    storage.add_movie("Movie 0", 2000, 5.0, "poster_url", "imdb_url")
+    thread = threading.Thread(target=storage.add_movie, args=("Other Movie", 2001, 6.0, "poster_url", "imdb_url"))
+    with pytest.raises(RuntimeError):
+        with storage.batch():
+            storage.update_movie("Movie 0", "Lost note")
+            thread.start()
+            thread.join(0.1)
+            storage.add_movie("Movie 0", 2000, 5.0, "poster_url", "imdb_url")
+    thread.join()
+    movies = storage.list_movies()
+    assert sorted(movies) == ["Movie 0", "Other Movie"]
+    assert movies["Movie 0"]["notes"] == ""
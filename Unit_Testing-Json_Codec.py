@@ -0,0 +1,86 @@
+import gzip
+import json
+import pytest
+import Json_Codec
+from Json_Codec import available_codecs, compression, get_codec, read_json, write_json
+from Movie_Catalogue import MovieCatalogue
+from Storage_Json import StorageJson
+from Synthetic_Catalogue import synthetic_movies
+
+
+@pytest.mark.parametrize('name', available_codecs())
+@pytest.mark.parametrize('indent', [4, None])
+def test_codec_round_trip(tmp_path, name, indent):
+    movies = dict(synthetic_movies(20))
+    path = str(tmp_path / 'movies.json')
+    write_json(path, movies, get_codec(name), indent)
+    assert json.loads(open(path, encoding='utf-8').read()) == movies
+    assert read_json(path, get_codec(name)) == movies
+
+
+@pytest.mark.parametrize('name', available_codecs())
+def test_codec_compact_has_no_whitespace(name):
+    data = get_codec(name).dumps({'A/B': {'title': 'A/B', 'rating': 7.5}})
+    assert json.loads(data) == {'A/B': {'title': 'A/B', 'rating': 7.5}}
+    assert b' ' not in data and b'\n' not in data
+
+
+@pytest.mark.parametrize('name', available_codecs())
+def test_codec_dumps_catalogue(name):
+    movies = dict(synthetic_movies(5))
+    catalogue = MovieCatalogue()
+    catalogue.update(movies)
+    assert get_codec(name).loads(get_codec(name).dumps(catalogue)) == movies
+
+
+def test_unavailable_codec(monkeypatch):
+    monkeypatch.setattr(Json_Codec, 'ujson', None)
+    with pytest.raises(RuntimeError):
+        get_codec('ujson')
+    with pytest.raises(RuntimeError):
+        get_codec('yaml')
+
+
+def test_default_codec_keeps_the_indentation(monkeypatch, tmp_path):
+    monkeypatch.setattr(Json_Codec, 'orjson', object())
+    monkeypatch.setattr(Json_Codec, 'ujson', object())
+    assert get_codec(None, 4).name == 'json'
+    assert get_codec(None, 2).name == 'orjson'
+    assert get_codec(None, None).name == 'orjson'
+    storage = StorageJson(str(tmp_path / 'movies.json'), indent=4)
+    assert storage.codec.name == 'json'
+
+
+def test_compression_by_extension():
+    assert compression('movies.json') is None
+    assert compression('movies.json.gz') == 'gzip'
+    if Json_Codec.zstandard is not None:
+        assert compression('movies.json.zst') == 'zstd'
+
+
+def test_zstd_needs_zstandard(monkeypatch):
+    monkeypatch.setattr(Json_Codec, 'zstandard', None)
+    with pytest.raises(RuntimeError):
+        compression('movies.json.zst')
+
+
+@pytest.mark.parametrize('extension', ['.json.gz', '.json.zst'])
+def test_compressed_storage(tmp_path, extension):
+    if extension == '.json.zst':
+        pytest.importorskip('zstandard')
+    storage_file = str(tmp_path / ('movies' + extension))
+    storage = StorageJson(storage_file, indent=None)
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    storage.update_movie("Test Movie", "Great movie!")
+    with open(storage_file, 'rb') as file:
+        assert not file.read().startswith(b'{')
+    reopened = StorageJson(storage_file, codec='json')
+    assert reopened.list_movies()["Test Movie"]["notes"] == "Great movie!"
+    assert dict(reopened.iter_movies()) == dict(storage.list_movies())
+
+
+def test_gzip_file_is_plain_gzip(tmp_path):
+    storage_file = str(tmp_path / 'movies.json.gz')
+    StorageJson(storage_file).add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    with gzip.open(storage_file, 'rt', encoding='utf-8') as file:
+        assert "Test Movie" in json.load(file)
@@ -0,0 +1,98 @@
+import os
+import random
+import pytest
+from Movie_Aggregates import MovieAggregates
+from Movie_Stats import compute_stats
+from Storage_Csv import StorageCsv
+from Storage_Json import StorageJson
+
+
+def random_movies(count, seed=3):
+    generator = random.Random(seed)
+    return {f"Movie {i}": {'title': f"Movie {i}", 'year': generator.randint(1950, 2020),
+                           'rating': round(generator.uniform(1, 10), 1)} for i in range(count)}
+
+
+def assert_same_stats(actual, expected):
+    assert actual.count == expected.count
+    assert actual.average == pytest.approx(expected.average)
+    assert actual.median == pytest.approx(expected.median)
+    assert actual.std_dev == pytest.approx(expected.std_dev)
+    assert actual.best == expected.best
+    assert actual.worst == expected.worst
+    assert actual.histogram == expected.histogram
+
+
+def test_aggregates_follow_adds_and_deletes():
+    movies = random_movies(200)
+    aggregates = MovieAggregates(movies)
+    for title in list(movies)[:50]:
+        aggregates.remove(title, movies.pop(title))
+    for title, movie in random_movies(30, seed=4).items():
+        movies[title + " II"] = movie
+        aggregates.add(title + " II", movie)
+    aggregates.update_extremes(movies)
+    assert_same_stats(aggregates.stats(), compute_stats(movies.items()))
+    assert sum(aggregates.year_counts.values()) == len(movies)
+
+
+def test_aggregates_are_stored_and_verified(tmp_path):
+    storage_file = str(tmp_path / 'movies.json')
+    storage = StorageJson(storage_file, cached=True, aggregates=True)
+    storage.add_movie("Alien", 1979, 8.5, "poster_url", "imdb_url")
+    storage.add_movie("Heat", 1995, 8.3, "poster_url", "imdb_url")
+    assert storage.stats().best == ("Alien", 8.5)
+    storage.add_movie("Up", 2009, 8.3, "poster_url", "imdb_url")
+    storage.update_movie("Heat", "New Note")
+    storage.delete_movie("Alien")
+
+    reopened = StorageJson(storage_file, aggregates=True)
+    reopened.list_movies = None
+    stats = reopened.stats()
+    assert stats.count == 2
+    assert stats.best == ("Heat", 8.3)
+    assert reopened.aggregates().year_counts == {1995: 1, 2009: 1}
+
+
+def test_stale_aggregates_are_rebuilt(tmp_path):
+    storage_file = tmp_path / 'movies.csv'
+    storage_file.write_text("title,year,rating,poster_url,imdb_url,notes\n")
+    storage = StorageCsv(str(storage_file), cached=True, aggregates=True)
+    storage.add_movie("Alien", 1979, 8.5, "poster_url", "imdb_url")
+    assert storage.stats().count == 1
+    StorageCsv(str(storage_file)).add_movie("Heat", 1995, 9.0, "poster_url", "imdb_url")
+    stats = storage.stats()
+    assert stats.count == 2
+    assert stats.best == ("Heat", 9.0)
+
+
+def reopen_without_rebuild(storage_file, **options):
+    reopened = StorageJson(storage_file, aggregates=True, **options)
+    reopened.list_movies = None
+    return reopened
+
+
+def test_ties_keep_catalogue_order_and_note_updates_keep_the_aggregates(tmp_path):
+    storage_file = str(tmp_path / 'movies.json')
+    storage = StorageJson(storage_file, cached=True, aggregates=True)
+    storage.add_many([("Heat", 1995, 8.3, "", ""), ("Alien", 1979, 8.5, "", ""), ("Up", 2009, 8.5, "", ""),
+                      ("Cats", 2019, 2.8, "", ""), ("Bats", 2019, 2.8, "", "")])
+    assert storage.stats().best == ("Alien", 8.5)
+    assert storage.stats().worst == ("Cats", 2.8)
+    storage.delete_movie("Alien")
+    assert storage.stats().best == ("Up", 8.5)
+    storage.update_movie("Heat", "New Note")
+    assert storage.stats().count == 4
+    assert os.path.getsize(storage.aggregates_file) < 1000
+    assert reopen_without_rebuild(storage_file).stats().best == ("Up", 8.5)
+
+
+def test_compacted_notes_keep_the_aggregates(tmp_path):
+    storage_file = str(tmp_path / 'movies.json')
+    storage = StorageJson(storage_file, cached=True, aggregates=True, notes_sidecar=True)
+    storage.add_many([("Heat", 1995, 8.3, "", ""), ("Alien", 1979, 8.5, "", "")])
+    assert storage.stats().count == 2
+    storage.update_movie("Heat", "New Note")
+    storage.compact_notes()
+    assert not os.path.exists(storage.notes_file)
+    assert reopen_without_rebuild(storage_file, notes_sidecar=True).stats().count == 2
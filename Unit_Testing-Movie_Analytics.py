@@ -0,0 +1,54 @@
+import pytest
+from Movie_Catalogue import MovieCatalogue
+from Storage_Json import StorageJson
+from Storage_Sqlite import StorageSqlite
+
+np = pytest.importorskip("numpy")
+from Movie_Analytics import MovieAnalytics  # noqa: E402
+
+MOVIES = {
+    'A': {'title': 'A', 'year': 1994, 'rating': 9.3, 'poster_url': '', 'imdb_url': '', 'notes': ''},
+    'B': {'title': 'B', 'year': 1972, 'rating': 9.2, 'poster_url': '', 'imdb_url': '', 'notes': ''},
+    'C': {'title': 'C', 'year': 1999, 'rating': 6.5, 'poster_url': '', 'imdb_url': '', 'notes': ''},
+    'D': {'title': 'D', 'year': 2008, 'rating': 9.3, 'poster_url': '', 'imdb_url': '', 'notes': ''},
+}
+
+
+@pytest.fixture(params=['dict', 'catalogue'])
+def analytics(request):
+    movies = MOVIES if request.param == 'dict' else MovieCatalogue(MOVIES)
+    return MovieAnalytics.from_movies(movies)
+
+
+def test_filter_returns_best_rated_first(analytics):
+    assert analytics.filter(min_rating=9.0) == [('A', 1994, 9.3), ('D', 2008, 9.3), ('B', 1972, 9.2)]
+    assert analytics.filter(start_year=1990, end_year=1999) == [('A', 1994, 9.3), ('C', 1999, 6.5)]
+    assert analytics.count(max_rating=7) == 1
+
+
+def test_average_by_period(analytics):
+    averages = analytics.average_by_period(10)
+    assert list(averages) == [1970, 1990, 2000]
+    assert averages[1990][0] == 2
+    assert averages[1990][1] == pytest.approx(7.9)
+    assert analytics.average_by_period(10, min_rating=9.25) == {1990: (1, 9.3), 2000: (1, 9.3)}
+
+
+def test_histogram(analytics):
+    histogram = analytics.histogram()
+    assert len(histogram) == 10
+    assert histogram[6] == (6.0, 7.0, 1)
+    assert histogram[9] == (9.0, 10.0, 3)
+    assert sum(count for _, _, count in analytics.histogram(end_year=1995)) == 2
+
+
+def test_from_storage_columns(tmp_path):
+    storage = StorageSqlite(str(tmp_path / 'movies.db'))
+    json_storage = StorageJson(str(tmp_path / 'movies.json'), compact=True)
+    for title, movie in MOVIES.items():
+        storage.add_movie(title, movie['year'], movie['rating'], '', '')
+        json_storage.add_movie(title, movie['year'], movie['rating'], '', '')
+    for source in (storage, json_storage):
+        analytics = MovieAnalytics.from_storage(source)
+        assert sorted(analytics.filter(min_rating=9.25)) == [('A', 1994, 9.3), ('D', 2008, 9.3)]
+    storage.close()
@@ -1,6 +1,10 @@
 import pytest
 from unittest.mock import patch
+from config import API_KEY
 from Movie_App import MovieApp
+from Movie_Stats import compute_stats
+from Omdb_Client import OmdbClient, OMDB_URL
+from Storage_Json import StorageJson
 
 
 class MockResponse:
@@ -22,56 +26,94 @@ class MockDB:
 
 @pytest.fixture
 def app():
-    return MovieApp(MockDB())
+    return MovieApp(MockDB(), OmdbClient(API_KEY, backoff=0))
 
 
 def test_search_movie_from_omdb_success(app):
     """
-    For testing add your API-KEY here as well as in the Movie_App.py
+    The API_KEY is taken from the config.py
     """
-    with patch('requests.get', return_value=MockResponse(200, {'Response': 'True', 'movie': 'Some Movie'})) as mock_get:
+    with patch('requests.Session.get', return_value=MockResponse(200, {'Response': 'True', 'movie': 'Some Movie'})) as mock_get:
         data = app.search_movie_from_omdb('Some Movie')
         assert data == {'Response': 'True', 'movie': 'Some Movie'}
-        mock_get.assert_called_once_with('http://www.omdbapi.com/?apikey=YOUR-API-KEY&t=Some Movie')
+        mock_get.assert_called_once_with(OMDB_URL, params={'apikey': API_KEY, 't': 'Some Movie'}, timeout=10)
 
 
 def test_search_movie_from_omdb_not_found(app):
-    with patch('requests.get', return_value=MockResponse(404, {})):
+    with patch('requests.Session.get', return_value=MockResponse(404, {})):
         data = app.search_movie_from_omdb('Non Existent Movie')
         assert data is None
 
 
 def test_search_movie_from_omdb_server_error(app):
-    with patch('requests.get', return_value=MockResponse(500, {})):
+    with patch('requests.Session.get', return_value=MockResponse(500, {})) as mock_get:
         data = app.search_movie_from_omdb('Some Movie')
         assert data is None
+        assert mock_get.call_count == 4
 
 
-def test_calculate_average_positive_numbers(app):
+def test_calculate_average_positive_numbers():
     movies = {'Movie1': {'rating': 1}, 'Movie2': {'rating': 2}, 'Movie3': {'rating': 3}, 'Movie4': {'rating': 4},
               'Movie5': {'rating': 5}}
-    assert app._calculate_average(movies) == 3
+    assert compute_stats(movies.items()).average == 3
 
 
-def test_calculate_average_zero(app):
+def test_calculate_average_zero():
     movies = {'Movie1': {'rating': 0}, 'Movie2': {'rating': 0}, 'Movie3': {'rating': 0}, 'Movie4': {'rating': 0},
               'Movie5': {'rating': 0}}
-    assert app._calculate_average(movies) == 0
+    assert compute_stats(movies.items()).average == 0
 
 
-def test_calculate_average_negative_numbers(app):
+def test_calculate_average_negative_numbers():
     movies = {'Movie1': {'rating': -1}, 'Movie2': {'rating': -2}, 'Movie3': {'rating': -3}, 'Movie4': {'rating': -4},
               'Movie5': {'rating': -5}}
-    assert app._calculate_average(movies) == -3
+    assert compute_stats(movies.items()).average == -3
 
 
-def test_calculate_median_odd_length(app):
-    assert app._calculate_median([1, 2, 3, 4, 5]) == 3
+def ratings(*values):
+    return {f"Movie{number}": {'rating': value} for number, value in enumerate(values)}.items()
 
 
-def test_calculate_median_even_length(app):
-    assert app._calculate_median([1, 2, 3, 4]) == 2.5
+def test_calculate_median_odd_length():
+    assert compute_stats(ratings(1, 2, 3, 4, 5)).median == 3
 
 
-def test_calculate_median_single_number(app):
-    assert app._calculate_median([50]) == 50
+def test_calculate_median_even_length():
+    assert compute_stats(ratings(1, 2, 3, 4)).median == 2.5
+
+
+def test_calculate_median_single_number():
+    assert compute_stats(ratings(50)).median == 50
+
+
+@pytest.mark.parametrize('aggregates', [False, True])
+def test_highest_and_lowest_rated_movie(tmp_path, aggregates):
+    storage = StorageJson(str(tmp_path / 'movies.json'), aggregates=aggregates)
+    app = MovieApp(storage, OmdbClient(API_KEY, backoff=0))
+    assert app._get_highest_rated_movie() is None
+    storage.add_movie("Alien", 1979, 8.5, "", "")
+    storage.add_movie("The Room", 2003, 3.6, "", "")
+    storage.add_movie("The Godfather", 1972, 9.2, "", "")
+    with patch.object(storage, 'stats', side_effect=AssertionError("scanned the statistics")):
+        assert app._get_highest_rated_movie()[0] == "The Godfather"
+        assert app._get_lowest_rated_movie() == ("The Room", storage.list_movies()["The Room"])
+
+
+def test_filter_reads_the_storage_once(tmp_path):
+    storage = StorageJson(str(tmp_path / 'movies.json'))
+    storage.add_movie("Alien", 1979, 8.5, "", "")
+    storage.add_movie("The Room", 2003, 3.6, "", "")
+    app = MovieApp(storage, OmdbClient(API_KEY, backoff=0))
+    with patch.object(storage, '_read_movies', wraps=storage._read_movies) as read_movies:
+        assert list(app._filter_movies(min_rating=5)) == ["Alien"]
+    assert read_movies.call_count == 1
+
+
+def test_analytics_without_ratings_from_0_to_10(tmp_path, capsys):
+    pytest.importorskip('numpy')
+    storage = StorageJson(str(tmp_path / 'movies.json'))
+    storage.add_movie("Spinal Tap", 1984, 11.0, "", "")
+    app = MovieApp(storage, OmdbClient(API_KEY, backoff=0))
+    with patch('builtins.input', return_value=''):
+        app._command_analytics()
+    assert "1 movies match the filters." in capsys.readouterr().out
@@ -0,0 +1,109 @@
+import pickle
+from Movie_Catalogue import MovieCatalogue
+from Synthetic_Catalogue import synthetic_movies
+
+
+def make_movie(title, year=2000, rating=8.0, notes=''):
+    return {
+        'title': title,
+        'year': year,
+        'rating': rating,
+        'poster_url': f"https://m.media-amazon.com/images/M/{title}.jpg",
+        'imdb_url': f"https://www.imdb.com/title/{title}/",
+        'notes': notes,
+    }
+
+
+def test_catalogue_behaves_like_movie_dictionary():
+    movies = dict(synthetic_movies(50))
+    catalogue = MovieCatalogue(movies)
+    assert len(catalogue) == 50
+    assert list(catalogue) == list(movies)
+    assert catalogue.to_dict() == movies
+    title = next(iter(movies))
+    assert title in catalogue
+    assert catalogue[title]['rating'] == movies[title]['rating']
+    assert catalogue[title].get('missing', 'default') == 'default'
+
+
+def test_record_updates_write_to_columns():
+    catalogue = MovieCatalogue({'tt1': make_movie('tt1', notes='short')})
+    catalogue['tt1']['notes'] = 'a much longer note than before'
+    catalogue['tt1']['rating'] = 9.5
+    assert catalogue['tt1']['notes'] == 'a much longer note than before'
+    catalogue['tt1']['notes'] = 'x'
+    assert dict(catalogue['tt1']) == make_movie('tt1', rating=9.5, notes='x')
+
+
+def test_replaced_strings_are_reclaimed():
+    catalogue = MovieCatalogue({f'tt{i}': make_movie(f'tt{i}') for i in range(3)})
+    record = catalogue['tt1']
+    notes = catalogue._strings['notes']
+    for length in range(1, 2000):
+        record['notes'] = 'n' * length
+    assert len(notes._data) < 2 * notes.RECLAIM_MIN_BYTES
+    assert record['notes'] == 'n' * 1999
+    record['notes'] = 'short'
+    catalogue.compact()
+    assert len(notes._data) == len('short')
+    assert record['notes'] == 'short'
+    assert catalogue.to_dict() == {f'tt{i}': make_movie(f'tt{i}', notes='short' if i == 1 else '') for i in range(3)}
+
+
+def test_replacing_a_movie_keeps_its_position():
+    catalogue = MovieCatalogue({'a': make_movie('a'), 'b': make_movie('b')})
+    catalogue['a'] = make_movie('a', year=1999)
+    assert list(catalogue) == ['a', 'b']
+    assert catalogue['a']['year'] == 1999
+
+
+def test_pop_and_compact():
+    catalogue = MovieCatalogue({title: make_movie(title, rating=float(number))
+                                for number, title in enumerate('abcd')})
+    assert catalogue.pop('b') == make_movie('b', rating=1.0)
+    assert catalogue.pop('b', None) is None
+    del catalogue['c']
+    catalogue['e'] = make_movie('e', rating=4.0)
+    titles, years, ratings = catalogue.columns()
+    assert titles == ['a', 'd', 'e']
+    assert list(ratings) == [0.0, 3.0, 4.0]
+    assert len(years) == 3
+    assert catalogue.to_dict() == {title: make_movie(title, rating=rating) for title, rating in zip(titles, ratings)}
+    catalogue.compact()
+    assert list(catalogue.columns()[2]) == [0.0, 3.0, 4.0]
+
+
+def test_columns_leave_records_valid():
+    catalogue = MovieCatalogue({title: make_movie(title) for title in 'abc'})
+    record = catalogue['c']
+    del catalogue['a']
+    titles, _, _ = catalogue.columns()
+    assert titles == ['b', 'c']
+    assert record == make_movie('c')
+
+
+def test_records_pickle_as_dictionaries():
+    catalogue = MovieCatalogue({'a': make_movie('a')})
+    assert pickle.loads(pickle.dumps(catalogue['a'])) == make_movie('a')
+
+
+def test_extend_sets_movies_in_order():
+    catalogue = MovieCatalogue({'a': make_movie('a'), 'b': make_movie('b')})
+    other = MovieCatalogue({'c': make_movie('c'), 'b': make_movie('b', rating=2.0, notes='again')})
+    del other['c']
+    other['d'] = make_movie('d')
+    catalogue.extend(other)
+    assert list(catalogue) == ['a', 'b', 'd']
+    assert catalogue['b'] == make_movie('b', rating=2.0, notes='again')
+    assert catalogue.to_dict() == {'a': make_movie('a'), 'b': make_movie('b', rating=2.0, notes='again'),
+                                   'd': make_movie('d')}
+    catalogue['e'] = make_movie('e')
+    assert catalogue['e'] == make_movie('e')
+
+
+def test_catalogue_pickles_with_its_columns():
+    catalogue = MovieCatalogue(dict(synthetic_movies(20)))
+    del catalogue[next(iter(catalogue))]
+    copy = pickle.loads(pickle.dumps(catalogue))
+    assert list(copy) == list(catalogue)
+    assert copy.to_dict() == catalogue.to_dict()
@@ -0,0 +1,124 @@
+import argparse
+import csv
+import io
+import json
+import pytest
+from config import API_KEY
+from Movie_Cli import MovieCli, add_subcommands
+from Omdb_Client import OmdbClient
+from Storage_Journal import StorageJournal
+from Storage_Json import StorageJson
+
+
+def make_storage(tmp_path, kind):
+    if kind == 'journal':
+        return StorageJournal(str(tmp_path / 'movies.journal'))
+    return StorageJson(str(tmp_path / 'movies.json'), cached=True, aggregates=True)
+
+
+@pytest.fixture(params=['json', 'journal'])
+def storage(tmp_path, request):
+    storage = make_storage(tmp_path, request.param)
+    storage.add_movie("The Godfather", 1972, 9.2, "poster_1", "imdb_1")
+    storage.add_movie("Alien", 1979, 8.5, "poster_2", "imdb_2")
+    storage.add_movie("The Room", 2003, 3.6, "poster_3", "imdb_3")
+    yield storage
+    close = getattr(storage, 'close', None)
+    if close is not None:
+        close()
+
+
+def run(storage, *argv, stdin=''):
+    parser = argparse.ArgumentParser()
+    add_subcommands(parser)
+    stdout, stderr = io.StringIO(), io.StringIO()
+    cli = MovieCli(storage, OmdbClient(API_KEY, backoff=0), stdin=io.StringIO(stdin), stdout=stdout, stderr=stderr)
+    status = cli.execute(parser.parse_args(argv))
+    return status, stdout.getvalue(), stderr.getvalue()
+
+
+def test_list_json(storage):
+    status, output, _ = run(storage, 'list')
+    assert status == 0
+    assert {movie['title']: movie['year'] for movie in json.loads(output)} == \
+        {"The Godfather": 1972, "Alien": 1979, "The Room": 2003}
+
+
+def test_list_filtered_csv(storage):
+    _, output, _ = run(storage, 'list', '--min-rating', '8', '--format', 'csv')
+    rows = list(csv.DictReader(io.StringIO(output)))
+    assert [row['title'] for row in rows] == ["The Godfather", "Alien"]
+
+
+def test_sorted_limit_and_ascending(storage):
+    _, output, _ = run(storage, 'sorted', '--limit', '2', '--format', 'jsonl')
+    assert [json.loads(line)['title'] for line in output.splitlines()] == ["The Godfather", "Alien"]
+    _, output, _ = run(storage, 'sorted', '--ascending', '--format', 'text')
+    assert output.splitlines()[0] == "The Room (2003) - Rating: 3.6"
+
+
+def test_search(storage):
+    _, output, _ = run(storage, 'search', 'the', '--format', 'jsonl')
+    assert {json.loads(line)['title'] for line in output.splitlines()} == {"The Godfather", "The Room"}
+
+
+def test_stats(storage):
+    _, output, _ = run(storage, 'stats')
+    stats = json.loads(output)
+    assert stats['count'] == 3
+    assert stats['best'] == {'title': "The Godfather", 'rating': 9.2}
+
+
+def test_add_and_duplicate(storage):
+    assert run(storage, 'add', 'Heat', '1995', '8.3', '--imdb-url', 'imdb_4')[0] == 0
+    assert storage.list_movies()["Heat"]['imdb_url'] == 'imdb_4'
+    status, _, error = run(storage, 'add', 'heat', '1995', '8.3')
+    assert status == 1
+    assert "already exists" in error
+
+
+def test_add_from_stdin_is_all_or_nothing(storage):
+    new_movies = [{'title': 'Heat', 'year': 1995, 'rating': 8.3},
+                  {'title': 'Alien', 'year': 1979, 'rating': 8.5}]
+    status, _, _ = run(storage, 'add', '--stdin', stdin=json.dumps(new_movies))
+    assert status == 1
+    assert "Heat" not in storage.list_movies()
+    lines = 'title,year,rating\nHeat,1995,8.3\nUp,2009,8.2\n'
+    assert run(storage, 'add', '--stdin', '--input-format', 'csv', stdin=lines)[0] == 0
+    assert storage.list_movies()["Up"]['rating'] == 8.2
+
+
+@pytest.mark.parametrize('titles', [['Heat', 'alien'], ['Heat', 'HEAT']])
+def test_add_from_stdin_rejects_duplicates_in_any_case(storage, titles):
+    new_movies = [{'title': title, 'year': 1995, 'rating': 8.3} for title in titles]
+    status, _, error = run(storage, 'add', '--stdin', stdin=json.dumps(new_movies))
+    assert status == 1
+    assert "already exists" in error
+    assert "Heat" not in storage.list_movies()
+
+
+def test_generate_reports_to_stderr(storage, monkeypatch):
+    monkeypatch.setattr(MovieCli, '_command_generate_website', lambda self: print("Website generated!"))
+    status, output, error = run(storage, 'generate')
+    assert (status, output, error) == (0, '', "Website generated!\n")
+
+
+def test_delete_from_stdin(storage):
+    assert run(storage, 'delete', '--stdin', stdin='alien\nTHE ROOM\n')[0] == 0
+    assert list(storage.list_movies()) == ["The Godfather"]
+
+
+def test_delete_missing_title_deletes_nothing(storage):
+    status, _, error = run(storage, 'delete', 'Alien', 'Nope')
+    assert status == 1
+    assert "'Nope'" in error
+    assert "Alien" in storage.list_movies()
+
+
+def test_update(storage):
+    assert run(storage, 'update', 'alien', 'In space')[0] == 0
+    lines = '{"title": "The Room", "notes": "Oh hi"}\n{"title": "the godfather", "notes": "Offer"}\n'
+    assert run(storage, 'update', '--stdin', '--input-format', 'jsonl', stdin=lines)[0] == 0
+    movies = storage.list_movies()
+    assert [movies[title]['notes'] for title in ("Alien", "The Room", "The Godfather")] == \
+        ["In space", "Oh hi", "Offer"]
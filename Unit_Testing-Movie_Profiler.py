@@ -0,0 +1,98 @@
+import builtins
+import io
+import json
+import argparse
+import pytest
+import Movie_Profiler
+from config import API_KEY
+from Movie_Cli import MovieCli, add_subcommands
+from Movie_Profiler import Profiler, add_profile_arguments, profiler_from_args
+from Omdb_Client import OmdbClient
+from Storage_Json import StorageJson
+
+
+@pytest.fixture
+def cli(tmp_path):
+    storage = StorageJson(str(tmp_path / 'movies.json'), cached=True)
+    storage.add_movie("The Godfather", 1972, 9.2, "poster_1", "imdb_1")
+    storage.add_movie("Alien", 1979, 8.5, "poster_2", "imdb_2")
+    return MovieCli(storage, OmdbClient(API_KEY, backoff=0), stdout=io.StringIO(), stderr=io.StringIO())
+
+
+def parse(*argv):
+    parser = argparse.ArgumentParser()
+    add_profile_arguments(parser)
+    add_subcommands(parser)
+    return parser.parse_args(argv)
+
+
+def test_records_commands_and_storage_calls(cli, tmp_path):
+    output = str(tmp_path / 'calls.jsonl')
+    profiler = Profiler(output)
+    profiler.instrument_app(cli)
+    assert cli.execute(parse('sorted', '--limit', '1')) == 0
+    assert cli.execute(parse('add', 'Heat', '1995', '8.3')) == 0
+    profiler.close()
+    assert profiler.totals['command._cli_sorted']['calls'] == 1
+    assert profiler.totals['storage.add_movie']['calls'] == 1
+    assert profiler.totals['storage._write_movies']['calls'] == 1
+    if Movie_Profiler.io_counters()[1] is not None:
+        assert profiler.totals['storage._write_movies']['bytes_written'] > 0
+    calls = [json.loads(line) for line in open(output)]
+    assert {call['name'] for call in calls} == set(profiler.totals)
+    assert "command._cli_add" in profiler.summary()
+
+
+def test_generators_are_timed_until_exhausted(cli):
+    profiler = Profiler()
+    profiler.instrument_app(cli)
+    assert len(list(cli.storage.iter_movies())) == 2
+    assert profiler.totals['storage.iter_movies']['calls'] == 1
+    movies = cli.storage.iter_movies()
+    next(movies)
+    movies.close()
+    assert profiler.totals['storage.iter_movies']['calls'] == 2
+
+
+def test_prompt_time_is_left_out_of_commands(cli, monkeypatch):
+    now = [0.0]
+
+    def answer(prompt=''):
+        now[0] += 10
+        return 'alien'
+    monkeypatch.setattr(Movie_Profiler.time, 'perf_counter', lambda: now[0])
+    monkeypatch.setattr(builtins, 'input', answer)
+    profiler = Profiler()
+    profiler.instrument_app(cli)
+    cli._command_search_movie()
+    profiler.close()
+    assert profiler.totals['prompt.input']['seconds'] == 10
+    assert profiler.totals['command._command_search_movie']['seconds'] == 0
+    assert builtins.input is answer
+
+
+def test_failed_calls_are_recorded(cli):
+    profiler = Profiler()
+    profiler.instrument_app(cli)
+    with pytest.raises(RuntimeError):
+        cli.storage.delete_movie("Nope")
+    assert profiler.totals['storage.delete_movie']['calls'] == 1
+
+
+@pytest.mark.parametrize('mode, extension', [('cprofile', '.prof'), ('tracemalloc', '.tracemalloc')])
+def test_capture_command(cli, tmp_path, mode, extension):
+    stream = io.StringIO()
+    profiler = Profiler(str(tmp_path / 'calls.jsonl'), capture_command='stats', capture_mode=mode, stream=stream)
+    profiler.instrument_app(cli)
+    assert cli.execute(parse('stats')) == 0
+    profiler.close()
+    assert (tmp_path / ('cli_stats' + extension)).exists()
+    assert "command._cli_stats" in stream.getvalue()
+    assert profiler.totals['command._cli_stats']['calls'] == 1
+
+
+def test_profiler_from_args_and_environment(monkeypatch):
+    assert profiler_from_args(parse('list')) is None
+    assert profiler_from_args(parse('--profile', 'list')) is not None
+    monkeypatch.setenv('MOVIE_PROFILE', '1')
+    assert profiler_from_args(parse('list')) is not None
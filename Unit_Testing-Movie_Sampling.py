@@ -0,0 +1,71 @@
+import random
+from collections import Counter
+import pytest
+from Movie_Catalogue import MovieCatalogue
+from Movie_Sampling import movie_filter, random_movies, sample_indexed, sample_stream
+from Storage_Json import StorageJson
+from Storage_Snapshot import StorageSnapshot
+from Storage_Sqlite import StorageSqlite
+from Synthetic_Catalogue import synthetic_movies
+
+MOVIES = dict(synthetic_movies(200))
+
+
+def test_sample_stream_picks_distinct_matching_movies():
+    rng = random.Random(1)
+    predicate = movie_filter(min_rating=5.0, start_year=1950)
+    picked = sample_stream(MOVIES.items(), 10, predicate=predicate, rng=rng)
+    assert len({title for title, _ in picked}) == 10
+    assert all(movie['rating'] >= 5.0 and movie['year'] >= 1950 for _, movie in picked)
+    assert len(sample_stream(MOVIES.items(), 500, rng=rng)) == 200
+    assert sample_stream({}.items(), 3, rng=rng) == []
+
+
+def test_weighted_picks_favour_heavier_movies():
+    movies = {'good': {'rating': 9.0}, 'bad': {'rating': 1.0}, 'unrated': {'rating': 0.0}}
+    rng = random.Random(2)
+    weight = lambda movie: movie['rating']  # noqa: E731
+    counts = Counter(sample_stream(movies.items(), 1, weight=weight, rng=rng)[0][0] for _ in range(2000))
+    assert counts['unrated'] == 0
+    assert 0.85 < counts['good'] / 2000 < 0.95
+    catalogue = MovieCatalogue({title: dict(movie, year=2000) for title, movie in movies.items()})
+    size, movie_at = catalogue.random_access()
+    counts = Counter(sample_indexed(size, movie_at, 1, weight=weight, rng=rng)[0][0] for _ in range(2000))
+    assert counts['unrated'] == 0
+    assert 0.85 < counts['good'] / 2000 < 0.95
+
+
+def test_sample_indexed_skips_deleted_rows_and_gives_up_on_rare_matches():
+    catalogue = MovieCatalogue(MOVIES)
+    deleted = list(MOVIES)[:150]
+    for title in deleted:
+        del catalogue[title]
+    size, movie_at = catalogue.random_access()
+    picked = sample_indexed(size, movie_at, 20, rng=random.Random(3))
+    assert len({title for title, _ in picked}) == 20
+    assert not set(deleted) & {title for title, _ in picked}
+    assert sample_indexed(size, movie_at, 1, predicate=movie_filter(min_rating=11), rng=random.Random(3)) is None
+
+
+@pytest.fixture(params=['json', 'snapshot', 'sqlite'])
+def storage(request, tmp_path):
+    if request.param == 'json':
+        storage = StorageJson(str(tmp_path / 'movies.json'), cached=True, compact=True)
+    elif request.param == 'snapshot':
+        storage = StorageSnapshot(str(tmp_path / 'movies.snap'))
+    else:
+        storage = StorageSqlite(str(tmp_path / 'movies.db'))
+    storage.add_many([(title, movie['year'], movie['rating'], movie['poster_url'], movie['imdb_url'])
+                      for title, movie in list(MOVIES.items())[:30]])
+    return storage
+
+
+def test_random_movies_from_storages(storage):
+    assert storage.random_access() is not None
+    rng = random.Random(4)
+    picked = random_movies(storage, 5, by_rating=True, max_rating=8.0, rng=rng)
+    assert len({title for title, _ in picked}) == 5
+    for title, movie in picked:
+        assert movie['rating'] <= 8.0
+        assert dict(movie) == MOVIES[title]
+    assert len(random_movies(storage, 100, rng=rng)) == 30
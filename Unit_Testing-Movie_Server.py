@@ -0,0 +1,146 @@
+import http.client
+import json
+import threading
+import time
+import pytest
+from config import API_KEY
+from Movie_Server import ApiError, MovieApi, MovieServer, ReadWriteLock
+from Omdb_Client import OmdbClient
+from Storage_Json import StorageJson
+from Storage_Sqlite import StorageSqlite
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def api(tmp_path, request):
+    if request.param == 'sqlite':
+        storage = StorageSqlite(str(tmp_path / 'movies.db'), check_same_thread=False)
+    else:
+        storage = StorageJson(str(tmp_path / 'movies.json'), cached=True, aggregates=True, compact=True)
+    storage.add_movie("The Godfather", 1972, 9.2, "poster_1", "imdb_1")
+    storage.add_movie("Alien", 1979, 8.5, "poster_2", "imdb_2")
+    storage.add_movie("The Room", 2003, 3.6, "poster_3", "imdb_3")
+    api = MovieApi(storage, OmdbClient(API_KEY, backoff=0))
+    api.warm()
+    return api
+
+
+def get(api, path, **query):
+    return api.handle('GET', path, {name: [str(value)] for name, value in query.items()}, b'')
+
+
+def test_list_and_pages(api):
+    status, movies = get(api, '/movies')
+    assert status == 200
+    assert len(movies) == 3
+    _, movies = get(api, '/movies', min_rating=4, offset=1, limit=5)
+    assert [movie['title'] for movie in movies] == ["Alien"]
+    assert get(api, '/movies', limit=-1)[0] == 400
+    assert get(api, '/movies', limit='many')[0] == 400
+
+
+def test_get_search_sorted_stats(api):
+    status, movie = get(api, '/movies/the%20godfather')
+    assert status == 200
+    assert movie['title'] == "The Godfather"
+    assert get(api, '/movies/Nope')[0] == 404
+    _, movies = get(api, '/search', q='the', limit=1)
+    assert len(movies) == 1
+    assert get(api, '/search')[0] == 400
+    _, movies = get(api, '/sorted', ascending=1)
+    assert [movie['title'] for movie in movies] == ["The Room", "Alien", "The Godfather"]
+    _, stats = get(api, '/stats')
+    assert stats['count'] == 3
+    assert get(api, '/nothing')[0] == 404
+
+
+def test_movie_is_read_without_searching(api, monkeypatch):
+    monkeypatch.setattr(api, '_search_movies', None)
+    _, movie = get(api, '/movies/alien')
+    assert movie == {'title': "Alien", 'year': 1979, 'rating': 8.5, 'poster_url': "poster_2",
+                     'imdb_url': "imdb_2", 'notes': ''}
+    with pytest.raises(ApiError) as error:
+        api._movie("Nope")
+    assert error.value.status == 404
+
+
+def test_add_update_delete(api):
+    status, movie = api.handle('POST', '/movies', {}, b'{"title": "Heat", "year": 1995, "rating": 8.3}')
+    assert status == 201
+    assert movie['title'] == "Heat"
+    body = json.dumps([{'title': 'Up', 'year': 2009, 'rating': 8.2}, {'title': 'heat', 'year': 1995, 'rating': 8.3}])
+    assert api.handle('POST', '/movies', {}, body.encode())[0] == 409
+    assert get(api, '/movies/Up')[0] == 404
+    assert api.handle('POST', '/movies', {}, b'{"title": "Up"}')[0] == 400
+    assert api.handle('POST', '/movies', {}, b'not json')[0] == 400
+    status, movie = api.handle('PATCH', '/movies/heat', {}, b'{"notes": "Great"}')
+    assert status == 200
+    assert movie['notes'] == "Great"
+    assert api.handle('PATCH', '/movies/heat', {}, b'[]')[0] == 400
+    assert api.handle('DELETE', '/movies/HEAT', {}, b'') == (204, None)
+    assert api.handle('PUT', '/movies', {}, b'')[0] == 405
+
+
+def test_filter_sees_writes(api):
+    _, movies = get(api, '/movies', min_rating=9)
+    assert [movie['title'] for movie in movies] == ["The Godfather"]
+    api.handle('POST', '/movies', {}, b'{"title": "Heat", "year": 1995, "rating": 9.5}')
+    _, movies = get(api, '/movies', min_rating=9)
+    assert [movie['title'] for movie in movies] == ["Heat", "The Godfather"]
+
+
+def test_reads_while_deleting(api):
+    api.storage.add_many((f"Movie {number}", 2000, number % 10, '', '') for number in range(2000))
+    statuses = []
+
+    def read():
+        for _ in range(5):
+            statuses.append(get(api, '/movies')[0])
+
+    readers = [threading.Thread(target=read) for _ in range(3)]
+    for reader in readers:
+        reader.start()
+    for number in range(20):
+        assert api.handle('DELETE', f"/movies/Movie {number}", {}, b'')[0] == 204
+        assert get(api, '/movies', min_rating=5)[0] == 200
+    for reader in readers:
+        reader.join()
+    assert statuses == [200] * 15
+
+
+def test_read_write_lock_excludes_readers_while_writing():
+    lock = ReadWriteLock()
+    events = []
+
+    def read():
+        with lock.reading():
+            events.append('read')
+
+    with lock.writing():
+        reader = threading.Thread(target=read)
+        reader.start()
+        time.sleep(0.05)
+        events.append('written')
+    reader.join()
+    assert events == ['written', 'read']
+    with lock.reading(), lock.reading():
+        pass
+
+
+def test_server_over_http(api):
+    with MovieServer(('127.0.0.1', 0), api) as server:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1])
+            connection.request('GET', '/sorted?limit=1')
+            response = connection.getresponse()
+            assert response.status == 200
+            assert json.loads(response.read())[0]['title'] == "The Godfather"
+            connection.request('DELETE', '/movies/Alien')
+            response = connection.getresponse()
+            assert response.status == 204
+            assert response.read() == b''
+            connection.close()
+        finally:
+            server.shutdown()
+            thread.join()
@@ -0,0 +1,33 @@
+import random
+import statistics
+import pytest
+from Movie_Stats import compute_stats
+
+
+def test_compute_stats():
+    movies = {'Movie1': {'rating': 7.5}, 'Movie2': {'rating': 9.1}, 'Movie3': {'rating': 6.0},
+              'Movie4': {'rating': 9.1}, 'Movie5': {'rating': 8.2}}
+    stats = compute_stats(movies.items())
+    assert stats.count == 5
+    assert stats.average == pytest.approx(7.98)
+    assert stats.median == 8.2
+    assert stats.best == ('Movie2', 9.1)
+    assert stats.worst == ('Movie3', 6.0)
+    assert stats.histogram == {6: 1, 7: 1, 8: 1, 9: 2}
+    assert stats.to_dict()['best'] == {'title': 'Movie2', 'rating': 9.1}
+
+
+def test_compute_stats_matches_statistics_module():
+    generator = random.Random(7)
+    ratings = [round(generator.uniform(1, 10), 1) for _ in range(1000)]
+    stats = compute_stats((f"Movie {i}", {'rating': rating}) for i, rating in enumerate(ratings))
+    assert stats.median == pytest.approx(statistics.median(ratings))
+    assert stats.average == pytest.approx(statistics.mean(ratings))
+    assert stats.std_dev == pytest.approx(statistics.pstdev(ratings))
+
+
+def test_compute_stats_without_movies():
+    stats = compute_stats([])
+    assert stats.count == 0
+    assert stats.median == 0.0
+    assert stats.best is None
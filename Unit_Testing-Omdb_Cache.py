@@ -0,0 +1,48 @@
+import time
+import pytest
+from Omdb_Cache import OmdbCache
+
+ALIEN = {'Title': 'Alien', 'imdbID': 'tt0078748', 'Response': 'True'}
+NOT_FOUND = {'Response': 'False', 'Error': 'Movie not found!'}
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    return str(tmp_path / 'omdb_cache.sqlite')
+
+
+def test_keys_are_normalized():
+    assert OmdbCache.title_key("  The   GODFATHER ") == OmdbCache.title_key("the godfather")
+    assert OmdbCache.imdb_key("TT0068646") == OmdbCache.imdb_key("tt0068646")
+
+
+def test_responses_persist_on_disk(cache_file):
+    cache = OmdbCache(cache_file)
+    cache.put([OmdbCache.title_key("Alien"), OmdbCache.imdb_key("tt0078748")], ALIEN)
+    cache.close()
+    cache = OmdbCache(cache_file)
+    assert cache.get(OmdbCache.imdb_key("tt0078748")) == ALIEN
+    assert cache.get(OmdbCache.title_key("Heat")) is None
+
+
+def test_entries_expire(cache_file):
+    cache = OmdbCache(cache_file, ttl=60, negative_ttl=0)
+    cache.put([OmdbCache.title_key("Alien")], ALIEN)
+    cache.put([OmdbCache.title_key("Unknown")], NOT_FOUND)
+    time.sleep(0.01)
+    assert cache.get(OmdbCache.title_key("Alien")) == ALIEN
+    assert cache.get(OmdbCache.title_key("Unknown")) is None
+
+
+def test_least_recently_used_entries_are_evicted(cache_file):
+    cache = OmdbCache(cache_file, max_entries=2)
+    cache.put(['a'], ALIEN)
+    time.sleep(0.01)
+    cache.put(['b'], ALIEN)
+    time.sleep(0.01)
+    cache.get('a')
+    time.sleep(0.01)
+    cache.put(['c'], ALIEN)
+    assert cache.get('b') is None
+    assert cache.get('a') == ALIEN
+    assert cache.get('c') == ALIEN
@@ -0,0 +1,122 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from Movie_App import MovieApp
+from Omdb_Cache import OmdbCache
+from Omdb_Client import OmdbClient
+from Storage_Json import StorageJson
+
+MOVIES = {
+    'Alien': {'Title': 'Alien', 'Year': '1979', 'imdbRating': '8.5', 'Poster': 'poster_url', 'imdbID': 'tt0078748'},
+    'Heat': {'Title': 'Heat', 'Year': '1995', 'imdbRating': '8.3', 'Poster': 'poster_url', 'imdbID': 'tt0113277'},
+    'Up': {'Title': 'Up', 'Year': '2009', 'imdbRating': 'N/A', 'Poster': 'poster_url', 'imdbID': 'tt1049413'},
+}
+
+
+class OmdbStandInHandler(BaseHTTPRequestHandler):
+    """Answers like the OMDb API from MOVIES, failing the first request of every title in flaky_titles
+    and answering 'Broken' with a body that isn't JSON."""
+
+    def do_GET(self):
+        params = parse_qs(urlparse(self.path).query)
+        self.server.requests.append(params)
+        title = next((movie for movie in MOVIES if movie.lower() == params.get('t', [''])[0].lower()), None)
+        if 'i' in params:
+            title = next((movie for movie, data in MOVIES.items() if data['imdbID'] == params['i'][0]), None)
+        if title in self.server.flaky_titles:
+            self.server.flaky_titles.remove(title)
+            self.send_response(503)
+            self.end_headers()
+            return
+        data = dict(MOVIES[title], Response='True') if title in MOVIES else {'Response': 'False'}
+        body = json.dumps(data).encode('utf-8') if params.get('t') != ['Broken'] else b'<html>Oops</html>'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OmdbStandInHandler)
+    server.requests = []
+    server.flaky_titles = set()
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(server):
+    client = OmdbClient('test-key', base_url=f'http://127.0.0.1:{server.server_port}/', backoff=0)
+    yield client
+    client.close()
+
+
+def test_fetch_by_title_and_imdb_id(client, server):
+    assert client.fetch(title='Alien')['imdbID'] == 'tt0078748'
+    assert client.fetch_query('tt0113277')['Title'] == 'Heat'
+    assert client.fetch(title='Unknown')['Response'] == 'False'
+    assert server.requests[0]['apikey'] == ['test-key']
+
+
+def test_fetch_retries_failed_requests(client, server):
+    server.flaky_titles.add('Alien')
+    assert client.fetch(title='Alien')['Title'] == 'Alien'
+    assert len(server.requests) == 2
+
+
+def test_fetch_raises_after_retries(server):
+    client = OmdbClient('test-key', base_url='http://127.0.0.1:1/', max_retries=1, backoff=0)
+    with pytest.raises(RuntimeError):
+        client.fetch(title='Alien')
+
+
+def test_invalid_answer_fails_only_its_query(client, server):
+    results = client.fetch_many(['Alien', 'Broken', 'Heat'])
+    assert [data and data['Title'] for _, data, _ in results] == ['Alien', None, 'Heat']
+    assert results[1][2] == "The OMDb API answered with invalid data."
+
+
+def test_fetch_many_is_rate_limited(server):
+    client = OmdbClient('test-key', base_url=f'http://127.0.0.1:{server.server_port}/', requests_per_second=20)
+    start = time.monotonic()
+    results = client.fetch_many(['Alien', 'Heat', 'Up', 'Unknown', 'Alien', 'Heat'], workers=6)
+    assert time.monotonic() - start >= 5 / 20
+    assert [data['Response'] for _, data, _ in results] == ['True', 'True', 'True', 'False', 'True', 'True']
+
+
+def test_import_movies_from_file(tmp_path, client, server):
+    storage = StorageJson(str(tmp_path / 'movies.json'), cached=True)
+    storage.add_movie("Heat", 1995, 8.3, "poster_url", "imdb_url")
+    import_file = tmp_path / 'import.txt'
+    import_file.write_text("# movies to import\nAlien\nheat\ntt0113277\nUp\nUnknown\n\nAlien\n")
+    server.flaky_titles.add('Alien')
+    added, skipped, failed = MovieApp(storage, client).import_movies_from_file(str(import_file))
+    assert added == ["Alien"]
+    assert skipped == ["heat", "Heat"]
+    assert [query for query, _ in failed] == ["Up", "Unknown"]
+    movies = StorageJson(storage.storage_file).list_movies()
+    assert movies["Alien"]["imdb_url"] == "https://www.imdb.com/title/tt0078748/"
+
+
+def test_cached_responses_skip_the_network(tmp_path, server):
+    cache = OmdbCache(str(tmp_path / 'omdb_cache.sqlite'))
+    client = OmdbClient('test-key', base_url=f'http://127.0.0.1:{server.server_port}/', cache=cache)
+    client.fetch(title='alien')
+    client.fetch(title='Unknown')
+    assert client.fetch(title='ALIEN')['Title'] == 'Alien'
+    assert client.fetch(imdb_id='tt0078748')['Title'] == 'Alien'
+    assert client.fetch(title='Unknown')['Response'] == 'False'
+    assert len(server.requests) == 2
+    client.close()
@@ -0,0 +1,44 @@
+import pytest
+from Rating_Index import RatingIndex
+from Storage_Csv import StorageCsv
+from Storage_Json import StorageJson
+
+MOVIES = {'Alien': {'rating': 8.5}, 'Heat': {'rating': 8.3}, 'Up': {'rating': 8.3}, 'Cats': {'rating': 2.8}}
+
+
+def test_top_and_bottom_n():
+    index = RatingIndex(MOVIES)
+    assert index.top_n(2) == ['Alien', 'Heat']
+    assert index.bottom_n(2) == ['Cats', 'Up']
+    assert index.top_n() == ['Alien', 'Heat', 'Up', 'Cats']
+    assert index.bottom_n(0) == []
+    assert index.entry(0) == ('Alien', 8.5)
+
+
+def test_add_remove_and_pages():
+    index = RatingIndex(MOVIES)
+    index.add('Jaws', {'rating': 8.1})
+    index.remove('Heat', MOVIES['Heat'])
+    assert list(index.iter_pages(2)) == [['Alien', 'Up'], ['Jaws', 'Cats']]
+    assert index.page(1, 3) == ['Cats']
+
+
+@pytest.mark.parametrize('aggregates', [False, True])
+def test_storage_rating_queries(tmp_path, aggregates):
+    storage_file = tmp_path / 'movies.csv'
+    storage_file.write_text("title,year,rating,poster_url,imdb_url,notes\n")
+    storage = StorageCsv(str(storage_file), cached=True, aggregates=aggregates)
+    storage.add_many([("Alien", 1979, 8.5, "p", "i"), ("Heat", 1995, 8.3, "p", "i"), ("Cats", 2019, 2.8, "p", "i")])
+    assert [title for title, _ in storage.top_n(1)] == ["Alien"]
+    storage.add_movie("Jaws", 1975, 8.1, "poster_url", "imdb_url")
+    storage.delete_movie("Cats")
+    assert [title for title, _ in storage.bottom_n(1)] == ["Jaws"]
+    pages = [[title for title, _ in page] for page in storage.iter_by_rating(2)]
+    assert pages == [["Alien", "Heat"], ["Jaws"]]
+
+
+def test_uncached_storage_rating_queries(tmp_path):
+    storage = StorageJson(str(tmp_path / 'movies.json'))
+    storage.add_movie("Alien", 1979, 8.5, "poster_url", "imdb_url")
+    storage.add_movie("Heat", 1995, 8.3, "poster_url", "imdb_url")
+    assert [title for title, _ in storage.top_n()] == ["Alien", "Heat"]
@@ -1,5 +1,6 @@
+import os
 import pytest
-from Storage_Csv import StorageCsv
+from Storage_Csv import StorageCsv, row_boundaries
 
 storage_file = 'test_movies.csv'
 
@@ -56,3 +57,41 @@ def test_contains():
     storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
     assert "Test Movie" in storage
     assert "Non Existent Movie" not in storage
+
+
+def write_rows(path, count, newline='\n'):
+    with open(path, 'w', newline='') as f:
+        f.write("title,year,rating,poster_url,imdb_url,notes" + newline)
+        for number in range(count):
+            notes = f'"line one\nline ""two"" of {number}"' if number % 3 else ''
+            f.write(f"Movie {number % 40},{1950 + number},{number % 10}.5,p,i,{notes}{newline}")
+
+
+@pytest.mark.parametrize('newline', ['\n', '\r\n'])
+def test_row_boundaries_keep_quoted_newlines(tmp_path, newline):
+    path = str(tmp_path / 'movies.csv')
+    write_rows(path, 50, newline)
+    boundaries = row_boundaries(path, 8)
+    assert boundaries[-1] == os.path.getsize(path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    for start, end in zip(boundaries, boundaries[1:]):
+        assert data[start - 1:start] == b'\n'
+        assert data[start:end].count(b'"') % 2 == 0
+
+
+def test_parallel_load_matches_reading_row_by_row(tmp_path):
+    path = str(tmp_path / 'movies.csv')
+    # titles repeat across the chunks, the last row of a title wins
+    write_rows(path, 200)
+    sequential = StorageCsv(path, compact=True).list_movies()
+    parallel = StorageCsv(path, compact=True, load_processes=2, parallel_min_bytes=0).list_movies()
+    assert list(parallel) == list(sequential)
+    assert parallel.to_dict() == sequential.to_dict()
+    assert len(parallel) == 40
+    assert parallel["Movie 1"]["notes"] == 'line one\nline "two" of 161'
+
+
+def teardown_module(module):
+    if os.path.exists(storage_file + '.lock'):
+        os.remove(storage_file + '.lock')
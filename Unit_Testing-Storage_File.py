@@ -0,0 +1,157 @@
+import multiprocessing
+import os
+import pytest
+from Movie_Catalogue import MovieCatalogue
+from Storage_Csv import StorageCsv
+from Storage_Json import StorageJson
+
+
+@pytest.fixture(params=['json', 'csv', 'json-compact', 'csv-compact'])
+def storage(request, tmp_path):
+    compact = request.param.endswith('-compact')
+    if request.param.startswith('json'):
+        return StorageJson(str(tmp_path / 'movies.json'), cached=True, compact=compact)
+    storage_file = tmp_path / 'movies.csv'
+    storage_file.write_text("title,year,rating,poster_url,imdb_url,notes\n")
+    return StorageCsv(str(storage_file), cached=True, compact=compact)
+
+
+def test_cached_list_movies_is_not_reparsed(storage):
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    assert storage.list_movies() is storage.list_movies()
+
+
+def test_cache_is_written_through(storage):
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    storage.update_movie("Test Movie", "New Note")
+    assert storage.list_movies()["Test Movie"]["notes"] == "New Note"
+    fresh = type(storage)(storage.storage_file)
+    assert fresh.list_movies()["Test Movie"]["notes"] == "New Note"
+    storage.delete_movie("Test Movie")
+    assert "Test Movie" not in storage
+    assert "Test Movie" not in fresh
+
+
+def test_cache_is_invalidated_by_changes_on_disk(storage):
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    other = type(storage)(storage.storage_file)
+    other.add_movie("Other Movie", 2001, 7.0, "poster_url", "imdb_url")
+    assert "Other Movie" in storage
+
+
+def test_compact_storage_loads_into_catalogue(tmp_path):
+    storage = StorageJson(str(tmp_path / 'movies.json'), cached=True, aggregates=True, compact=True)
+    storage.add_many([("Movie A", 2000, 8.0, "poster_url", "imdb_url"),
+                      ("Movie B", 2001, 6.0, "poster_url", "imdb_url")])
+    storage.delete_movie("Movie A")
+    storage.update_movie("Movie B", "Note")
+    fresh = StorageJson(storage.storage_file, compact=True)
+    assert isinstance(fresh.list_movies(), MovieCatalogue)
+    assert dict(fresh.list_movies()["Movie B"])["notes"] == "Note"
+    assert [title for title, _ in storage.top_n()] == ["Movie B"]
+    assert storage.stats().count == 1
+
+
+@pytest.fixture(params=['json', 'csv'])
+def notes_storage(request, tmp_path):
+    if request.param == 'json':
+        return StorageJson(str(tmp_path / 'movies.json'), cached=True, notes_sidecar=True)
+    storage_file = tmp_path / 'movies.csv'
+    storage_file.write_text("title,year,rating,poster_url,imdb_url,notes\n")
+    return StorageCsv(str(storage_file), cached=True, notes_sidecar=True)
+
+
+def test_notes_are_appended_to_the_sidecar(notes_storage):
+    notes_storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    with open(notes_storage.storage_file, 'rb') as file:
+        content = file.read()
+    notes_storage.update_movie("Test Movie", "First note")
+    notes_storage.update_movie("Test Movie", "Second note")
+    with open(notes_storage.storage_file, 'rb') as file:
+        assert file.read() == content
+    assert notes_storage.list_movies()["Test Movie"]["notes"] == "Second note"
+    fresh = type(notes_storage)(notes_storage.storage_file, notes_sidecar=True)
+    assert fresh.list_movies()["Test Movie"]["notes"] == "Second note"
+    assert dict(fresh.iter_movies())["Test Movie"]["notes"] == "Second note"
+    with open(notes_storage.notes_file, 'ab') as file:
+        file.write(b'{"title": "Test Movie", "no')
+    notes_storage.update_movie("Test Movie", "After a crash")
+    assert fresh.list_movies()["Test Movie"]["notes"] == "After a crash"
+
+
+def test_notes_sidecar_is_folded_into_the_file(notes_storage):
+    notes_storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    notes_storage.update_movie("Test Movie", "Note")
+    notes_storage.add_movie("Other Movie", 2001, 7.0, "poster_url", "imdb_url")
+    assert not os.path.exists(notes_storage.notes_file)
+    assert type(notes_storage)(notes_storage.storage_file).list_movies()["Test Movie"]["notes"] == "Note"
+    notes_storage.notes_compact_threshold = 1
+    notes_storage.update_movie("Other Movie", "Compacted")
+    assert not os.path.exists(notes_storage.notes_file)
+    assert type(notes_storage)(notes_storage.storage_file).list_movies()["Other Movie"]["notes"] == "Compacted"
+
+
+def test_storage_without_sidecar_folds_it(notes_storage):
+    notes_storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    notes_storage.update_movie("Test Movie", "Sidecar note")
+    plain = type(notes_storage)(notes_storage.storage_file)
+    assert plain.list_movies()["Test Movie"]["notes"] == "Sidecar note"
+    plain.add_movie("Other Movie", 2001, 7.0, "poster_url", "imdb_url")
+    assert not os.path.exists(notes_storage.notes_file)
+    assert notes_storage.list_movies()["Test Movie"]["notes"] == "Sidecar note"
+
+
+def _add_movies(storage_file, prefix, count):
+    storage = StorageJson(storage_file, cached=True, fsync=False)
+    for number in range(count):
+        storage.add_movie(f"{prefix} {number}", 2000, 7.0, "poster_url", "imdb_url")
+
+
+def test_concurrent_processes_do_not_lose_updates(tmp_path):
+    storage_file = str(tmp_path / 'movies.json')
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=_add_movies, args=(storage_file, f"Worker {worker}", 25))
+               for worker in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert len(StorageJson(storage_file).list_movies()) == 75
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+
+def test_batch_writes_the_file_once(storage, monkeypatch):
+    writes = []
+    write_movies = storage._write_movies
+    monkeypatch.setattr(storage, '_write_movies', lambda movies, path: writes.append(path) or write_movies(movies, path))
+    storage.add_many([(f"Movie {i}", 2000, 7.0, "poster_url", "imdb_url") for i in range(100)])
+    with storage.batch():
+        storage.delete_many([f"Movie {i}" for i in range(50)])
+        storage.update_many([(f"Movie {i}", "Note") for i in range(50, 100)])
+    assert len(writes) == 2
+    assert len(type(storage)(storage.storage_file).list_movies()) == 50
+
+
+def test_uncached_index_is_kept_until_the_file_changes(tmp_path):
+    storage = StorageJson(str(tmp_path / 'movies.json'))
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    index, movies = storage._index('test', dict)
+    assert storage._index('test', dict)[0] is index
+    assert storage.find_title("test movie") == "Test Movie"
+    storage.add_movie("Other Movie", 2001, 9.0, "poster_url", "imdb_url")
+    assert storage._index('test', dict)[0] is not index
+    assert storage.find_title("other movie") == "Other Movie"
+    assert [title for title, _ in storage.top_n(1)] == ["Other Movie"]
+
+
+def test_update_prompts_before_locking(storage, monkeypatch):
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    answers = iter(["y", "Typed note"])
+
+    def answer(prompt):
+        assert storage._lock_depth == 0
+        return next(answers)
+
+    monkeypatch.setattr('builtins.input', answer)
+    storage.update_movie("Test Movie")
+    assert storage.list_movies()["Test Movie"]["notes"] == "Typed note"
@@ -0,0 +1,93 @@
+import os
+import pytest
+from Storage_Journal import StorageJournal
+
+
+@pytest.fixture
+def storage_file(tmp_path):
+    return str(tmp_path / 'movies.journal')
+
+
+def test_mutations_are_replayed_on_open(storage_file):
+    storage = StorageJournal(storage_file)
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    storage.add_movie("Test Movie 2", 2001, 7.5, "poster_url_2", "imdb_url_2")
+    storage.update_movie("Test Movie 2", "Great movie!")
+    storage.delete_movie("Test Movie")
+    storage.close()
+    movies = StorageJournal(storage_file).list_movies()
+    assert "Test Movie" not in movies
+    assert movies["Test Movie 2"]["notes"] == "Great movie!"
+
+
+def test_add_existing_and_delete_non_existent_movie(storage_file):
+    storage = StorageJournal(storage_file)
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    with pytest.raises(RuntimeError):
+        storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    with pytest.raises(RuntimeError):
+        storage.delete_movie("Non Existent Movie")
+    with pytest.raises(RuntimeError):
+        storage.update_movie("Non Existent Movie", "Can't update this movie")
+
+
+def test_torn_record_is_discarded(storage_file):
+    storage = StorageJournal(storage_file)
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    storage.close()
+    with open(storage_file, 'ab') as file:
+        file.write(b'{"op": "add", "movie": {"title": "Torn')
+    storage = StorageJournal(storage_file)
+    assert list(storage.list_movies()) == ["Test Movie"]
+    storage.add_movie("Test Movie 2", 2001, 7.5, "poster_url_2", "imdb_url_2")
+    storage.close()
+    assert list(StorageJournal(storage_file).list_movies()) == ["Test Movie", "Test Movie 2"]
+
+
+def test_compaction_writes_snapshot_and_keeps_state(storage_file):
+    storage = StorageJournal(storage_file, compact_threshold=512)
+    for i in range(20):
+        storage.add_movie(f"Movie {i}", 2000 + i, 5.0, "poster_url", "imdb_url")
+    storage.update_movie("Movie 3", "Seen it")
+    storage.wait_for_compaction()
+    storage.close()
+    assert os.path.exists(storage_file + '.snapshot')
+    assert os.path.getsize(storage_file) < 512
+    movies = StorageJournal(storage_file).list_movies()
+    assert len(movies) == 20
+    assert movies["Movie 3"]["notes"] == "Seen it"
+
+
+def test_crash_before_snapshot_is_recovered(storage_file):
+    storage = StorageJournal(storage_file)
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    storage.close()
+    os.replace(storage_file, storage_file + '.old')
+    with open(storage_file, 'wb') as file:
+        file.write(b'{"op": "header", "generation": 1}\n')
+        file.write(b'{"op": "update", "title": "Test Movie", "notes": "After rotation"}\n')
+    storage = StorageJournal(storage_file)
+    storage.wait_for_compaction()
+    assert storage.list_movies()["Test Movie"]["notes"] == "After rotation"
+    assert not os.path.exists(storage_file + '.old')
+    storage.close()
+    assert StorageJournal(storage_file).list_movies()["Test Movie"]["notes"] == "After rotation"
+
+
+def test_recovered_journal_is_not_replayed_twice(storage_file):
+    storage = StorageJournal(storage_file)
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    storage.close()
+    os.replace(storage_file, storage_file + '.old')
+    with open(storage_file, 'wb') as file:
+        file.write(b'{"op": "header", "generation": 1}\n')
+        file.write(b'{"op": "update", "title": "Test Movie", "notes": "After rotation"}\n')
+        file.write(b'{"op": "delete", "title": "Test Movie"}\n')
+    storage = StorageJournal(storage_file)
+    storage.wait_for_compaction()
+    storage.add_movie("Test Movie 2", 2001, 7.5, "poster_url_2", "imdb_url_2")
+    storage.close()
+    storage = StorageJournal(storage_file)
+    assert list(storage.list_movies()) == ["Test Movie 2"]
+    storage.close()
+    assert list(StorageJournal(storage_file).list_movies()) == ["Test Movie 2"]
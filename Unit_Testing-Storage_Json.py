@@ -1,6 +1,9 @@
+import json
 import pytest
 import os
+import Storage_Json
 from Storage_Json import StorageJson
+from Synthetic_Catalogue import synthetic_movies
 
 
 storage_file = 'test_movies.json'
@@ -46,6 +49,22 @@ def test_contains():
     assert "Non Existent Movie" not in storage
 
 
+def test_json_stream_across_chunk_boundaries(tmp_path, monkeypatch):
+    movies = dict(synthetic_movies(50))
+    storage_file = tmp_path / 'movies.json'
+    storage_file.write_text(json.dumps(movies, indent=4))
+    monkeypatch.setattr(Storage_Json, 'CHUNK_SIZE', 7)
+    assert dict(StorageJson(str(storage_file)).iter_movies()) == movies
+
+
+def test_json_stream_rejects_truncated_file(tmp_path):
+    storage_file = tmp_path / 'movies.json'
+    storage_file.write_text(json.dumps(dict(synthetic_movies(3)))[:-20])
+    with pytest.raises(ValueError):
+        list(StorageJson(str(storage_file)).iter_movies())
+
+
 def teardown_module(module):
-    if os.path.exists(storage_file):
-        os.remove(storage_file)
+    for file in (storage_file, storage.lock_file):
+        if os.path.exists(file):
+            os.remove(file)
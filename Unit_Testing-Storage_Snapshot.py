@@ -0,0 +1,90 @@
+import json
+import pytest
+from Storage_Snapshot import MappedCatalogue, StorageSnapshot, write_snapshot
+from Synthetic_Catalogue import synthetic_movies
+
+
+@pytest.fixture
+def storage_file(tmp_path):
+    return str(tmp_path / 'movies.snap')
+
+
+def test_snapshot_round_trip(storage_file):
+    movies = dict(synthetic_movies(200))
+    write_snapshot(storage_file, movies)
+    catalogue = MappedCatalogue(storage_file)
+    assert len(catalogue) == 200
+    assert list(catalogue) == list(movies)
+    assert dict(catalogue.items()) == movies
+    title = list(movies)[123]
+    assert catalogue[title] == movies[title]
+    assert "Missing Movie" not in catalogue
+    titles, years, ratings = catalogue.columns()
+    assert titles == list(movies)
+    assert ratings == [movie['rating'] for movie in movies.values()]
+
+
+def test_changes_are_kept_on_top_of_the_mapping(storage_file):
+    write_snapshot(storage_file, dict(synthetic_movies(3)))
+    catalogue = MappedCatalogue(storage_file)
+    first, second, third = list(catalogue)
+    del catalogue[first]
+    catalogue[second] = dict(catalogue[second], notes="Seen it")
+    catalogue["New Movie"] = {'title': "New Movie", 'year': 2000, 'rating': 7.0}
+    assert len(catalogue) == 3
+    assert first not in catalogue
+    assert list(catalogue) == [second, third, "New Movie"]
+    assert catalogue[second]['notes'] == "Seen it"
+    catalogue[first] = {'title': first, 'year': 1999, 'rating': 5.0}
+    assert list(catalogue)[-1] == first
+    assert catalogue.columns()[2][-1] == 5.0
+
+
+def test_storage_snapshot_crud(storage_file):
+    storage = StorageSnapshot(storage_file, cached=True)
+    assert storage.list_movies() == {}
+    storage.add_movie("Test Movie", 2000, 8.0, "poster_url", "imdb_url")
+    storage.add_movie("Other Movie", 2001, 6.0, "poster_url", "imdb_url")
+    storage.update_movie("Test Movie", "New Note")
+    storage.delete_movie("Other Movie")
+    with pytest.raises(RuntimeError):
+        storage.delete_movie("Other Movie")
+    fresh = StorageSnapshot(storage_file)
+    assert dict(fresh.list_movies().items()) == {
+        "Test Movie": {'title': "Test Movie", 'year': 2000, 'rating': 8.0, 'poster_url': "poster_url",
+                       'imdb_url': "imdb_url", 'notes': "New Note"}
+    }
+    assert fresh.find_title("test movie") == "Test Movie"
+
+
+def test_cached_catalogue_is_remapped_after_saving(storage_file):
+    storage = StorageSnapshot(storage_file, cached=True)
+    storage.add_many([(f"Movie {i}", 2000 + i, 5.0, "poster_url", "imdb_url") for i in range(5)])
+    movies = storage.list_movies()
+    storage.update_movie("Movie 1", "New Note")
+    storage.delete_movie("Movie 2")
+    storage.add_movie("Movie 5", 2005, 6.0, "poster_url", "imdb_url")
+    assert storage.list_movies() is movies
+    assert not movies._changed and not movies._deleted
+    assert list(movies) == ["Movie 0", "Movie 1", "Movie 3", "Movie 4", "Movie 5"]
+    assert movies["Movie 1"]["notes"] == "New Note"
+    assert dict(StorageSnapshot(storage_file).list_movies().items()) == dict(movies.items())
+
+
+def test_notes_sidecar_is_applied_to_the_mapping(storage_file):
+    movies = dict(synthetic_movies(20))
+    write_snapshot(storage_file, movies)
+    titles = list(movies)
+    with open(storage_file + '.notes.jsonl', 'w') as file:
+        file.write(json.dumps({'title': titles[7], 'notes': "From the sidecar"}) + '\n')
+    storage = StorageSnapshot(storage_file, cached=True)
+    assert storage.list_movies()[titles[7]]['notes'] == "From the sidecar"
+    assert all(title in storage.list_movies() for title in titles)
+    assert "Missing Movie" not in storage.list_movies()
+
+
+def test_invalid_snapshot_is_rejected(storage_file):
+    with open(storage_file, 'wb') as file:
+        file.write(b'not a snapshot' * 4)
+    with pytest.raises(RuntimeError):
+        StorageSnapshot(storage_file).list_movies()
@@ -0,0 +1,96 @@
+import sqlite3
+import pytest
+from Movie_App import MovieApp
+from Storage_Json import StorageJson
+from Storage_Sqlite import StorageSqlite
+
+
+@pytest.fixture
+def storage(tmp_path):
+    storage = StorageSqlite(str(tmp_path / 'movies.db'))
+    storage.add_movie("The Godfather", 1972, 9.2, "poster_url", "imdb_url")
+    storage.add_movie("Heat", 1995, 8.3, "poster_url", "imdb_url")
+    storage.add_movie("Alien", 1979, 8.5, "poster_url", "imdb_url")
+    yield storage
+    storage.close()
+
+
+def test_crud(storage):
+    with pytest.raises(RuntimeError):
+        storage.add_movie("Heat", 1995, 8.3, "poster_url", "imdb_url")
+    storage.update_movie("Heat", "New Note")
+    assert storage.list_movies()["Heat"]["notes"] == "New Note"
+    storage.delete_movie("Heat")
+    assert "Heat" not in storage
+    with pytest.raises(RuntimeError):
+        storage.delete_movie("Heat")
+    with pytest.raises(RuntimeError):
+        storage.update_movie("Heat", "Can't update this movie")
+
+
+def test_get_movie(storage):
+    assert storage.get_movie("Alien")['year'] == 1979
+    assert 'title_folded' not in storage.get_movie("Alien")
+    assert storage.get_movie("alien") is None
+
+
+def test_find_title_is_case_insensitive(storage):
+    assert storage.find_title("the GODFATHER") == "The Godfather"
+    assert storage.find_title("Godfather") is None
+
+
+def test_queries(storage):
+    assert list(storage.filter_movies(min_rating=8.4)) == ["The Godfather", "Alien"]
+    assert list(storage.filter_movies(start_year=1975, end_year=1999)) == ["Alien", "Heat"]
+    assert [title for title, _ in storage.top_n(2)] == ["The Godfather", "Alien"]
+    assert [title for title, _ in storage.bottom_n(1)] == ["Heat"]
+    assert len(storage.top_n()) == 3
+    assert [[title for title, _ in page] for page in storage.iter_by_rating(2)] == [["The Godfather", "Alien"], ["Heat"]]
+
+
+def test_import_movies(tmp_path, storage):
+    source = StorageJson(str(tmp_path / 'movies.json'))
+    source.add_movie("Heat", 1995, 8.3, "poster_url", "imdb_url")
+    source.add_movie("Up", 2009, 8.2, "poster_url", "imdb_url")
+    assert storage.import_movies(source) == 2
+    assert len(storage.list_movies()) == 4
+
+
+def test_movie_app_uses_storage_queries(storage):
+    app = MovieApp(storage)
+    assert app._find_title("heat") == "Heat"
+    assert list(app._filter_movies(max_rating=8.4)) == ["Heat"]
+    assert [title for title, _ in app._movies_sorted_by_rating()] == ["The Godfather", "Alien", "Heat"]
+
+
+def test_search_movies_ranked_by_match_position(storage):
+    storage.add_movie("Aliens", 1986, 8.4, "poster_url", "imdb_url")
+    assert [title for title, _ in storage.search_movies("LIEN")] == ["Alien", "Aliens"]
+    assert [title for title, _ in storage.search_movies("e")] == ["Heat", "The Godfather", "Alien", "Aliens"]
+
+
+def test_titles_are_casefolded_beyond_ascii(storage):
+    storage.add_movie("Ünïcode Éclair", 2001, 7.0, "poster_url", "imdb_url")
+    storage.add_movie("Die Straße", 2002, 6.0, "poster_url", "imdb_url")
+    assert storage.find_title("ünïcode éclair") == "Ünïcode Éclair"
+    assert [title for title, _ in storage.search_movies("ÉCLAIR")] == ["Ünïcode Éclair"]
+    assert [title for title, _ in storage.search_movies("STRASSE")] == ["Die Straße"]
+    assert [title for title, _ in storage.search_movies("ün")] == ["Ünïcode Éclair"]
+    storage.delete_movie("Die Straße")
+    assert storage.search_movies("strasse") == []
+    assert "title_folded" not in storage.list_movies()["Heat"]
+
+
+def test_database_without_casefolded_titles_is_upgraded(tmp_path):
+    path = str(tmp_path / 'old.db')
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE movies (title TEXT PRIMARY KEY, year INTEGER NOT NULL, rating REAL NOT NULL, "
+                       "poster_url TEXT NOT NULL DEFAULT '', imdb_url TEXT NOT NULL DEFAULT '', "
+                       "notes TEXT NOT NULL DEFAULT '')")
+    connection.execute("INSERT INTO movies (title, year, rating) VALUES ('Ünïcode Éclair', 2001, 7.0)")
+    connection.commit()
+    connection.close()
+    storage = StorageSqlite(path)
+    assert storage.find_title("ÜNÏCODE ÉCLAIR") == "Ünïcode Éclair"
+    assert [title for title, _ in storage.search_movies("éclair")] == ["Ünïcode Éclair"]
+    storage.close()
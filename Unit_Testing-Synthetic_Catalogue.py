@@ -0,0 +1,23 @@
+import pytest
+from Storage_Csv import StorageCsv
+from Storage_Json import StorageJson
+from Synthetic_Catalogue import synthetic_movies, write_catalogue
+
+
+def test_synthetic_movies_are_repeatable():
+    assert list(synthetic_movies(10, seed=3)) == list(synthetic_movies(10, seed=3))
+    assert list(synthetic_movies(10, seed=3)) != list(synthetic_movies(10, seed=4))
+
+
+@pytest.mark.parametrize('storage_class, extension', [(StorageJson, '.json'), (StorageCsv, '.csv')])
+def test_write_catalogue_is_read_by_the_storage(tmp_path, storage_class, extension):
+    path = str(tmp_path / ('movies' + extension))
+    write_catalogue(path, 25, seed=1)
+    movies = storage_class(path).list_movies()
+    assert {title: dict(movie) for title, movie in movies.items()} == dict(synthetic_movies(25, seed=1))
+
+
+def test_write_empty_catalogue(tmp_path):
+    path = str(tmp_path / 'movies.json')
+    write_catalogue(path, 0)
+    assert StorageJson(path).list_movies() == {}
@@ -0,0 +1,44 @@
+from Storage_Json import StorageJson
+from Title_Index import TitleIndex
+
+
+def test_find_is_case_insensitive():
+    index = TitleIndex(["The Godfather", "Up"])
+    assert index.find("the GODFATHER") == "The Godfather"
+    assert index.find("up") == "Up"
+    assert index.find("Godfather") is None
+
+
+def test_search_substrings():
+    index = TitleIndex(["The Godfather", "The Godfather Part II", "Goodfellas", "Up", "Pulp Fiction"])
+    assert index.search("godfather") == ["The Godfather", "The Godfather Part II"]
+    assert index.search("up") == ["Up"]
+    assert index.search("p") == ["Pulp Fiction", "Up", "The Godfather Part II"]
+    assert index.search("xyz") == []
+
+
+def test_search_ranked_by_match_position():
+    index = TitleIndex(["The Matrix Reloaded", "Matrix", "Inside the Matrix"])
+    assert index.search("matrix") == ["Matrix", "The Matrix Reloaded", "Inside the Matrix"]
+    assert index.search("matrix", ranked=False) == ["The Matrix Reloaded", "Matrix", "Inside the Matrix"]
+
+
+def test_add_and_remove():
+    index = TitleIndex(["Alien"])
+    index.add("Aliens")
+    assert index.search("alien") == ["Alien", "Aliens"]
+    index.remove("Alien")
+    assert index.search("alien") == ["Aliens"]
+    assert index.find("alien") is None
+    assert len(index) == 1
+
+
+def test_storage_keeps_index_up_to_date(tmp_path):
+    storage = StorageJson(str(tmp_path / 'movies.json'), cached=True)
+    storage.add_movie("Alien", 1979, 8.5, "poster_url", "imdb_url")
+    assert storage.find_title("ALIEN") == "Alien"
+    storage.add_movie("Aliens", 1986, 8.4, "poster_url", "imdb_url")
+    assert [title for title, _ in storage.search_movies("lien")] == ["Alien", "Aliens"]
+    storage.delete_movie("Alien")
+    assert [title for title, _ in storage.search_movies("lien")] == ["Aliens"]
+    assert storage.find_title("alien") is None
@@ -0,0 +1,86 @@
+import pytest
+from Website_Generator import WebsiteGenerator
+
+MOVIES = {
+    'Alien': {'year': 1979, 'rating': 8.5, 'poster_url': 'poster.jpg', 'imdb_url': 'imdb_url', 'notes': ''},
+    'Tom & Jerry <3': {'year': 2021, 'rating': 5.2, 'poster_url': 'p.jpg?a=1&b=2', 'imdb_url': 'url', 'notes': 'ok'},
+}
+
+
+@pytest.fixture
+def generator(tmp_path):
+    template_file = tmp_path / 'index_template.html'
+    template_file.write_text("<h1>__TEMPLATE_TITLE__</h1><ol>__TEMPLATE_MOVIE_GRID__</ol>__TEMPLATE_NAVIGATION__")
+    return WebsiteGenerator(str(template_file), str(tmp_path / 'index.html'))
+
+
+def test_generate_writes_escaped_grid(generator):
+    assert generator.generate(MOVIES.items)
+    with open(generator.output_file) as file:
+        website = file.read()
+    assert website.startswith("<h1>My Favorite Movies</h1><ol><li>")
+    assert website.endswith("</li></ol>")
+    assert "__TEMPLATE_NAVIGATION__" not in website
+    assert "Tom &amp; Jerry &lt;3 (2021)" in website
+    assert 'src="p.jpg?a=1&amp;b=2"' in website
+    assert "<div class='movie-note'>ok</div>" in website
+
+
+def test_incremental_generate_skips_unchanged_catalogue(generator):
+    assert generator.generate(MOVIES.items, incremental=True)
+    assert not generator.generate(MOVIES.items, incremental=True)
+    changed = dict(MOVIES, Alien=dict(MOVIES['Alien'], notes='Classic'))
+    assert generator.generate(changed.items, incremental=True)
+    with open(generator.output_file) as file:
+        assert "Classic" in file.read()
+
+
+def test_generate_pages(generator, tmp_path):
+    movies = {f"Movie {i}": {'year': 2000 + i % 3, 'rating': 5.0 + i % 4, 'poster_url': 'p.jpg', 'imdb_url': 'url'}
+              for i in range(25)}
+    output_dir = tmp_path / 'website'
+    page_count = generator.generate_pages(movies.items(), str(output_dir), page_size=10, by_year=True,
+                                          by_rating=True, processes=2)
+    files = sorted(path.name for path in output_dir.iterdir() if path.suffix == '.html')
+    assert 'index.html' in files and 'index-page-3.html' in files and 'index-page-4.html' not in files
+    assert 'year-2001.html' in files and 'rating-8.html' in files
+    assert 'years.html' in files and 'ratings.html' in files
+    assert page_count == len(files)
+    first_page = (output_dir / 'index.html').read_text()
+    assert first_page.count('<li><div class="movie">') == 10
+    assert 'href="index-page-2.html"' in first_page
+    assert '<a href="year-2000.html">2000</a> (9 movies)' in (output_dir / 'years.html').read_text()
+
+
+def test_generate_pages_removes_stale_pages(generator, tmp_path):
+    movies = {f"Movie {i}": {'year': 2000 + i, 'rating': 7.0, 'poster_url': 'p.jpg', 'imdb_url': 'url'}
+              for i in range(25)}
+    output_dir = tmp_path / 'website'
+    output_dir.mkdir()
+    (output_dir / 'about.html').write_text('<p>About</p>')
+    (output_dir / 'year-1900.html').write_text('<p>Kept by hand</p>')
+    generator.generate_pages(movies.items(), str(output_dir), page_size=10, by_year=True, processes=1)
+    smaller = dict(list(movies.items())[:5])
+    page_count = generator.generate_pages(smaller.items(), str(output_dir), page_size=10, by_year=True,
+                                          processes=1)
+    files = sorted(path.name for path in output_dir.iterdir() if path.suffix == '.html')
+    assert 'index-page-2.html' not in files and 'year-2010.html' not in files
+    assert 'about.html' in files and 'year-1900.html' in files
+    assert page_count == len(files) - 2
+
+
+def test_incremental_generate_pages_renders_changed_pages(generator, tmp_path):
+    movies = {f"Movie {i}": {'year': 2000 + i % 3, 'rating': 5.0 + i % 4, 'poster_url': 'p.jpg', 'imdb_url': 'url'}
+              for i in range(25)}
+    output_dir = str(tmp_path / 'website')
+    page_count = generator.generate_pages(movies.items(), output_dir, page_size=10, by_year=True, by_rating=True,
+                                          processes=1, incremental=True)
+    assert generator.generate_pages(movies.items(), output_dir, page_size=10, by_year=True, by_rating=True,
+                                    processes=1, incremental=True) == 0
+    movies['Movie 12'] = dict(movies['Movie 12'], notes='Seen twice')
+    # its page of all movies, its year and its rating bucket
+    assert generator.generate_pages(movies.items(), output_dir, page_size=10, by_year=True, by_rating=True,
+                                    processes=1, incremental=True) == 3
+    assert 'Seen twice' in (tmp_path / 'website' / 'index-page-2.html').read_text()
+    assert generator.generate_pages(movies.items(), output_dir, page_size=10, by_year=True, by_rating=True,
+                                    processes=1) == page_count
@@ -0,0 +1,297 @@
+import hashlib
+import html
+import json
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+TITLE_PLACEHOLDER = "__TEMPLATE_TITLE__"
+GRID_PLACEHOLDER = "__TEMPLATE_MOVIE_GRID__"
+NAVIGATION_PLACEHOLDER = "__TEMPLATE_NAVIGATION__"
+# the pages of the last paginated build and their digests, kept in its output directory
+PAGES_MANIFEST = "pages.manifest.json"
+# like the CSV loader, the workers start from a clean process instead of a fork of one that may be
+# running the threads of the API server or of an import
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+def _write_page(page):
+    """Writes a single page of a paginated website. Runs in a worker process."""
+    output_file, head, tail, entries = page
+    temp_file = output_file + ".tmp"
+    with open(temp_file, "w") as file:
+        file.write(head)
+        for entry in entries:
+            if isinstance(entry, str):
+                file.write(entry)
+            else:
+                file.write(WebsiteGenerator.render_movie(*entry))
+        file.write(tail)
+    os.replace(temp_file, output_file)
+
+
+class WebsiteGenerator:
+    """
+    Renders the movie website by streaming the grid straight into the output file.
+
+    The template is split once around the grid placeholder and every movie is rendered and
+    written on its own, so memory stays bounded for large catalogues. In incremental mode a
+    digest of the per-movie content hashes is kept in a manifest next to the output, and the
+    website is only rendered again if the catalogue or the template changed since.
+
+    generate_pages() splits large catalogues into pages of page_size movies with navigation
+    links, optionally with index pages per year and per rating bucket, rendered in parallel
+    across a process pool.
+    """
+
+    def __init__(self, template_file="index_template.html", output_file="index.html",
+                 title="My Favorite Movies"):
+        self.template_file = template_file
+        self.output_file = output_file
+        self.manifest_file = output_file + ".manifest.json"
+        self.title = title
+
+    def _load_template(self):
+        """Reads the template file."""
+        with open(self.template_file, "r") as file:
+            return file.read()
+
+    @staticmethod
+    def _split_template(template, title, navigation=""):
+        """Fills in the title and navigation and splits the template around the movie grid."""
+        template = template.replace(TITLE_PLACEHOLDER, html.escape(title))
+        template = template.replace(NAVIGATION_PLACEHOLDER, navigation)
+        head, _, tail = template.partition(GRID_PLACEHOLDER)
+        return head, tail
+
+    def _read_template(self):
+        """Reads the template and splits it into the parts before and after the movie grid."""
+        return self._split_template(self._load_template(), self.title)
+
+    @staticmethod
+    def render_movie(movie, properties):
+        """Renders the grid entry of a single movie with all values HTML-escaped."""
+        note = properties.get("notes", "")
+        note_html = f"<div class='movie-note'>{html.escape(note)}</div>" if note else ""
+        poster_url = html.escape(properties.get("poster_url", "https://via.placeholder.com/150"))
+        imdb_url = html.escape(properties.get("imdb_url", "#"))
+        movie_rating = html.escape(str(properties.get("rating", "N/A")))
+        movie_year = html.escape(str(properties.get("year", "N/A")))
+        movie = html.escape(movie)
+        return (
+            f'<li><div class="movie">'
+            f'<a href="{imdb_url}" target="_blank">'
+            f'<img src="{poster_url}" alt="{movie} Poster" class="movie-poster">'
+            f'</a><div class="movie-details">'
+            f'<div class="movie-title">{movie} ({movie_year})</div>'
+            f'<div class="movie-rating">Rating: {movie_rating}</div>{note_html}'
+            f'</div></div></li>'
+        )
+
+    @staticmethod
+    def movie_hash(movie, properties):
+        """Returns a hash of everything of a movie that ends up on the website."""
+        content = json.dumps(
+            [movie, properties.get("year"), properties.get("rating"), properties.get("poster_url"),
+             properties.get("imdb_url"), properties.get("notes", "")]
+        )
+        return hashlib.sha1(content.encode("utf-8")).digest()
+
+    def _digest(self, entries, head, tail, hashes=None):
+        """
+        Folds the template and the per-movie content hashes into a single digest. Entries are
+        (title, properties) pairs or ready-made HTML, and hashes the movie hashes by title if
+        they were computed already.
+        """
+        digest = hashlib.sha256()
+        digest.update(head.encode("utf-8"))
+        digest.update(tail.encode("utf-8"))
+        for entry in entries:
+            if isinstance(entry, str):
+                digest.update(entry.encode("utf-8"))
+            elif hashes is not None:
+                digest.update(hashes[entry[0]])
+            else:
+                digest.update(self.movie_hash(*entry))
+        return digest.hexdigest()
+
+    def _read_manifest(self):
+        """Returns the digest of the last build, or None."""
+        try:
+            with open(self.manifest_file, "r") as file:
+                return json.load(file).get("digest")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write_manifest(self, digest):
+        """Stores the digest of the current build."""
+        with open(self.manifest_file, "w") as file:
+            json.dump({"digest": digest}, file)
+
+    def write(self, movies, head, tail):
+        """Streams the website into a temporary file that replaces the output once complete."""
+        temp_file = self.output_file + ".tmp"
+        with open(temp_file, "w") as file:
+            file.write(head)
+            file.writelines(self.render_movie(movie, properties) for movie, properties in movies)
+            file.write(tail)
+        os.replace(temp_file, self.output_file)
+
+    def generate(self, movies, incremental=False):
+        """
+        Generates the website from the movies, given as a callable returning (title, properties)
+        pairs so they can be iterated more than once. Returns False if the incremental build found
+        nothing to do, True otherwise.
+        """
+        head, tail = self._read_template()
+        digest = None
+        if incremental:
+            digest = self._digest(movies(), head, tail)
+            if digest == self._read_manifest() and os.path.exists(self.output_file):
+                return False
+        self.write(movies(), head, tail)
+        if incremental:
+            self._write_manifest(digest)
+        return True
+
+    @staticmethod
+    def page_file(name, page):
+        """Returns the file name of a page of a section."""
+        return f"{name}.html" if page == 1 else f"{name}-page-{page}.html"
+
+    def _navigation(self, name, page, page_count, sections):
+        """Renders the links to the neighbouring pages of a section and to the other sections."""
+        links = []
+        if page > 1:
+            links.append(f'<a href="{self.page_file(name, page - 1)}">&laquo; Previous</a>')
+        shown = sorted({1, page_count} | set(range(max(1, page - 2), min(page_count, page + 2) + 1)))
+        for previous, number in zip([0] + shown, shown):
+            if number - previous > 1:
+                links.append("<span>&hellip;</span>")
+            if number == page:
+                links.append(f"<span>{number}</span>")
+            else:
+                links.append(f'<a href="{self.page_file(name, number)}">{number}</a>')
+        if page < page_count:
+            links.append(f'<a href="{self.page_file(name, page + 1)}">Next &raquo;</a>')
+        section_links = [f'<a href="{file}">{html.escape(label)}</a>' for file, label in sections]
+        return f"<div>{' '.join(links)}</div><div>{' '.join(section_links)}</div>"
+
+    @staticmethod
+    def _group_movies(movies, key):
+        """Groups the movies by key, keeping their order within each group."""
+        groups = {}
+        for movie, properties in movies:
+            groups.setdefault(key(properties), []).append((movie, properties))
+        return dict(sorted(groups.items()))
+
+    @staticmethod
+    def _rating_bucket(properties):
+        """Returns the whole-number rating bucket (0 to 9, 10 included in 9) of a movie."""
+        return min(int(float(properties.get("rating", 0))), 9)
+
+    def _pages(self, template, output_dir, page_size, sections, entries_by_section):
+        """Yields the (output_file, head, tail, entries) tuples of all the pages."""
+        for name, title, entries in entries_by_section:
+            page_count = max(1, -(-len(entries) // page_size))
+            for page in range(1, page_count + 1):
+                navigation = self._navigation(name, page, page_count, sections)
+                page_title = title if page_count == 1 else f"{title} ({page}/{page_count})"
+                head, tail = self._split_template(template, page_title, navigation)
+                page_entries = entries[(page - 1) * page_size:page * page_size]
+                yield os.path.join(output_dir, self.page_file(name, page)), head, tail, page_entries
+
+    @staticmethod
+    def _read_pages(output_dir):
+        """Returns the digests of the pages the last build wrote into output_dir by file name."""
+        try:
+            with open(os.path.join(output_dir, PAGES_MANIFEST), "r") as file:
+                return json.load(file).get("pages", {})
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_pages(output_dir, pages):
+        """Stores the digests of the pages of the current build by file name."""
+        with open(os.path.join(output_dir, PAGES_MANIFEST), "w") as file:
+            json.dump({"pages": pages}, file)
+
+    @staticmethod
+    def _remove_stale_pages(output_dir, previous, page_files):
+        """Removes the previous pages of output_dir that aren't in page_files.
+        Other files in output_dir are left alone."""
+        for file_name in set(previous) - set(page_files):
+            try:
+                os.remove(os.path.join(output_dir, file_name))
+            except FileNotFoundError:
+                pass
+
+    def generate_pages(self, movies, output_dir, page_size=100, by_year=False, by_rating=False, processes=None,
+                       incremental=False):
+        """
+        Generates a paginated website into output_dir from the movies, given as (title, properties)
+        pairs. Besides the pages of all movies it adds pages per year and per rating bucket with
+        an overview page each if requested. The pages are listed in a manifest in output_dir, and
+        the pages of the last build that this one doesn't write are removed first. In incremental
+        mode the manifest keeps a digest per page and only the pages whose movies, navigation or
+        template changed are rendered again. Returns the number of pages written.
+        """
+        template = self._load_template()
+        os.makedirs(output_dir, exist_ok=True)
+        style_file = os.path.join(os.path.dirname(os.path.abspath(self.template_file)), "style.css")
+        if os.path.exists(style_file) and not os.path.exists(os.path.join(output_dir, "style.css")):
+            shutil.copyfile(style_file, os.path.join(output_dir, "style.css"))
+        movies = list(movies)
+        sections = [("index.html", "All movies")]
+        entries_by_section = [("index", self.title, movies)]
+        groupings = []
+        if by_year:
+            sections.append(("years.html", "By year"))
+            groupings.append(("year", "years", "Movies by year", lambda properties: properties.get("year", 0),
+                              lambda year: f"{year}", lambda year: f"{self.title} from {year}"))
+        if by_rating:
+            sections.append(("ratings.html", "By rating"))
+            groupings.append(("rating", "ratings", "Movies by rating", self._rating_bucket,
+                              lambda bucket: f"Rated {bucket} to {bucket + 1}",
+                              lambda bucket: f"{self.title} rated {bucket} to {bucket + 1}"))
+        for prefix, overview_name, overview_title, key, label, title in groupings:
+            overview = []
+            for value, group in self._group_movies(movies, key).items():
+                name = f"{prefix}-{value}"
+                overview.append(
+                    f'<li><a href="{self.page_file(name, 1)}">{html.escape(label(value))}</a> '
+                    f'({len(group)} movies)</li>'
+                )
+                entries_by_section.append((name, title(value), group))
+            entries_by_section.append((overview_name, overview_title, overview))
+        page_files = [self.page_file(name, page)
+                      for name, _, entries in entries_by_section
+                      for page in range(1, max(1, -(-len(entries) // page_size)) + 1)]
+        previous = self._read_pages(output_dir)
+        self._remove_stale_pages(output_dir, previous, page_files)
+        # every movie is on several pages, so its hash is computed once
+        hashes = {movie: self.movie_hash(movie, properties) for movie, properties in movies} if incremental else None
+        digests = {}
+        pages = self._pages(template, output_dir, page_size, sections, entries_by_section)
+        processes = processes or os.cpu_count() or 1
+        page_count = 0
+        with ProcessPoolExecutor(max_workers=processes,
+                                 mp_context=multiprocessing.get_context(START_METHOD)) as executor:
+            pending = set()
+            max_pending = 4 * processes
+            for page in pages:
+                file_name = os.path.basename(page[0])
+                digests[file_name] = digest = self._digest(page[3], page[1], page[2], hashes) if incremental else None
+                if digest is not None and digest == previous.get(file_name) and os.path.exists(page[0]):
+                    continue
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                pending.add(executor.submit(_write_page, page))
+                page_count += 1
+            for future in pending:
+                future.result()
+        self._write_pages(output_dir, digests)
+        return page_count
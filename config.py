@@ -1 +1,42 @@
+import os
+
 API_KEY = "Your API KEY"  # get your own API key and insert it here, didn´t add mine for security reasons.
+
+# OMDb requests: at most OMDB_REQUESTS_PER_SECOND per second, retried OMDB_MAX_RETRIES times with backoff.
+OMDB_REQUESTS_PER_SECOND = 5
+OMDB_MAX_RETRIES = 3
+OMDB_TIMEOUT = 10
+OMDB_IMPORT_WORKERS = 8
+
+# OMDb answers are cached on disk, found movies for OMDB_CACHE_TTL seconds and misses for OMDB_CACHE_NEGATIVE_TTL.
+# The cache file is next to the scripts, like the storage file given to main.py.
+OMDB_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "omdb_cache.sqlite")
+OMDB_CACHE_TTL = 30 * 24 * 3600
+OMDB_CACHE_NEGATIVE_TTL = 24 * 3600
+OMDB_CACHE_MAX_ENTRIES = 10000
+
+# Paginated website: WEBSITE_PAGE_SIZE movies per page, written to WEBSITE_OUTPUT_DIR by WEBSITE_PROCESSES
+# processes (None for one per CPU), with index pages per year and per rating bucket if enabled.
+WEBSITE_PAGE_SIZE = 100
+WEBSITE_OUTPUT_DIR = "website"
+WEBSITE_PROCESSES = None
+WEBSITE_PAGES_BY_YEAR = True
+WEBSITE_PAGES_BY_RATING = True
+
+# Number of movies shown at once in the list of movies sorted by rating.
+SORTED_PAGE_SIZE = 20
+
+# JSON storage: JSON_CODEC names the codec ('orjson', 'ujson' or 'json', None for the fastest installed one that
+# keeps JSON_INDENT) and JSON_INDENT the indentation of the file (None for compact JSON). .json.gz and .json.zst
+# files are compressed.
+JSON_CODEC = None
+JSON_INDENT = 4
+
+# API server started with 'python3 main.py movies.json serve', listening on SERVER_HOST:SERVER_PORT.
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+
+# CSV files of at least CSV_PARALLEL_MIN_BYTES are parsed by CSV_LOAD_PROCESSES processes (None for one per CPU, 1 to
+# read them in a single process).
+CSV_LOAD_PROCESSES = None
+CSV_PARALLEL_MIN_BYTES = 32 * 1024 * 1024
@@ -1,9 +1,16 @@
 import os
+import sys
 import argparse
 
+from config import CSV_LOAD_PROCESSES, CSV_PARALLEL_MIN_BYTES, JSON_CODEC, JSON_INDENT
 from Movie_App import MovieApp
+from Movie_Cli import MovieCli, add_subcommands
+from Movie_Profiler import add_profile_arguments, profiler_from_args
 from Storage_Csv import StorageCsv
+from Storage_Journal import StorageJournal
 from Storage_Json import StorageJson
+from Storage_Snapshot import StorageSnapshot
+from Storage_Sqlite import StorageSqlite
 
 
 def main():
@@ -11,36 +18,84 @@ def main():
         Movie App
 
         Main File of the Movie App. It allows users to manage our collection of movies
-        stored in either a JSON or CSV file. The script accepts a command-line argument specifying
-        the movie storage we use. The file can have a .json or .csv extension.
+        stored in either a JSON or CSV file, an append-only journal, a SQLite database or a
+        memory-mapped snapshot. The script accepts a command-line argument specifying the movie
+        storage we use. The file can have a .json, .csv, .journal, .db, .sqlite or .snap extension,
+        JSON files can also be compressed as .json.gz or .json.zst.
 
         How to use it:
             python3 main.py movies.json
+            python3 main.py movies.json.gz
             python3 main.py movies.csv
+            python3 main.py movies.journal
+            python3 main.py movies.db
+            python3 main.py movies.snap
+
+        A command after the file name runs once without the menu, e.g.:
+            python3 main.py movies.json list --format csv
+            python3 main.py movies.json sorted --limit 10
+            python3 main.py movies.json add "Alien" 1979 8.5
+            cat titles.txt | python3 main.py movies.json delete --stdin
+            python3 main.py movies.json serve --port 8000
+            python3 main.py movies.json --help
+
+        --profile (or MOVIE_PROFILE=1) prints the time, bytes and calls of every command,
+        storage call and OMDb request on exit:
+            python3 main.py movies.json --profile --profile-output calls.jsonl stats
+            python3 main.py movies.json --profile-command stats_of_movies --profile-mode tracemalloc
         """
 
     parser = argparse.ArgumentParser(description='Movie App')
-    parser.add_argument('filename', help='Path to the .json or .csv file to be used for movie storage')
+    parser.add_argument('filename', help='Path to the .json, .json.gz, .json.zst, .csv, .journal, .db, .sqlite or .snap file to be used for movie storage')
+    add_profile_arguments(parser)
+    add_subcommands(parser)
     args = parser.parse_args()
 
     filename = args.filename
     script_dir = os.path.dirname(__file__)
     full_path = os.path.join(script_dir, filename)
 
-    if full_path.endswith('.json'):
-        storage = StorageJson(full_path)
+    if full_path.endswith(('.json', '.json.gz', '.json.zst')):
+        storage = StorageJson(full_path, cached=True, aggregates=True, compact=True, notes_sidecar=True,
+                              codec=JSON_CODEC, indent=JSON_INDENT)
     elif full_path.endswith('.csv'):
-        storage = StorageCsv(full_path)
+        storage = StorageCsv(full_path, cached=True, aggregates=True, compact=True, notes_sidecar=True,
+                             load_processes=CSV_LOAD_PROCESSES, parallel_min_bytes=CSV_PARALLEL_MIN_BYTES)
+    elif full_path.endswith('.journal'):
+        storage = StorageJournal(full_path)
+    elif full_path.endswith(('.db', '.sqlite')):
+        # the connection is shared by the threads of the API server
+        storage = StorageSqlite(full_path, check_same_thread=False)
+    elif full_path.endswith('.snap'):
+        storage = StorageSnapshot(full_path, cached=True, aggregates=True)
     else:
-        print('Invalid file extension. Please use a .json or .csv file.')
-        return
-
-    app = MovieApp(storage)
-    app.run()
+        print('Invalid file extension. Please use a .json, .json.gz, .json.zst, .csv, .journal, .db, .sqlite or .snap file.',
+              file=sys.stderr if args.command else sys.stdout)
+        return 2
+
+    app = MovieCli(storage) if args.command else MovieApp(storage)
+    profiler = profiler_from_args(args)
+    if profiler is not None:
+        profiler.instrument_app(app)
+    try:
+        if args.command:
+            return app.execute(args)
+        app.run()
+        return 0
+    finally:
+        # the journal compacts itself past its threshold when closed, SQLite closes its connection
+        close = getattr(storage, 'close', None)
+        try:
+            if close is not None:
+                close()
+        finally:
+            if profiler is not None:
+                profiler.close()
+                print(profiler.summary(), file=sys.stderr)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
 # If you want to use it manually(Keep the indentation in mind)
 # from WebsiteMovie.Movie_App import MovieApp